@@ -0,0 +1,246 @@
+# core/async_download.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Callable, Iterable, Optional
+from urllib.parse import urlparse
+
+from core.fetch_policy import FetchPolicy, fetch_policy
+from core.journal import FAILED, FETCHED, PARSED, PERSISTED, DownloadJournal, journal
+from core.log import log
+from core.mt_get_text import (
+    fetch_chapter_text,
+    parse_chapter_text,
+    read_toc,
+    save_chapter_text,
+)
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                        Async Download                           │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+CONCURRENCY = 16
+# Requests per second and burst size allowed for each host.
+HOST_LIMITS = {"bestlightnovel.com": (4.0, 8)}
+DEFAULT_LIMIT = (2.0, 4)
+
+
+class TokenBucket:
+    """
+    An asyncio token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`; every
+    request spends one token and waits when the bucket is empty.
+
+    Args:
+        `rate` (float):
+            Tokens added per second.
+        `capacity` (int):
+            The largest burst allowed.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Invalid token bucket.", f"rate: {rate}, capacity: {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = monotonic()
+        self._lock = asyncio.Lock()
+
+    def __repr__(self):
+        return f"TokenBucket(rate={self.rate}, capacity={self.capacity}, tokens={self.tokens:.2f})"
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available, then spend it."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class HostLimiter:
+    """
+    Keeps one `TokenBucket` per host.
+
+    Args:
+        `limits` (dict, optional):
+            Host -> (rate, capacity). Defaults to HOST_LIMITS.
+        `default` (tuple, optional):
+            The (rate, capacity) for hosts not in `limits`. Defaults to DEFAULT_LIMIT.
+    """
+
+    def __init__(self, limits: Optional[dict] = None, default: tuple = DEFAULT_LIMIT):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self.buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).hostname or ""
+        if host.startswith("www."):
+            host = host[4:]
+        if host not in self.buckets:
+            rate, capacity = self.limits.get(host, self.default)
+            self.buckets[host] = TokenBucket(rate, capacity)
+        return self.buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        await self.bucket(url).acquire()
+
+
+async def download_chapters(
+    chapters: Iterable[int],
+    concurrency: int = CONCURRENCY,
+    limits: Optional[dict] = None,
+    persist: Callable[..., dict] = save_chapter_text,
+    progress: Optional[Callable[[dict], None]] = None,
+    toc: Optional[dict] = None,
+    journal: Optional[DownloadJournal] = journal,
+    resume: bool = False,
+    fetch: Callable[[int, str], str] = fetch_chapter_text,
+    policy: Optional[FetchPolicy] = fetch_policy,
+) -> dict:
+    """
+    Download the given chapters concurrently and persist each one as it completes.
+
+    At most `concurrency` chapters are in flight at once, and requests to each
+    host are spaced by a token bucket. Failed fetches are retried under
+    `policy`. Chapters are fed to the workers through a bounded queue, and
+    finished chapters are handed to `persist` one at a time as soon as they
+    complete, so memory stays flat over a full re-pull.
+
+    Args:
+        `chapters` (Iterable[int]):
+            The chapters to download.
+        `concurrency` (int, optional):
+            The maximum number of chapters in flight. Defaults to CONCURRENCY.
+        `limits` (dict, optional):
+            Host -> (rate, capacity) overrides. Defaults to HOST_LIMITS.
+        `persist` (Callable, optional):
+            Called with (chapter, title, url, text) for each finished chapter. Coroutine functions, such as
+            `core.async_store.chapter_persister()`, are awaited; others run on a thread. Defaults to `save_chapter_text`.
+        `progress` (Callable, optional):
+            Called with the persisted chapter dict after each chapter.
+        `toc` (dict, optional):
+            The table of contents. Defaults to json/toc2.json.
+        `journal` (DownloadJournal, optional):
+            Records each chapter's state as it is fetched, parsed, persisted, or fails. Pass None to disable.
+        `resume` (bool, optional):
+            Skip chapters the journal has already recorded as persisted. Defaults to False.
+        `fetch` (Callable, optional):
+            Called with (chapter, url) to retrieve a chapter's unparsed text. Defaults to `fetch_chapter_text`.
+        `policy` (FetchPolicy, optional):
+            Retries, backoff, and circuit breaker around each fetch. Pass None to fetch each chapter once.
+
+    Returns:
+        `results` (dict):
+            `downloaded`: the chapters persisted, `failed`: chapter -> error.
+    """
+    toc = toc or read_toc()
+    if resume and journal is not None:
+        chapters = journal.pending(chapters)
+        log.info(f"Resuming download: {len(chapters)} chapters left.")
+    limiter = HostLimiter(limits)
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="download")
+    pending: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    finished: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    downloaded = []
+    failed = {}
+
+    def fail(chapter: int, reason: str):
+        failed[chapter] = reason
+        if journal is not None:
+            journal.record(chapter, FAILED, reason)
+
+    def mark(chapter: int, state: str):
+        if journal is not None:
+            journal.record(chapter, state)
+
+    async def produce():
+        for chapter in chapters:
+            if chapter is None:
+                continue
+            entry = toc.get(str(chapter))
+            if entry is None:
+                log.warning(f"Chapter {chapter} is not in the table of contents. Skipping it.")
+                continue
+            await pending.put(entry)
+        for _ in range(concurrency):
+            await pending.put(None)
+
+    async def attempt(chapter: int, url: str) -> str:
+        await limiter.acquire(url)
+        return await loop.run_in_executor(executor, fetch, chapter, url)
+
+    async def work():
+        while (entry := await pending.get()) is not None:
+            chapter = int(entry["chapter"])
+            try:
+                if policy is None:
+                    text = await attempt(chapter, entry["url"])
+                else:
+                    text = await policy.acall(lambda: attempt(chapter, entry["url"]), chapter)
+                mark(chapter, FETCHED)
+                text = await loop.run_in_executor(executor, parse_chapter_text, chapter, text)
+                mark(chapter, PARSED)
+            except Exception as e:
+                log.error(f"Chapter {chapter}: {e!r}")
+                fail(chapter, repr(e))
+                continue
+            await finished.put((chapter, entry["title"], entry["url"], text))
+        await finished.put(None)
+
+    async def consume():
+        workers = concurrency
+        while workers:
+            result = await finished.get()
+            if result is None:
+                workers -= 1
+                continue
+            chapter = result[0]
+            try:
+                if asyncio.iscoroutinefunction(persist):
+                    chapter_dict = await persist(*result)
+                else:
+                    chapter_dict = await loop.run_in_executor(executor, persist, *result)
+            except Exception as e:
+                log.error(f"Chapter {chapter}: Unable to persist chapter: {e!r}")
+                fail(chapter, repr(e))
+                continue
+            mark(chapter, PERSISTED)
+            downloaded.append(chapter)
+            if progress is not None:
+                progress(chapter_dict)
+
+    try:
+        await asyncio.gather(produce(), consume(), *(work() for _ in range(concurrency)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    log.info(f"Downloaded {len(downloaded)} chapters; {len(failed)} failed.")
+    return {"downloaded": sorted(downloaded), "failed": failed}
+
+
+def run_download(chapters: Iterable[int], **kwargs) -> dict:
+    """
+    Synchronous entry point for `download_chapters`.
+
+    Args:
+        `chapters` (Iterable[int]):
+            The chapters to download.
+
+    Returns:
+        `results` (dict):
+            `downloaded`: the chapters persisted, `failed`: chapter -> error.
+    """
+    return asyncio.run(download_chapters(chapters, **kwargs))
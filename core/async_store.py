@@ -0,0 +1,392 @@
+# core/async_store.py
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from pymongo import ReplaceOne, UpdateOne
+
+from core.compression import decode_doc
+from core.log import log
+from core.storage import MongoRepository, Repository, invalidate, key_field, model, project, repository, to_mongo
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:
+    AsyncIOMotorClient = None
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Async Store                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+COLLECTIONS = ("chapter", "section")
+# Queued updates are written once BATCH_SIZE documents are waiting, or every FLUSH_INTERVAL seconds.
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 0.5
+# update() waits for a flush once this many documents are waiting.
+MAX_PENDING = 1000
+WORKERS = 4
+
+
+class CollectionNotSupported(Exception):
+    pass
+
+
+#> Backends
+class ThreadBackend:
+    """Awaitable access to a synchronous `Repository`, run on a small thread pool."""
+
+    name = "threads"
+
+    def __init__(self, repository: Repository, workers: int = WORKERS):
+        self.repository = repository
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="store")
+
+    def __repr__(self):
+        return f"ThreadBackend({self.repository!r})"
+
+    async def _run(self, func: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: func(*args, **kwargs))
+
+    async def get_many(self, collection, keys, fields):
+        return await self._run(self.repository.get_many, collection, keys, fields)
+
+    async def find(self, collection, fields, start, end, batch_size, filters) -> AsyncIterator[dict]:
+        docs = self.repository.find(collection, fields, start, end, batch_size, **filters)
+        while batch := await self._run(lambda: list(islice(docs, batch_size))):
+            for doc in batch:
+                yield doc
+
+    async def count(self, collection, start, end, filters):
+        return await self._run(self.repository.count, collection, start, end, **filters)
+
+    async def put(self, collection, docs):
+        return await self._run(self.repository.put, collection, docs)
+
+    async def update_many(self, collection, updates):
+        return await self._run(self.repository.update_many, collection, updates)
+
+    async def close(self):
+        self.executor.shutdown(wait=True)
+
+
+class MotorBackend:
+    """
+    Native asyncio access to MongoDB through motor.
+
+    Args:
+        `database` (str, optional):
+            The database to use. Defaults to "SUPERGENE".
+    """
+
+    name = "motor"
+
+    def __init__(self, database: str = "SUPERGENE"):
+        from core.atlas import get_atlas_uri, registry, resolve_db
+
+        self.database = resolve_db(database)
+        # The registry knows the database name the URI resolves to
+        self.db_name = registry.database(self.database).name
+        self.client = AsyncIOMotorClient(get_atlas_uri(self.database))
+
+    def __repr__(self):
+        return f"MotorBackend(database={self.database!r})"
+
+    def _collection(self, collection: str):
+        return self.client[self.db_name][model(collection)._get_collection_name()]
+
+    def _projection(self, collection: str, fields: Optional[tuple]) -> dict:
+        if fields is None:
+            return {"_id": False}
+        return {"_id": False, **{field: True for field in fields}}
+
+    def _query(self, collection, start, end, filters) -> dict:
+        query = dict(filters)
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = start
+        if end is not None:
+            bounds["$lte"] = end
+        if bounds:
+            query[key_field(collection)] = bounds
+        return query
+
+    async def get_many(self, collection, keys, fields):
+        key = key_field(collection)
+        cursor = self._collection(collection).find({key: {"$in": list(keys)}}, self._projection(collection, fields))
+        return [project(decode_doc(doc), fields) async for doc in cursor.sort(key, 1)]
+
+    async def find(self, collection, fields, start, end, batch_size, filters) -> AsyncIterator[dict]:
+        cursor = (
+            self._collection(collection)
+            .find(self._query(collection, start, end, filters), self._projection(collection, fields))
+            .sort(key_field(collection), 1)
+            .batch_size(batch_size)
+        )
+        async for doc in cursor:
+            yield project(decode_doc(doc), fields)
+
+    async def count(self, collection, start, end, filters):
+        return await self._collection(collection).count_documents(self._query(collection, start, end, filters))
+
+    async def put(self, collection, docs):
+        key = key_field(collection)
+        docs = list(docs)
+        if docs:
+            ops = [ReplaceOne({key: doc[key]}, to_mongo(collection, doc), upsert=True) for doc in docs]
+            await self._collection(collection).bulk_write(ops, ordered=False)
+            invalidate(collection, [doc[key] for doc in docs])
+        return len(docs)
+
+    async def update_many(self, collection, updates):
+        if not updates:
+            return 0
+        key = key_field(collection)
+        ops = [UpdateOne({key: k}, {"$set": to_mongo(collection, fields)}) for k, fields in updates.items()]
+        result = await self._collection(collection).bulk_write(ops, ordered=False)
+        invalidate(collection, list(updates))
+        return result.matched_count
+
+    async def close(self):
+        self.client.close()
+
+
+#> Store
+class AsyncStore:
+    """
+    An asyncio data layer for chapters and sections.
+
+    Reads are awaitable and batched: `get_many()` is one query for any number
+    of documents, and `find()` streams a projection in batches. Writes from
+    `update()` are queued, merged per document, and written in the background
+    as one bulk write per batch, so a fetch or render pipeline keeps going
+    while earlier results are persisted. `flush()` waits for everything queued
+    so far.
+
+    With motor installed and the MongoDB repository in use, the store talks to
+    MongoDB natively. Otherwise it runs the repository's synchronous calls on
+    a small thread pool, which works for every backend.
+
+        async with AsyncStore() as store:
+            titles = await store.get_many("chapter", range(1, 101), ("title",))
+            await store.update("chapter", 1, title="Ass Freak")
+
+    Args:
+        `repository` (Repository, optional):
+            The storage backend. Defaults to `core.storage.repository`.
+        `batch_size` (int, optional):
+            Documents per background bulk write. Defaults to BATCH_SIZE.
+        `flush_interval` (float, optional):
+            Seconds between background flushes of a partial batch. Defaults to FLUSH_INTERVAL.
+        `max_pending` (int, optional):
+            Queued documents at which `update()` waits for a flush. Defaults to MAX_PENDING.
+        `workers` (int, optional):
+            Threads for the thread backend. Defaults to WORKERS.
+        `use_motor` (bool, optional):
+            Force motor on or off. Defaults to using it when it is installed and the repository is MongoDB.
+    """
+
+    def __init__(
+        self,
+        repository: Repository = repository,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_pending: int = MAX_PENDING,
+        workers: int = WORKERS,
+        use_motor: Optional[bool] = None,
+    ):
+        if use_motor is None:
+            use_motor = AsyncIOMotorClient is not None and isinstance(repository, MongoRepository)
+        if use_motor:
+            if AsyncIOMotorClient is None:
+                raise ImportError("motor is not installed.")
+            self.backend = MotorBackend(getattr(repository, "database", "SUPERGENE"))
+        else:
+            self.backend = ThreadBackend(repository, workers)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.matched = 0
+        self.batches = 0
+        self._updates: dict[str, dict[int, dict]] = {collection: {} for collection in COLLECTIONS}
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # Held until they finish, so they aren't garbage collected mid-write and close() can wait for them
+        self._flushes: set[asyncio.Task] = set()
+        self._error: Optional[BaseException] = None
+
+    def __repr__(self):
+        return f"AsyncStore({self.backend!r}, pending={self.pending}, written={self.written}, batches={self.batches})"
+
+    async def __aenter__(self) -> "AsyncStore":
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, *exc_info) -> None:
+        await self.close(flush=exc_type is None)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(updates) for updates in self._updates.values())
+
+    def _check(self, collection: str) -> None:
+        if collection not in COLLECTIONS:
+            raise CollectionNotSupported(f"The async store does not handle {collection}.")
+
+    def _fields(self, collection: str, fields: Optional[Iterable[str]]) -> Optional[tuple]:
+        if fields is None:
+            return None
+        return tuple(dict.fromkeys((key_field(collection),) + tuple(fields)))
+
+    def start(self) -> None:
+        """Start the background flusher. Called by `async with`."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                # Surfaced by the next update() or flush()
+                self._error = e
+                log.error(f"Background flush failed: {e!r}")
+
+    #> Reads
+    async def get(self, collection: str, key: int, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        docs = await self.get_many(collection, (key,), fields)
+        return docs[0] if docs else None
+
+    async def get_many(self, collection: str, keys: Iterable[int], fields: Optional[Iterable[str]] = None) -> list[dict]:
+        """Retrieve the documents with the given keys in one query, in key order."""
+        self._check(collection)
+        keys = list(keys)
+        if not keys:
+            return []
+        return await self.backend.get_many(collection, keys, self._fields(collection, fields))
+
+    async def find(
+        self,
+        collection: str,
+        fields: Optional[Iterable[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        batch_size: int = 500,
+        **filters,
+    ) -> AsyncIterator[dict]:
+        """Stream documents in key order. See `Repository.find()`."""
+        self._check(collection)
+        async for doc in self.backend.find(collection, self._fields(collection, fields), start, end, batch_size, filters):
+            yield doc
+
+    async def count(self, collection: str, start: Optional[int] = None, end: Optional[int] = None, **filters) -> int:
+        self._check(collection)
+        return await self.backend.count(collection, start, end, filters)
+
+    #> Writes
+    async def put(self, collection: str, docs: Iterable[dict]) -> int:
+        """Insert or replace whole documents now, in one bulk write."""
+        self._check(collection)
+        return await self.backend.put(collection, docs)
+
+    async def update(self, collection: str, key: int, **fields) -> None:
+        """
+        Queue a `$set` of `fields` on one document.
+
+        Returns as soon as the update is queued, unless MAX_PENDING documents
+        are already waiting, in which case it waits for them to be written.
+        """
+        self._check(collection)
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        queued = self._updates[collection].setdefault(key, {})
+        queued.update(fields)
+        pending = self.pending
+        if pending >= self.max_pending:
+            await self.flush()
+        elif pending >= self.batch_size and (self._flush_lock is None or not self._flush_lock.locked()):
+            task = asyncio.create_task(self._flush_in_background())
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush_in_background(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            self._error = e
+            log.error(f"Background flush failed: {e!r}")
+
+    async def flush(self) -> None:
+        """Write every queued update, one bulk write per collection and batch."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            for collection in COLLECTIONS:
+                while self._updates[collection]:
+                    queue = self._updates[collection]
+                    updates = dict(islice(queue.items(), self.batch_size))
+                    # Taken off the queue so updates made during the write start a new batch
+                    for key in updates:
+                        del queue[key]
+                    try:
+                        matched = await self.backend.update_many(collection, updates)
+                    except BaseException:
+                        # Requeue the batch under anything queued since, so nothing is lost
+                        for key, fields in updates.items():
+                            queue[key] = {**fields, **queue.get(key, {})}
+                        raise
+                    self.matched += matched
+                    self.written += len(updates)
+                    self.batches += 1
+                    log.debug(f"Wrote {len(updates)} queued {collection} updates.")
+
+    async def close(self, flush: bool = True) -> None:
+        """Stop the background flusher, write what is queued, and release the backend."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        if self._flushes:
+            await asyncio.gather(*self._flushes)
+        if flush:
+            await self.flush()
+        await self.backend.close()
+        log.debug(f"Closed {self!r}")
+
+
+def chapter_persister(store: AsyncStore, save: Optional[Callable[..., dict]] = None) -> Callable:
+    """
+    A `download_chapters` persist coroutine that writes each chapter to disk and queues it for the database.
+
+    The file writes run on a thread and the database write joins the store's
+    next bulk write, so neither holds up the downloads still in flight.
+
+    Args:
+        `store` (AsyncStore):
+            The store to queue chapter updates on.
+        `save` (Callable, optional):
+            Writes a chapter to disk. Defaults to `save_chapter_text`.
+    """
+    if save is None:
+        from core.mt_get_text import save_chapter_text
+
+        save = save_chapter_text
+
+    async def persist(chapter: int, title: str, url: str, text: str) -> dict:
+        loop = asyncio.get_running_loop()
+        chapter_dict = await loop.run_in_executor(None, save, chapter, title, url, text)
+        await store.update("chapter", chapter, title=title, url=url, text=text)
+        return chapter_dict
+
+    return persist
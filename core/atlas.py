@@ -4,10 +4,12 @@ import re
 import sys
 from multiprocessing.sharedctypes import Value
 from platform import platform
+from threading import RLock
 from typing import Optional
 
 from dotenv import dotenv_values, load_dotenv
-from mongoengine import connect, disconnect_all
+from mongoengine import connect, disconnect, disconnect_all
+from mongoengine.connection import get_connection, get_db
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, InvalidURI, NetworkTimeout
 
@@ -63,38 +65,126 @@ def get_atlas_uri(database: str = "SUPERGENE"):
     return URI
 
 
-@errwrap(entry=False, exit=False)
-def sg(database: str = "SUPERGENE"):
+def resolve_db(database: str = "SUPERGENE") -> str:
     """
-    Custom Connection function to connect to MongoDB Database
+    Normalize a database name to SUPERGENE, MAKE_SUPERGENE, or LOCALDB.
 
-    Args:
-        `database` (Optional[str]):
-            The alternative database you would like to connect to. Default is 'SUPERGENE'.
+    Raises:
+        `ConnectionError`: The name is not a known database.
     """
-    # > Get Connection URI
-    disconnect_all()
-
     db_lower = str(database).lower()
     if "supergene" in db_lower:
         if "make" in db_lower:
-            db = "MAKE_SUPERGENE"
+            return "MAKE_SUPERGENE"
         elif db_lower == "supergene":
-            db = "SUPERGENE"
-        else:
-            raise ConnectionError(f"{database} is not a valid DB.")
-    elif db_lower == 'localdb':
-        db = "LOCALDB"
-    else:
-        raise ConnectionError(f"{database} is not a valid DB.")
+            return "SUPERGENE"
+    elif db_lower == "localdb":
+        return "LOCALDB"
+    raise ConnectionError(f"{database} is not a valid DB.")
+
+
+class ConnectionRegistry:
+    """
+    The process-wide MongoDB connections.
+
+    Each logical database is connected once, lazily, under a mongoengine alias of
+    its own name, so its client (and its TLS session and pool) lives for the
+    whole process. `sg(db)` then only points the `default` alias, which the
+    documents use, at that database; mongoengine reuses the existing client
+    because the connection settings match. Switching back and forth never opens
+    a new connection, and calling `sg()` for the database already in use costs
+    a lock and a comparison.
+
+    The registry is thread-safe. After a fork the child drops the connections it
+    inherited and reconnects on first use, since MongoClients are not fork-safe.
+    """
+
+    def __init__(self):
+        self._lock = RLock()
+        self.pid = os.getpid()
+        self.active: Optional[str] = None
+        self.registered: set[str] = set()
+        self.connects = 0
+        self.switches = 0
+        self.reuses = 0
+
+    def __repr__(self):
+        return f"ConnectionRegistry(active={self.active!r}, registered={sorted(self.registered)}, connects={self.connects}, switches={self.switches}, reuses={self.reuses})"
 
-    URI = get_atlas_uri(db)
-    log.debug(f"Retrieved connection URI: {URI}")
+    def _check_fork(self) -> None:
+        if self.pid != os.getpid():
+            self.reset()
 
+    def reset(self) -> None:
+        """Forget every connection. Used after a fork, and by tests."""
+        with self._lock:
+            try:
+                disconnect_all()
+            except Exception as e:
+                log.debug(f"Error dropping inherited MongoDB connections: {e}")
+            self.pid = os.getpid()
+            self.active = None
+            self.registered.clear()
+
+    def _register(self, db: str) -> None:
+        if db in self.registered:
+            return
+        URI = get_atlas_uri(db)
+        connect(db, alias=db, host=URI)
+        self.registered.add(db)
+        self.connects += 1
+        log.debug(f"Connected to {db}")
+
+    def use(self, db: str) -> None:
+        """Make `db` the database of the `default` alias, connecting it on first use."""
+        db = resolve_db(db)
+        with self._lock:
+            self._check_fork()
+            if self.active == db:
+                self.reuses += 1
+                return
+            self._register(db)
+            disconnect("default")
+            connect(db, alias="default", host=get_atlas_uri(db))
+            self.active = db
+            self.switches += 1
+
+    def client(self, db: str) -> MongoClient:
+        """The shared pymongo client of `db`, connecting it on first use."""
+        db = resolve_db(db)
+        with self._lock:
+            self._check_fork()
+            self._register(db)
+            return get_connection(alias=db)
+
+    def database(self, db: str):
+        """The pymongo database of `db`, connecting it on first use without touching the `default` alias."""
+        db = resolve_db(db)
+        with self._lock:
+            self._check_fork()
+            self._register(db)
+            return get_db(alias=db)
+
+
+registry = ConnectionRegistry()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=registry.reset)
+
+
+@errwrap(entry=False, exit=False)
+def sg(database: str = "SUPERGENE"):
+    """
+    Custom Connection function to connect to MongoDB Database
+
+    Connections are cached in `registry`, so calling this before every query is cheap.
+
+    Args:
+        `database` (Optional[str]):
+            The alternative database you would like to connect to. Default is 'SUPERGENE'.
+    """
     # > Attempt to connect to MongoDB
     try:
-        connect(db, host=URI)
-        log.debug(f"Connected to {database}")
+        registry.use(database)
     except ConnectionError as ce:
         log.error(f"Connection Error: {ce}")
         raise ce
@@ -108,24 +198,15 @@ def mconnect(db: Optional[str] = "SUPERGENE") -> MongoClient:
     """
     Custom function to connect to MongoDB with pymongo.
 
+    Returns the registry's shared client; don't close it.
+
     Args:
         `database` (Optional[str]):
             The alternative database you would like to connect to. Default is 'SUPERGENE'.
     """
-    if db == "SUPERGENE":
-        URI = get_atlas_uri(db)
-        private_client = private_client = MongoClient(URI, maxPoolSize=10000)
-        return private_client
-
-    # > Get Connection URI
-    disconnect_all()
-    URI = get_atlas_uri()
-    log.debug(f"Retrieved connection URI: {URI}")
-
     # > Attempt to connect to MongoDB
     try:
-        client = MongoClient(URI)
-        log.debug(f"Connected to MongoDB")
+        client = registry.client(db)
     except ConnectionFailure as ce:
         log.error(f"Connection Error: {ce}")
         raise ce
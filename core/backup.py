@@ -0,0 +1,223 @@
+# core/backup.py
+
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from json import dump, dumps, load, loads
+from multiprocessing import get_context
+from os.path import basename, exists
+from time import perf_counter
+from typing import Iterable, Optional
+
+from core.base import BASE
+from core.boundaries import BOOKS, book_range
+from core.log import errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                             Backup                              │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+BACKUP_DIR = f"{BASE}/json/backup"
+MANIFEST = "manifest.json"
+# Every Chapter field; pass `fields` to leave some out, e.g. unparsed_text.
+EXPORT_FIELDS = (
+    "chapter", "section", "book", "title", "text", "filename",
+    "md_path", "html_path", "md", "html", "url", "unparsed_text",
+)
+# Book -> (first chapter, last chapter).
+BOOK_RANGES = {book: book_range(book) for book in range(1, BOOKS + 1)}
+BATCH_SIZE = 200
+GZIP_LEVEL = 6
+
+
+class BackupInvalid(Exception):
+    pass
+
+
+def shard_name(book: int, compress: bool) -> str:
+    return f"chapters-book{str(book).zfill(2)}.ndjson{'.gz' if compress else ''}"
+
+
+def open_shard(path: str, mode: str, compress: bool):
+    if compress:
+        return gzip.open(path, f"{mode}t", encoding="utf-8", compresslevel=GZIP_LEVEL)
+    return open(path, mode, encoding="utf-8")
+
+
+def file_digest(path: str) -> str:
+    digest = sha256()
+    with open(path, "rb") as infile:
+        while chunk := infile.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+#> Export
+def export_shard(book: int, path: str, fields: tuple, batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Stream one book's chapters to an NDJSON shard, one chapter per line.
+
+    Runs in its own process with its own cursor. The shard is written to a
+    temporary file and renamed once complete, so a shard on disk is never partial.
+    """
+    from core.storage import repository
+
+    first, last = BOOK_RANGES[book]
+    tmp = f"{path}.tmp"
+    chapters = 0
+    with open_shard(tmp, "w", path.endswith(".gz")) as outfile:
+        for doc in repository.find("chapter", fields, first, last, batch_size):
+            outfile.write(dumps(doc, ensure_ascii=False))
+            outfile.write("\n")
+            chapters += 1
+    os.replace(tmp, path)
+    return {
+        "book": book,
+        "file": basename(path),
+        "first": first,
+        "last": last,
+        "chapters": chapters,
+        "bytes": os.path.getsize(path),
+        "sha256": file_digest(path),
+    }
+
+
+@errwrap()
+def export_chapters(
+    out_dir: str = BACKUP_DIR,
+    compress: bool = True,
+    fields: Iterable[str] = EXPORT_FIELDS,
+    books: Optional[Iterable[int]] = None,
+    workers: Optional[int] = None,
+) -> dict:
+    """
+    Back up the chapters as NDJSON, one shard per book, exported in parallel.
+
+    Each book is streamed by its own process through its own cursor over its
+    chapter range, so memory stays flat however large the chapters are, and
+    the gzip work is spread across cores. A manifest records each shard's
+    chapter count, size, and checksum for `import_chapters()`.
+
+    Args:
+        `out_dir` (str, optional):
+            The backup directory. Defaults to BACKUP_DIR.
+        `compress` (bool, optional):
+            Gzip the shards. Defaults to True.
+        `fields` (Iterable[str], optional):
+            The Chapter fields to export. Defaults to EXPORT_FIELDS.
+        `books` (Iterable[int], optional):
+            The books to export. Defaults to every book.
+        `workers` (int, optional):
+            Processes to export with. Defaults to one per book, up to the CPU count.
+
+    Returns:
+        `manifest` (dict):
+            The fields exported and each shard's details.
+    """
+    books = sorted(books) if books is not None else sorted(BOOK_RANGES)
+    fields = tuple(dict.fromkeys(("chapter",) + tuple(fields)))
+    workers = workers or min(len(books), os.cpu_count() or 1)
+    os.makedirs(out_dir, exist_ok=True)
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        futures = [
+            executor.submit(export_shard, book, f"{out_dir}/{shard_name(book, compress)}", fields)
+            for book in books
+        ]
+        shards = [future.result() for future in futures]
+    manifest = {"fields": list(fields), "compressed": compress, "shards": shards}
+    with open(f"{out_dir}/{MANIFEST}", "w") as outfile:
+        dump(manifest, outfile, indent=4)
+    chapters = sum(shard["chapters"] for shard in shards)
+    size = sum(shard["bytes"] for shard in shards)
+    log.info(
+        f"Exported {chapters} chapters to {len(shards)} shards in {out_dir} "
+        f"({size / 1e6:.1f} MB, {perf_counter() - start:.1f}s, {workers} workers)."
+    )
+    return manifest
+
+
+#> Import
+def import_shard(path: str, expected: Optional[int] = None, batch_size: int = BATCH_SIZE) -> dict:
+    """Restore one shard with a bulk write per batch of chapters. Runs in its own process."""
+    from core.storage import repository
+
+    chapters, batch = 0, []
+    with open_shard(path, "r", path.endswith(".gz")) as infile:
+        for line in infile:
+            if not line.strip():
+                continue
+            batch.append(loads(line))
+            if len(batch) >= batch_size:
+                chapters += repository.put("chapter", batch)
+                batch = []
+    if batch:
+        chapters += repository.put("chapter", batch)
+    if expected is not None and chapters != expected:
+        raise BackupInvalid(f"{basename(path)}: restored {chapters} chapters, the manifest lists {expected}.")
+    return {"file": basename(path), "chapters": chapters}
+
+
+@errwrap()
+def import_chapters(
+    in_dir: str = BACKUP_DIR,
+    verify: bool = True,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+) -> list[dict]:
+    """
+    Restore a backup made by `export_chapters()`, one process per shard.
+
+    Chapters are written with bulk upserts keyed by chapter, so restoring
+    into a populated collection replaces the chapters in the backup and leaves
+    the rest alone, and an interrupted restore can be run again.
+
+    Args:
+        `in_dir` (str, optional):
+            The backup directory. Defaults to BACKUP_DIR.
+        `verify` (bool, optional):
+            Check each shard's checksum before restoring anything, and its chapter count after. Defaults to True.
+        `workers` (int, optional):
+            Processes to import with. Defaults to one per shard, up to the CPU count.
+        `batch_size` (int, optional):
+            Chapters per bulk write. Defaults to BATCH_SIZE.
+
+    Raises:
+        `BackupInvalid`: A shard is missing, or doesn't match the manifest.
+
+    Returns:
+        `results` (list[dict]):
+            The chapters restored from each shard.
+    """
+    manifest_path = f"{in_dir}/{MANIFEST}"
+    if not exists(manifest_path):
+        raise BackupInvalid(f"No backup manifest in {in_dir}.")
+    with open(manifest_path, "r") as infile:
+        manifest = dict(load(infile))
+    shards = manifest["shards"]
+    for shard in shards:
+        path = f"{in_dir}/{shard['file']}"
+        if not exists(path):
+            raise BackupInvalid(f"Missing shard: {path}")
+        if verify and file_digest(path) != shard["sha256"]:
+            raise BackupInvalid(f"Checksum mismatch: {path}")
+    workers = workers or min(len(shards), os.cpu_count() or 1)
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+        futures = [
+            executor.submit(
+                import_shard,
+                f"{in_dir}/{shard['file']}",
+                shard["chapters"] if verify else None,
+                batch_size,
+            )
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]
+    log.info(
+        f"Restored {sum(result['chapters'] for result in results)} chapters from {len(results)} shards "
+        f"in {perf_counter() - start:.1f}s."
+    )
+    return results
@@ -13,6 +13,7 @@ from tqdm.auto import tqdm
 from core.base import BASE
 from core.atlas import max_title, sg
 from core.log import errwrap, log
+from core.storage import repository
 
 # . ############################################################### . #
 # .                                                                 . #
@@ -40,6 +41,7 @@ class Book (Document):
     end = IntField(max_value=3463)
     book = IntField()
     book_word = StringField(required=True)
+    meta = {"indexes": ["book"], "auto_create_index": False}
 
 
 # > Declaring Static Variables
@@ -48,17 +50,17 @@ edited: str = "Complied and Edited by Max Ludden"
 TEXT = f'<p class="title">{written}</p>\n<p class="title">{edited}</p>'
 
 def generate_output_file(book: int):
-    book_result = books.find_one({'book':book})
+    book_result = repository.get("book", book)
     pprint(book_result)
     output = book_result['output']
     return output
 
 
 def get_output_file(book: int):
-    sg()
-    for doc in Book.objects(book=book):
-        print(doc.output)
-        return doc.output
+    doc = repository.get("book", book, ("output",))
+    if doc is not None:
+        print(doc["output"])
+        return doc["output"]
         
 
     
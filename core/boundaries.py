@@ -0,0 +1,106 @@
+# core/boundaries.py
+
+from bisect import bisect_left
+from typing import Iterable
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Boundaries                             │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+# The last chapter of each section; section n ends at SECTION_ENDS[n - 1].
+SECTION_ENDS = (424, 882, 1338, 1679, 1711, 1821, 1960, 2165, 2204, 2299, 2443, 2639, 2765, 2891, 3033, 3303, 3462)
+# The book of each section; section n is in SECTION_BOOKS[n - 1].
+SECTION_BOOKS = (1, 2, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10)
+FIRST_CHAPTER = 1
+LAST_CHAPTER = SECTION_ENDS[-1]
+SECTIONS = len(SECTION_ENDS)
+BOOKS = SECTION_BOOKS[-1]
+
+# Dense lookup tables, indexed by chapter (or section); index 0 is unused.
+CHAPTER_SECTIONS = bytes(
+    [0] + [bisect_left(SECTION_ENDS, chapter) + 1 for chapter in range(FIRST_CHAPTER, LAST_CHAPTER + 1)]
+)
+SECTION_BOOK_TABLE = bytes((0,) + SECTION_BOOKS)
+CHAPTER_BOOKS = bytes(SECTION_BOOK_TABLE[section] for section in CHAPTER_SECTIONS)
+
+
+class InvalidChapter(ValueError):
+    pass
+
+
+class InvalidSection(ValueError):
+    pass
+
+
+class InvalidBook(ValueError):
+    pass
+
+
+#> Single lookups
+def section_of(chapter: int) -> int:
+    """The section the given chapter belongs to."""
+    if not FIRST_CHAPTER <= chapter <= LAST_CHAPTER:
+        raise InvalidChapter("Invalid Chapter", f"\nChapter: {chapter}")
+    return CHAPTER_SECTIONS[chapter]
+
+
+def book_of(chapter: int) -> int:
+    """The book the given chapter belongs to."""
+    if not FIRST_CHAPTER <= chapter <= LAST_CHAPTER:
+        raise InvalidChapter("Invalid Chapter", f"\nChapter: {chapter}")
+    return CHAPTER_BOOKS[chapter]
+
+
+def book_of_section(section: int) -> int:
+    """The book the given section belongs to."""
+    if not 1 <= section <= SECTIONS:
+        raise InvalidSection("Invalid Section", f"\nSection: {section}")
+    return SECTION_BOOK_TABLE[section]
+
+
+#> Ranges
+def section_range(section: int) -> tuple[int, int]:
+    """The first and last chapter of the given section."""
+    if not 1 <= section <= SECTIONS:
+        raise InvalidSection("Invalid Section", f"\nSection: {section}")
+    first = SECTION_ENDS[section - 2] + 1 if section > 1 else FIRST_CHAPTER
+    return first, SECTION_ENDS[section - 1]
+
+
+def book_sections(book: int) -> tuple[int, ...]:
+    """The sections of the given book, in order."""
+    if not 1 <= book <= BOOKS:
+        raise InvalidBook("Invalid Book", f"\nBook: {book}")
+    return tuple(section for section, section_book in enumerate(SECTION_BOOKS, 1) if section_book == book)
+
+
+def book_range(book: int) -> tuple[int, int]:
+    """The first and last chapter of the given book."""
+    sections = book_sections(book)
+    return section_range(sections[0])[0], section_range(sections[-1])[1]
+
+
+#> Many lookups
+def sections_of(chapters: Iterable[int]) -> list[int]:
+    """
+    The section of each of the given chapters, in order.
+
+    Indexes the lookup table directly rather than calling `section_of()` per
+    chapter, so it is the one to use in loops over many chapters.
+
+    Raises:
+        `InvalidChapter`: A chapter is outside FIRST_CHAPTER..LAST_CHAPTER.
+    """
+    chapters = list(chapters)
+    if chapters and (min(chapters) < FIRST_CHAPTER or max(chapters) > LAST_CHAPTER):
+        raise InvalidChapter("Invalid Chapter", f"\nChapters: {min(chapters)}..{max(chapters)}")
+    return list(map(CHAPTER_SECTIONS.__getitem__, chapters))
+
+
+def books_of(chapters: Iterable[int]) -> list[int]:
+    """The book of each of the given chapters, in order. See `sections_of()`."""
+    chapters = list(chapters)
+    if chapters and (min(chapters) < FIRST_CHAPTER or max(chapters) > LAST_CHAPTER):
+        raise InvalidChapter("Invalid Chapter", f"\nChapters: {min(chapters)}..{max(chapters)}")
+    return list(map(CHAPTER_BOOKS.__getitem__, chapters))
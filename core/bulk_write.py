@@ -0,0 +1,136 @@
+# core/bulk_write.py
+
+from typing import Any, Optional
+
+from mongoengine import Document
+
+import core.storage as storage
+from core.log import log
+from core.storage import Repository
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                           Bulk Write                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+BATCH_SIZE = 500
+
+
+class BulkWriter:
+    """
+    Collects per-document field updates and sends them as bulk writes.
+
+    Each `update()` queues a `$set` on the document with that key. Every
+    `batch_size` updates are flushed as one `bulk_update()` of the storage
+    repository, so a pass over the whole corpus costs a handful of round trips
+    instead of one per document, and lands in the same backend it was read
+    from. Values are validated by the document's fields before they are
+    queued, the same as `Document.save()` would. The repository drops updated
+    chapters from the chapter cache.
+
+    Use it as a context manager so the last batch is flushed:
+
+        with BulkWriter(Chapter) as writer:
+            for doc in iter_chapters(("filename",)):
+                writer.update(doc["chapter"], filename=generate_filename(doc["chapter"]))
+        log.info(writer.result())
+
+    Args:
+        `document` (type[Document]):
+            The mongoengine document class whose collection is updated.
+        `batch_size` (int, optional):
+            Updates sent per bulk write. Defaults to BATCH_SIZE.
+        `ordered` (bool, optional):
+            Stop a batch at its first error instead of attempting every update. Defaults to False.
+        `repository` (Repository, optional):
+            Where the updates are written. Defaults to `core.storage.repository`.
+    """
+
+    def __init__(
+        self,
+        document: type[Document],
+        batch_size: int = BATCH_SIZE,
+        ordered: bool = False,
+        repository: Optional[Repository] = None,
+    ):
+        if batch_size < 1:
+            raise ValueError("Invalid batch size.", f"batch_size: {batch_size}")
+        self.document = document
+        self.collection = document._get_collection_name()
+        self.repository = repository or storage.repository
+        self.batch_size = batch_size
+        self.ordered = ordered
+        self.matched = 0
+        self.modified = 0
+        self.batches = 0
+        self.errors: list[dict] = []
+        self._updates: dict[Any, dict] = {}
+
+    def __repr__(self):
+        return f"BulkWriter({self.document.__name__}, batch_size={self.batch_size}, ordered={self.ordered}, pending={len(self._updates)}, matched={self.matched}, modified={self.modified})"
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def __len__(self):
+        return len(self._updates)
+
+    def _validate(self, fields: dict) -> dict:
+        for name, value in fields.items():
+            field = self.document._fields.get(name)
+            if field is None:
+                raise ValueError(f"Invalid {self.document.__name__} field.", f"field: {name}")
+            if value is not None:
+                field.validate(value)
+        return fields
+
+    def update(self, key: Any, **fields) -> None:
+        """
+        Queue a `$set` of `fields` on the document whose key is `key`.
+
+        Args:
+            `key` (Any):
+                The value of the document's key field, e.g. the chapter number.
+            `**fields`:
+                Field name -> new value.
+        """
+        if not fields:
+            return
+        # A second update of the same document before a flush is merged into the first
+        self._updates.setdefault(key, {}).update(self._validate(fields))
+        if len(self._updates) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> Optional[dict]:
+        """
+        Send the queued updates.
+
+        Returns:
+            `result` (dict | None):
+                The matched and modified counts of this batch, or None if nothing was queued.
+        """
+        if not self._updates:
+            return None
+        updates, self._updates = self._updates, {}
+        result = self.repository.bulk_update(self.collection, updates, ordered=self.ordered)
+        matched, modified = result["matched"], result["modified"]
+        if result["errors"]:
+            self.errors.extend(result["errors"])
+            log.error(f"{len(result['errors'])} errors in a bulk write of {len(updates)} {self.document.__name__} updates.")
+        self.matched += matched
+        self.modified += modified
+        self.batches += 1
+        log.debug(f"Bulk wrote {len(updates)} {self.document.__name__} updates: {matched} matched, {modified} modified.")
+        return {"matched": matched, "modified": modified}
+
+    def result(self) -> dict:
+        return {
+            "matched": self.matched,
+            "modified": self.modified,
+            "batches": self.batches,
+            "errors": len(self.errors),
+        }
@@ -6,7 +6,7 @@ import sys
 from fileinput import filename
 from platform import platform
 from subprocess import run
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, Optional
 from json import dump, load
 from multiprocessing import Pool, Queue, Process
 from functools import partial
@@ -22,6 +22,11 @@ from alive_progress import alive_bar
 from dotenv import load_dotenv
 
 from core.atlas import max_title, sg, mconnect, BASE
+from core.boundaries import book_of, section_of
+from core.bulk_write import BATCH_SIZE, BulkWriter
+from core.chapter_cache import MISSING, chapter_cache
+from core.compression import COMPRESSION, CompressedStringField, decode_doc
+from core.storage import repository
 from core.log import errwrap, log
 
 
@@ -31,6 +36,15 @@ from core.log import errwrap, log
 #
 load_dotenv()
 URI = os.getenv("SUPERGENE")
+# The small Chapter fields; get_metadata() returns these by default.
+META_FIELDS = ("chapter", "section", "book", "title", "filename", "md_path", "html_path", "url")
+# Chapters per cursor batch when streaming with iter_chapters(); smaller when text, md, or html come along.
+ITER_BATCH_SIZE = 500
+ITER_TEXT_BATCH_SIZE = 50
+# The text index over title and text that search() uses.
+TEXT_INDEX = "chapter_text"
+# Repository scope -> whether any chapter text is stored compressed; see has_compressed_text().
+_compressed_text: dict[str, bool] = {}
 
 
 class ChapterNotFound(Exception):
@@ -42,14 +56,29 @@ class Chapter(Document):
     section = IntField()
     book = IntField(min_value=1, max_value=10, required=True)
     title = StringField(max_length=500, required=True)
-    text = StringField()
+    text = CompressedStringField()
     filename = StringField()
     md_path = StringField()
     html_path = StringField()
-    md = StringField()
-    html = StringField()
+    md = CompressedStringField()
+    html = CompressedStringField()
     url = URLField()
-    unparsed_text = StringField()
+    unparsed_text = CompressedStringField()
+    # Built by `core.indexes.bootstrap()`, not on first access
+    meta = {
+        "indexes": [
+            ("book", "chapter"),
+            ("section", "chapter"),
+            {
+                "fields": ["$title", "$text"],
+                "name": TEXT_INDEX,
+                # No stemming or stop words, so phrase searches match what was typed
+                "default_language": "none",
+                "weights": {"title": 10, "text": 1},
+            },
+        ],
+        "auto_create_index": False,
+    }
 
     # def __init__(self, *args, **kwargs):
     #     super().__init__(*args, **kwargs)
@@ -67,33 +96,17 @@ class Chapter(Document):
         text = f"\n \nText:\n  \n{self.text}\n"
         html = f"\n \nHTML:\n  \n{self.html}"
         return f"\n \n{yaml_doc}{md}{text}{html}"
-        
-class chapter_gen:
-    '''
-    Generator for chapter_numbers.
-    '''
-    def __init__(self, start: int = 1, end: int = 3462):
-        self.start = start
-        self.end = end
-        self.chapter_number = start
-    def __iter__(self):
-        return self
-    def __next__(self):
-        if self.chapter_number >= 3462:
-            raise StopIteration
-        elif self.chapter_number == 3094:
-            # Skipping chapter 3095
-            # 3094 + 1 + 1 = 3096
-            self.chapter_number += 1
-        elif self.chapter_number == 3116:
-            # Skipping chapter 3117
-            # 3116 + 1 + 1 = 3118
-            self.chapter_number += 1
-        else:
-            self.chapter_number += 1
-            return self.chapter_number
-                
-@errwrap()
+
+    def save(self, *args, **kwargs):
+        # Keep the chapter cache from serving stale fields
+        result = super().save(*args, **kwargs)
+        chapter_cache.invalidate(self.chapter)
+        return result
+
+    def delete(self, *args, **kwargs):
+        chapter_cache.invalidate(self.chapter)
+        return super().delete(*args, **kwargs)
+
 def generate_section(chapter: int):
     """
     Determines the given chapter's section.
@@ -103,55 +116,55 @@ def generate_section(chapter: int):
             The given chapter.
 
     Raises:
-        `ValueError`: Invalid Chapter Number
+        `InvalidChapter`: Invalid Chapter Number
 
     Returns:
         `section` (int):
             The section that the given chapter belongs to.
     """
-    log.debug(f"Called generate_section(chapter={chapter})")
-    if chapter <= 424:
-        return 1
-    elif chapter <= 882:
-        return 2
-    elif chapter <= 1338:
-        return 3
-    elif chapter <= 1679:
-        return 4
-    elif chapter <= 1711:
-        return 5
-    elif chapter <= 1821:
-        return 6
-    elif chapter <= 1960:
-        return 7
-    elif chapter <= 2165:
-        return 8
-    elif chapter <= 2204:
-        return 9
-    elif chapter <= 2299:
-        return 10
-    elif chapter <= 2443:
-        return 11
-    elif chapter <= 2639:
-        return 12
-    elif chapter <= 2765:
-        return 13
-    elif chapter <= 2891:
-        return 14
-    elif chapter <= 3033:
-        if chapter == 3095:
-            log.warning(f"Chapter {chapter} was inputted to generate_section().\nChapter {chapter} does not exist.")
-        elif chapter == 3117:
-            log.warning(f"Chapter {chapter} was inputted to generate_section(). \nChapter {chapter} does not exist.")
-            pass
+    return section_of(chapter)
+
+
+#> Cached field access
+def get_fields(chapter: int, fields: Iterable[str]) -> Optional[dict]:
+    """
+    Retrieve some fields of a chapter, from the chapter cache where possible.
+
+    Fields that aren't cached are fetched together in one projected query and cached.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+        `fields` (Iterable[str]):
+            The Chapter fields to retrieve.
+
+    Returns:
+        `fields` (dict | None):
+            Field -> value, or None if the chapter is not in MongoDB.
+    """
+    db = repository.scope
+    values, missing = {}, []
+    for field in fields:
+        value = chapter_cache.get(chapter, field, db)
+        if value is MISSING:
+            missing.append(field)
         else:
-            return 15
-    elif chapter <= 3303:
-        return 16
-    elif chapter <= 3462:
-        return 17
-    else:
-        raise ValueError("Invalid Chapter", f"\nChapter: {chapter}")
+            values[field] = value
+    if missing:
+        doc = repository.get("chapter", chapter, missing)
+        if doc is None:
+            return None
+        for field in missing:
+            values[field] = doc.get(field)
+            chapter_cache.put(chapter, field, values[field], db)
+    return values
+
+
+def get_field(chapter: int, field: str):
+    """Retrieve one field of a chapter, or None if the chapter is not in MongoDB."""
+    fields = get_fields(chapter, (field,))
+    if fields is not None:
+        return fields[field]
 
 
 @errwrap()
@@ -170,12 +183,9 @@ def get_section(chapter: int):
         `section` (int):
             The section of the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.section
+    return get_field(chapter, "section")
 
 
-@errwrap()
 def generate_book(chapter: int):
     """
     Generate the book for a given chapter.
@@ -185,58 +195,13 @@ def generate_book(chapter: int):
             The given chapter.
 
     Raises:
-        `ValueError`: Invalid Section Number
+        `InvalidChapter`: Invalid Chapter Number
 
     Returns:
         `book` (int):
             The book of the given chapter
     """
-    section = generate_section(chapter)
-    match section:
-        case 1:
-            return 1
-        case 2:
-            return 2
-        case 3:
-            return 3
-        case 4 | 5:
-            return 4
-        case 6 | 7:
-            return 5
-        case 8 | 9:
-            return 6
-        case 10 | 11:
-            return 7
-        case 12 | 13:
-            return 8
-        case 14 | 15:
-            return 9
-        case 16 | 17:
-            return 10
-    # section = generate_section(chapter)
-    # log.debug(f"Section: {section}")
-    # if section == 1:
-    #     return 1
-    # elif section == 2:
-    #     return 2
-    # elif section == 3:
-    #     return 3
-    # elif section == 4 | section == 5:
-    #     return 4
-    # elif section == 6 | section == 7:
-    #     return 5
-    # elif section == 8 | section == 9:
-    #     return 6
-    # elif section == 10 | section == 11:
-    #     return 7
-    # elif section == 12 | section == 13:
-    #     return 8
-    # elif section == 14 | section == 15:
-    #     return 9
-    # elif section == 16 | section == 17:
-    #     return 10
-    # else:
-    #     raise ValueError("Invalid Section Input.", f"Section: {section}")
+    return book_of(chapter)
 
 
 @errwrap()
@@ -252,9 +217,7 @@ def get_book(chapter: int):
         `book` (int):
             The book for the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.book
+    return get_field(chapter, "book")
 
 
 @errwrap()
@@ -270,10 +233,9 @@ def get_title(chapter: int):
         `title` (str):
             The title of the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        title = max_title(doc.title)
-        return title
+    title = get_field(chapter, "title")
+    if title is not None:
+        return max_title(title)
 
 
 @errwrap()
@@ -306,9 +268,7 @@ def get_filename(chapter: int):
         `filename` (str):
             The filename of the given chapter without a file extension.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.filename
+    return get_field(chapter, "filename")
 
 
 @errwrap()
@@ -355,9 +315,7 @@ def get_md_path(chapter: int):
         `md_path` (str):
             The filepath for the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.md_path
+    return get_field(chapter, "md_path")
 
 
 @errwrap()
@@ -402,9 +360,123 @@ def get_html_path(chapter: int):
         `html_path` (str):
             The filepath of the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.html_path
+    return get_field(chapter, "html_path")
+
+
+#> Projected iteration
+def chapter_filters(book: Optional[int] = None, section: Optional[int] = None) -> dict:
+    """Build the repository filters for a book and/or section."""
+    filters = {}
+    if book is not None:
+        filters["book"] = book
+    if section is not None:
+        filters["section"] = section
+    return filters
+
+
+def check_fields(fields: Iterable[str]) -> tuple[str, ...]:
+    """Validate Chapter field names, returning them as a tuple."""
+    fields = tuple(fields)
+    unknown = set(fields) - set(Chapter._fields)
+    if unknown:
+        raise ValueError("Invalid Chapter field.", f"fields: {sorted(unknown)}")
+    return fields
+
+
+def count_chapters(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    book: Optional[int] = None,
+    section: Optional[int] = None,
+) -> int:
+    """Count the chapters `iter_chapters()` would yield, e.g. for a progress bar's total."""
+    return repository.count("chapter", start, end, **chapter_filters(book, section))
+
+
+def iter_chapters(
+    fields: Iterable[str] = META_FIELDS,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    book: Optional[int] = None,
+    section: Optional[int] = None,
+    batch_size: int = ITER_BATCH_SIZE,
+) -> Iterator[dict]:
+    """
+    Stream chapters in chapter order, with only the requested fields.
+
+    The storage backend sends back only `fields`, and each chapter is yielded
+    as a plain dict rather than a Chapter document, so a pass over paths and
+    titles never transfers or holds `text`, `md`, `html`, or `unparsed_text`.
+    Nothing is kept once it has been yielded.
+
+    Args:
+        `fields` (Iterable[str], optional):
+            The Chapter fields to retrieve. `chapter` is always included. Defaults to META_FIELDS.
+        `start` (int, optional):
+            The first chapter, inclusive.
+        `end` (int, optional):
+            The last chapter, inclusive.
+        `book` (int, optional):
+            Only chapters of this book.
+        `section` (int, optional):
+            Only chapters of this section.
+        `batch_size` (int, optional):
+            Chapters per cursor batch. Defaults to ITER_BATCH_SIZE.
+
+    Raises:
+        `ValueError`: A field is not a Chapter field.
+
+    Yields:
+        `chapter` (dict):
+            Field -> value. Fields missing from the document are None.
+    """
+    fields = check_fields(fields)
+    yield from repository.find("chapter", fields, start, end, batch_size, **chapter_filters(book, section))
+
+
+#> Metadata
+@errwrap(entry=False, exit=False)
+def get_metadata(
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    book: Optional[int] = None,
+    section: Optional[int] = None,
+    fields: Iterable[str] = META_FIELDS,
+) -> dict[int, dict]:
+    """
+    Retrieve the metadata of many chapters in one query.
+
+    Only the requested fields are sent back by MongoDB, so a whole book's
+    manifest costs one round trip instead of one query per chapter and field.
+
+    Args:
+        `start` (int, optional):
+            The first chapter, inclusive.
+        `end` (int, optional):
+            The last chapter, inclusive.
+        `book` (int, optional):
+            Only chapters of this book.
+        `section` (int, optional):
+            Only chapters of this section.
+        `fields` (Iterable[str], optional):
+            The Chapter fields to retrieve. Defaults to META_FIELDS, which leaves out text, md, and html.
+
+    Raises:
+        `ValueError`: A field is not a Chapter field.
+
+    Returns:
+        `metadata` (dict[int, dict]):
+            Chapter -> {field: value}, in chapter order.
+    """
+    fields = check_fields(fields)
+    db = repository.scope
+    metadata = {}
+    for doc in iter_chapters(fields, start, end, book, section):
+        metadata[doc["chapter"]] = {field: doc[field] for field in fields}
+        # Warm the chapter cache for the per-chapter getters that usually follow
+        for field in fields:
+            chapter_cache.put(doc["chapter"], field, doc[field], db)
+    return metadata
 
 
 @errwrap(entry=False, exit=False)
@@ -422,33 +494,35 @@ def generate_md(chapter: int, save: bool = False, write: bool = False) -> str:
         `md` (str):
             The multimarkdown for the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        # Books 4-10 have two sections a piece
-        title = max_title(doc.title)
-        # > Multimarkdown Metadata
-        meta = f"Title:{title} \nChapter:{doc.chapter} \nSection:{doc.section} \nBook:{doc.book} \nCSS:../Styles/style.css \nviewport: width=device-width\n  \n"
+    doc = get_fields(chapter, ("title", "section", "book", "text", "md_path"))
+    if doc is None:
+        return None
+    # Books 4-10 have two sections a piece
+    title = max_title(doc["title"])
+    # > Multimarkdown Metadata
+    meta = f"Title:{title} \nChapter:{chapter} \nSection:{doc['section']} \nBook:{doc['book']} \nCSS:../Styles/style.css \nviewport: width=device-width\n  \n"
 
-        # > ATX Headers
-        img = """<figure>\n\t<img src="../Images/gem.gif" alt="gem" id="gem" width="120" height="60" />\n</figure>\n  \n"""
+    # > ATX Headers
+    img = """<figure>\n\t<img src="../Images/gem.gif" alt="gem" id="gem" width="120" height="60" />\n</figure>\n  \n"""
 
-        atx = f"## {title}\n### Chapter {doc.chapter}\n  \n{img}\n  \n  "
+    atx = f"## {title}\n### Chapter {chapter}\n  \n{img}\n  \n  "
 
-        # > Chapter Text
-        text = f"{doc.text}\n"
+    # > Chapter Text
+    text = f"{doc['text']}\n"
 
-        # > Concatenate Multimarkdown
-        md = f"{meta}{atx}{text}"
+    # > Concatenate Multimarkdown
+    md = f"{meta}{atx}{text}"
 
-        if save:
-            doc.md = md
-            doc.save()
+    if save:
+        # Only md changed, so update it in place rather than loading and re-saving the whole document
+        repository.update("chapter", chapter, md=md)
+        chapter_cache.put(chapter, "md", md, repository.scope)
 
-        if write:
-            with open(doc.md_path, "w") as outfile:
-                outfile.write(md)
-                log.debug("Wrote Chapter {doc.chapter}'s multimarkdown to disk.")
-        return md
+    if write:
+        with open(doc["md_path"], "w") as outfile:
+            outfile.write(md)
+            log.debug(f"Wrote Chapter {chapter}'s multimarkdown to disk.")
+    return md
 
 
 @errwrap(exit=False)
@@ -464,9 +538,7 @@ def get_md(chapter: int):
         `md` (str):
             The multimarkdown of the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.md
+    return get_field(chapter, "md")
 
 
 @errwrap(entry=False, exit=False)
@@ -482,46 +554,47 @@ def generate_html(chapter: int, save: bool = False) -> str:
         `html` (str):
             The HTML for the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        md_cmd = [
-            "multimarkdown",
-            "-f",
-            "--nolabels",
-            "-o",
-            f"{doc.html_path}",
-            f"{doc.md_path}",
-        ]
-        log.debug(f"Markdown Path: {doc.md_path}")
-        log.debug(f"HTML Path: {doc.html_path}")
-        log.debug(f"Multimarkdown Command: {md_cmd})")
-        try:
-            result = run(md_cmd)
-
-        except OSError as ose:
-            raise OSError(ose)
-
-        except ValueError as ve:
-            raise ValueError(ve)
-
-        except Exception as e:
-            log.error(e)
-            sys.exit(
-                "Error occurred in the process of creating HTML for Chapter {doc.chapter}"
-            )
+    doc = get_fields(chapter, ("md_path", "html_path"))
+    if doc is None:
+        return None
+    md_cmd = [
+        "multimarkdown",
+        "-f",
+        "--nolabels",
+        "-o",
+        f"{doc['html_path']}",
+        f"{doc['md_path']}",
+    ]
+    log.debug(f"Markdown Path: {doc['md_path']}")
+    log.debug(f"HTML Path: {doc['html_path']}")
+    log.debug(f"Multimarkdown Command: {md_cmd})")
+    try:
+        result = run(md_cmd)
+
+    except OSError as ose:
+        raise OSError(ose)
+
+    except ValueError as ve:
+        raise ValueError(ve)
+
+    except Exception as e:
+        log.error(e)
+        sys.exit(
+            f"Error occurred in the process of creating HTML for Chapter {chapter}"
+        )
 
-        else:
-            log.debug(f"Result of MD Command: {result.__str__}")
+    else:
+        log.debug(f"Result of MD Command: {result.__str__}")
 
-        if save:
-            with open(doc.html_path, "r") as chapter:
-                html = chapter.read()
-            log.debug(f"Saved Chapter {chapter}'s HTML to disk.")
+    if save:
+        with open(doc["html_path"], "r") as infile:
+            html = infile.read()
+        log.debug(f"Saved Chapter {chapter}'s HTML to disk.")
 
-            doc.html = html
-            doc.save()
-            log.debug(f"Saved Chapter {chapter}'s HTML to MongoDB.")
-            return html
+        repository.update("chapter", chapter, html=html)
+        chapter_cache.put(chapter, "html", html, repository.scope)
+        log.debug(f"Saved Chapter {chapter}'s HTML to {repository.name}.")
+        return html
 
 
 @errwrap(exit=False)
@@ -537,9 +610,7 @@ def get_html(chapter: int):
         `html` (str):
             The HTML of the given chapter.
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        return doc.html
+    return get_field(chapter, "html")
 
 
 @errwrap()
@@ -551,174 +622,171 @@ def write_md(chapter: int):
         `chapter` (int):
             The given chapter
     """
-    sg()
-    for doc in Chapter.objects(chapter=chapter):
-        log.debug(f"MD Path: {doc.md_path}")
-        length = len(doc.md)
+    doc = get_fields(chapter, ("md_path", "md"))
+    if doc is not None:
+        log.debug(f"MD Path: {doc['md_path']}")
+        length = len(doc["md"])
         log.debug(f"Markdown Length: {length}")
 
-        with open(doc.md_path, "w") as outfile:
-            outfile.write(doc.md)
+        with open(doc["md_path"], "w") as outfile:
+            outfile.write(doc["md"])
     log.debug(f"Wrote Chapter {chapter}'s Multimarkdown to Disk.")
 
 
 @errwrap()
-def make_chapters():
+def make_chapters(batch_size: int = BATCH_SIZE) -> dict:
     """
     Generate the values needed to create the chapter.
-    """
-    sg()
-    for doc in tqdm(Chapter.objects(), unit="ch", desc="Creating Chapters"):
-        chapter = doc.chapter
-        log.debug(f"Accessed Chapter {chapter}'s MongoDB Document.")
-
-        # > Section
-        section = generate_section(chapter)
-        log.debug(f"Chapter {chapter}'s section: {section}")
-        doc.section = section
-        log.debug(f"Updated Chapter {chapter}'s {section}.")
-
-        # > Book
-        book = generate_book(chapter)
-        log.debug(f"Chapter {chapter}'s book: {book}")
-        doc.book = book
-        log.debug(f"Updated Chapter {chapter}'s {book}.")
-
-        # > Title
-        title = get_title(chapter)
-        log.debug(f"Chapter {chapter}'s title: {title}")
-        doc.title = title
-        log.debug(f"Updated Chapter {chapter}'s {title} in MongoDB.")
-
-        # > Filename
-        filename = generate_filename(chapter)
-        log.debug(f"Chapter {chapter}'s Filename: {filename}")
-        doc.filename = filename
-        log.debug(f"Updated Chapter {chapter}'s filename in MongoDB")
-
-        # > Md_path
-        md_path = generate_md_path(chapter)
-        log.debug(f"Chapter {chapter}'s Multimarkdown Path: {md_path}")
-        doc.md_path = md_path
-        log.debug(f"Updated Chapter {chapter}'s Multimarkdown filepath.")
-
-        # > Html_path
-        html_path = generate_html_path(chapter)
-        log.debug(f"Chapter {chapter}'s html_path: {html_path}")
-        doc.html_path = html_path
-        log.debug(f"Updated Chapter {chapter}'s {html_path}.")
-
-        # #> Md
-        # md = generate_md(chapter)
-        # length = len(md)
-        # log.debug(f"Chapter {chapter}'s md: {length}")
-        # doc.md = md
-        # log.debug(f"Updated Chapter {chapter}'s {md}.")
-
-        # #> Html
-        # html = generate_html(chapter)
-        # length = len(html)
-        # log.debug(f"Chapter {chapter}'s html length: {length}")
-        # doc.html = html
-        # log.debug(f"Updated Chapter {chapter}'s {html}.")
-
-        doc.save()
-
-        log.debug(f"Finished Chapter {chapter}.")
 
+    Args:
+        `batch_size` (int, optional):
+            Chapters updated per bulk write. Defaults to BATCH_SIZE.
 
-@errwrap()
-def verify_chapters():
-    """
-    Update all the values of each chapter dict.
+    Returns:
+        `result` (dict):
+            The matched and modified counts of the bulk writes.
     """
-    sg()
-    for doc in tqdm(Chapter.objects(), unit="ch", desc="updating paths"):
-        chapter = doc.chapter
+    docs = iter_chapters(("title",))
+    with BulkWriter(Chapter, batch_size=batch_size) as writer:
+        for doc in tqdm(docs, total=count_chapters(), unit="ch", desc="Creating Chapters"):
+            chapter = doc["chapter"]
+            log.debug(f"Accessed Chapter {chapter}'s MongoDB Document.")
 
-        # > Section
-        if doc.section != "":
-            section = doc.section
-        else:
+            # > Section
             section = generate_section(chapter)
-        doc.section = section
-        log.debug(f"Section: {section}")
+            log.debug(f"Chapter {chapter}'s section: {section}")
 
-        # > Book
-        if doc.book != "":
-            book = doc.book
-        else:
+            # > Book
             book = generate_book(chapter)
-        doc.book = book
-        log.debug(f"Book: {book}")
+            log.debug(f"Chapter {chapter}'s book: {book}")
 
-        # > Md_path
-        if doc.md_path != "":
-            md_path = doc.md_path
-        else:
+            # > Title
+            title = max_title(doc["title"])
+            log.debug(f"Chapter {chapter}'s title: {title}")
+
+            # > Filename
+            filename = generate_filename(chapter)
+            log.debug(f"Chapter {chapter}'s Filename: {filename}")
+
+            # > Md_path
             md_path = generate_md_path(chapter)
-        doc.md_path = md_path
-        log.debug(f"MD Path: {md_path}")
+            log.debug(f"Chapter {chapter}'s Multimarkdown Path: {md_path}")
 
-        # > HTML_path
-        if doc.html_path != "":
-            html_path = doc.html_path
-        else:
+            # > Html_path
             html_path = generate_html_path(chapter)
-        doc.html_path = html_path
-        log.debug(f"HTML Path: {html_path}")
+            log.debug(f"Chapter {chapter}'s html_path: {html_path}")
+
+            writer.update(
+                chapter,
+                section=section,
+                book=book,
+                title=title,
+                filename=filename,
+                md_path=md_path,
+                html_path=html_path,
+            )
+            log.debug(f"Finished Chapter {chapter}.")
+    log.info(f"Created chapters: {writer.result()}")
+    return writer.result()
 
-        # > MD
-        if doc.md != "":
-            md = doc.md
-        else:
-            md = generate_md(chapter)
-        doc.md = md
-        length = len(md)
-        log.debug(f"MD length: {length}")
-
-        # > HTML
-        if doc.html != "":
-            html = doc.html
-        else:
-            html = generate_html(chapter)
-        doc.html = html
-        length = len(html)
-        log.debug(f"HTML Length: {length}")
 
-        doc.save()
-        log.info(f"Finished chapter {chapter}")
+@errwrap()
+def verify_chapters(batch_size: int = BATCH_SIZE) -> dict:
+    """
+    Fill in the missing values of each chapter.
+
+    Args:
+        `batch_size` (int, optional):
+            Chapters updated per bulk write. Defaults to BATCH_SIZE.
+
+    Returns:
+        `result` (dict):
+            The matched and modified counts of the bulk writes.
+    """
+    # Only whether md and html are empty matters here, so ask for the chapters missing them rather than their contents
+    missing_md = set(repository.missing("chapter", "md"))
+    missing_html = set(repository.missing("chapter", "html"))
+    docs = iter_chapters(("section", "book", "md_path", "html_path"))
+    with BulkWriter(Chapter, batch_size=batch_size) as writer:
+        for doc in tqdm(docs, total=count_chapters(), unit="ch", desc="updating paths"):
+            chapter = doc["chapter"]
+            # Only the missing values are generated and written
+            updates = {}
+
+            # > Section
+            if not doc["section"]:
+                updates["section"] = generate_section(chapter)
+            log.debug(f"Section: {updates.get('section', doc['section'])}")
+
+            # > Book
+            if not doc["book"]:
+                updates["book"] = generate_book(chapter)
+            log.debug(f"Book: {updates.get('book', doc['book'])}")
+
+            # > Md_path
+            if not doc["md_path"]:
+                updates["md_path"] = generate_md_path(chapter)
+            log.debug(f"MD Path: {updates.get('md_path', doc['md_path'])}")
+
+            # > HTML_path
+            if not doc["html_path"]:
+                updates["html_path"] = generate_html_path(chapter)
+            log.debug(f"HTML Path: {updates.get('html_path', doc['html_path'])}")
+
+            # generate_md and generate_html read the values above back from storage, so they have to land first
+            if updates and (chapter in missing_md or chapter in missing_html):
+                writer.update(chapter, **updates)
+                writer.flush()
+                updates = {}
+
+            # > MD
+            if chapter in missing_md:
+                updates["md"] = generate_md(chapter)
+                log.debug(f"MD length: {len(updates['md'] or '')}")
+
+            # > HTML
+            if chapter in missing_html:
+                html = generate_html(chapter, save=True)
+                if html is not None:
+                    log.debug(f"HTML Length: {len(html)}")
+
+            writer.update(chapter, **updates)
+            log.info(f"Finished chapter {chapter}")
+    log.info(f"Verified chapters: {writer.result()}")
+    return writer.result()
 
 
 @errwrap()
 def write_book_md(book: int):
-    sg()
-    for doc in tqdm(Chapter.objects(book=book), unit="ch", desc=f"Book {book}"):
-        with open(doc.md_path, "w") as outfile:
-            outfile.write(doc.md)
-        log.debug(f"Wrote CHapter {doc.chapter}'s Markdown to disk.")
+    docs = iter_chapters(("md_path", "md"), book=book, batch_size=ITER_TEXT_BATCH_SIZE)
+    for doc in tqdm(docs, total=count_chapters(book=book), unit="ch", desc=f"Book {book}"):
+        with open(doc["md_path"], "w") as outfile:
+            outfile.write(doc["md"])
+        log.debug(f"Wrote CHapter {doc['chapter']}'s Markdown to disk.")
 
 
 @errwrap()
 def write_book_html(book: int):
-    sg()
-    for doc in tqdm(Chapter.objects(book=book), unit="ch", desc=f"Book {book}"):
-        with open(doc.html_path, "w") as outfile:
-            outfile.write(doc.html)
-            log.debug(f"Wrote CHapter {doc.chapter}'s HTML to disk.")
+    docs = iter_chapters(("html_path", "html"), book=book, batch_size=ITER_TEXT_BATCH_SIZE)
+    for doc in tqdm(docs, total=count_chapters(book=book), unit="ch", desc=f"Book {book}"):
+        with open(doc["html_path"], "w") as outfile:
+            outfile.write(doc["html"])
+            log.debug(f"Wrote CHapter {doc['chapter']}'s HTML to disk.")
 
 
 @errwrap()
-def update_html_paths():
-    sg()
-    for doc in tqdm(Chapter.objects(), unit="ch", desc="Updating filepath"):
-        base = f"Users/maxludden/dev/py/superforge/books/book"
-        book_zfill = str(doc.book).zfill(2)
-        filename = doc.filename
-        filepath = f"{base}{book_zfill}/html/{filename}.html"
-        print(filepath)
-        doc.html_path = filepath
-        doc.save()
+def update_html_paths(batch_size: int = BATCH_SIZE) -> dict:
+    docs = iter_chapters(("book", "filename"))
+    with BulkWriter(Chapter, batch_size=batch_size) as writer:
+        for doc in tqdm(docs, total=count_chapters(), unit="ch", desc="Updating filepath"):
+            base = f"Users/maxludden/dev/py/superforge/books/book"
+            book_zfill = str(doc["book"]).zfill(2)
+            filename = doc["filename"]
+            filepath = f"{base}{book_zfill}/html/{filename}.html"
+            log.debug(f"Chapter {doc['chapter']}'s HTML path: {filepath}")
+            writer.update(doc["chapter"], html_path=filepath)
+    log.info(f"Updated HTML paths: {writer.result()}")
+    return writer.result()
 
 
 @errwrap()
@@ -757,39 +825,53 @@ def find(pattern: str | list[str]) -> list[str]:
 
 
 @errwrap()
-def edit(pattern: str, replacement: str | Callable) -> None:
+def edit(pattern: str, replacement: str | Callable, batch_size: int = BATCH_SIZE, ordered: bool = False) -> list[dict]:
+    """
+    Substitute `replacement` for `pattern` in the text of every chapter.
+
+    Args:
+        `pattern` (str):
+            The regex to search each chapter's text for.
+        `replacement` (str | Callable):
+            The replacement string, or a function of each match returning it.
+        `batch_size` (int, optional):
+            Chapters updated per bulk write. Defaults to BATCH_SIZE.
+        `ordered` (bool, optional):
+            Stop a batch at its first failed update. Defaults to False.
+
+    Returns:
+        `results` (list[dict]):
+            The matches of each edited chapter.
+    """
     regex = re.compile(pattern)
     results = []
-    sg()
-    chapters = Chapter.objects.all()
-
-    for doc in tqdm(chapters, unit="ch", desc="Editing"):
-        # Read Chapter Data from MongoDB
-        chapter = doc.chapter
-        msg = f"Chapter {chapter}"
-
-        # Search Chapter for Pattern
-        text = doc.text
-        matches = re.findall(regex, text)
-
-        if len(matches) > 0:
-            chapter_matches = {"chapter": chapter, "matches": len(matches)}
-            for x, match in enumerate(matches, start=1):
-                chapter_matches[f"match{x}"] = match
-                if callable(replacement):
-                    text = re.sub(pattern, replacement(match), text)
-                else:
-                    text = re.sub(pattern, replacement, text)
-
-            results.append(chapter_matches)
-            doc.text = text
-            doc.save()
-            msg = f"Chapter {chapter} - Saved Updated Chapter "
-            log.debug(msg)
-        else:
-            msg = f"Chapter {chapter} - No Matches"
-            log.debug(msg)
-        log.debug(f"Finished chapter {doc.chapter}")
+    chapters = iter_chapters(("text",), batch_size=ITER_TEXT_BATCH_SIZE)
+
+    with BulkWriter(Chapter, batch_size=batch_size, ordered=ordered) as writer:
+        for doc in tqdm(chapters, total=count_chapters(), unit="ch", desc="Editing"):
+            # Read Chapter Data from MongoDB
+            chapter = doc["chapter"]
+
+            # Search Chapter for Pattern
+            text = doc["text"]
+            matches = re.findall(regex, text)
+
+            if len(matches) > 0:
+                chapter_matches = {"chapter": chapter, "matches": len(matches)}
+                for x, match in enumerate(matches, start=1):
+                    chapter_matches[f"match{x}"] = match
+                    if callable(replacement):
+                        text = re.sub(pattern, replacement(match), text)
+                    else:
+                        text = re.sub(pattern, replacement, text)
+
+                results.append(chapter_matches)
+                writer.update(chapter, text=text)
+                log.debug(f"Chapter {chapter} - Queued Updated Chapter")
+            else:
+                log.debug(f"Chapter {chapter} - No Matches")
+            log.debug(f"Finished chapter {chapter}")
+    log.info(f"Edited chapters: {writer.result()}")
     return results
 
 
@@ -807,12 +889,10 @@ def get_text(chapter: int) -> str:
     """
     Get the text of a chapter.
     """
-    sg()
-    doc = Chapter.objects(chapter=chapter).first()
-    if doc is None:
+    fields = get_fields(chapter, ("text",))
+    if fields is None:
         raise ChapterNotFound(f"Unable to find chapter {chapter}")
-    text = doc.text
-    return text
+    return fields["text"]
 
 
 @errwrap()
@@ -820,7 +900,6 @@ def write_text(chapter: int) -> None:
     """
     Write the text of a chapter to a file.
     """
-    sg()
     text = get_text(chapter)
     text_path = generate_text_path(chapter)
     with open(text_path, "w") as outfile:
@@ -833,9 +912,11 @@ def write_texts() -> None:
     """
     Write the text of all chapters to disk.
     """
-    sg()
-    for chapter in tqdm(Chapter.objects(), unit="ch", desc="Writing Text"):
-        write_text(chapter.chapter)
+    docs = iter_chapters(("text",), batch_size=ITER_TEXT_BATCH_SIZE)
+    for doc in tqdm(docs, total=count_chapters(), unit="ch", desc="Writing Text"):
+        with open(generate_text_path(doc["chapter"]), "w") as outfile:
+            outfile.write(doc["text"])
+        log.debug(f"Wrote CHapter {doc['chapter']}'s text to disk.")
     log.info("Finished writing text.")
 
 
@@ -848,22 +929,57 @@ def make_text_dirs() -> None:
         log.debug(f"Created {path}")
 
 
+def has_compressed_text() -> bool:
+    """
+    Whether any chapter text is, or is about to be, stored compressed, and so missing from the text index.
+
+    Text compressed by an earlier run counts whatever SUPERFORGE_COMPRESSION is
+    now. Finding it scans the collection, so the answer is kept for the rest of
+    the process; text this process writes only ends up compressed when
+    compression is on, which counts by itself.
+    """
+    if COMPRESSION != "off":
+        return True
+    scope = repository.scope
+    if scope not in _compressed_text:
+        compressed = Chapter._get_collection().find_one({"text": {"$type": "binData"}}, {"_id": True})
+        _compressed_text[scope] = compressed is not None
+    return _compressed_text[scope]
+
+
 @errwrap()
-def search(phrase: str, db: str = "SUPERGENE") -> int:
+def search(phrase: str, db: str = "SUPERGENE", indexed: bool = True) -> int:
     """
     Search chapters for a phrase.
 
     Args:
         phrase (str): The phrase to search for.
         db (str): The database to search.
+        indexed (bool): Narrow the search with the text index. Only whole words
+            are indexed, so pass False to find a phrase that starts or ends mid-word.
 
     Returns:
         chapters (int): The number of chapters containing the phrase.
     """
     # > Connect to SUPERGENE
     if db == "SUPERGENE":
-        sg()
-        for doc in tqdm(Chapter.objects(), unit="ch", desc="Searching"):
-            text = doc.text
-            if phrase in text:
-                yield doc.chapter
+        # Only MongoDB has the text index, and only it needs a connection
+        if repository.name == "mongo":
+            sg()
+        elif indexed:
+            indexed = False
+        if indexed and has_compressed_text():
+            log.warning("Compressed text isn't in the text index, scanning every chapter instead.")
+            indexed = False
+        if indexed and TEXT_INDEX not in Chapter._get_collection().index_information():
+            log.warning("No chapter text index, scanning every chapter instead. Run the index bootstrap.")
+            indexed = False
+        if indexed:
+            # The text index finds the chapters containing the phrase, ignoring case; the check below keeps it exact
+            query = '"{}"'.format(phrase.replace('"', '\\"'))
+            docs = map(decode_doc, Chapter.objects.search_text(query).only("chapter", "text").exclude("id").no_cache().as_pymongo())
+        else:
+            docs = iter_chapters(("text",), batch_size=ITER_TEXT_BATCH_SIZE)
+        for doc in tqdm(docs, unit="ch", desc="Searching"):
+            if phrase in doc["text"]:
+                yield doc["chapter"]
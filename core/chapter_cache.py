@@ -0,0 +1,124 @@
+# core/chapter_cache.py
+
+import sys
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Iterable, Optional
+
+from core.log import log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                         Chapter Cache                           │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+MAX_BYTES = 256 * 1024 * 1024
+# Fields worth keeping in memory; unparsed_text is only read once per download.
+CACHED_FIELDS = frozenset(
+    ("chapter", "section", "book", "title", "text", "filename", "md_path", "html_path", "md", "html", "url")
+)
+MISSING = object()
+
+
+class ChapterCache:
+    """
+    An in-process LRU cache of Chapter field values, bounded by their size in memory.
+
+    Values are cached per (repository scope, chapter, field), so a pass that only needs titles
+    and paths never pulls `text`, `md`, or `html` into memory. `Chapter.save()`
+    and `Chapter.delete()` invalidate the chapter; code that writes with
+    `QuerySet.update()` must call `invalidate()` itself.
+
+    Args:
+        `max_bytes` (int, optional):
+            The memory budget for cached values. Defaults to MAX_BYTES.
+        `fields` (Iterable[str], optional):
+            The fields that may be cached. Defaults to CACHED_FIELDS.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES, fields: Iterable[str] = CACHED_FIELDS):
+        self.max_bytes = max_bytes
+        self.fields = frozenset(fields)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        # chapter -> its cached (db, field) keys, so invalidating a chapter doesn't scan every entry
+        self._by_chapter: dict[int, set] = {}
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"ChapterCache(entries={len(self._entries)}, bytes={self.bytes}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, chapter: int, field: str, db: Optional[str] = None) -> Any:
+        """Retrieve a cached value, or MISSING."""
+        key = (db, int(chapter), field)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, chapter: int, field: str, value: Any, db: Optional[str] = None) -> None:
+        """Cache a value, evicting the least recently used values over budget."""
+        if field not in self.fields:
+            return
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return
+        key = (db, int(chapter), field)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self._by_chapter.setdefault(key[1], set()).add((db, field))
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                (evicted_db, evicted_chapter, evicted_field), (_, evicted) = self._entries.popitem(last=False)
+                self._forget(evicted_db, evicted_chapter, evicted_field)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _forget(self, db: Optional[str], chapter: int, field: str) -> None:
+        fields = self._by_chapter.get(chapter)
+        if fields is not None:
+            fields.discard((db, field))
+            if not fields:
+                del self._by_chapter[chapter]
+
+    def invalidate(self, chapter: Optional[int] = None) -> None:
+        """Drop every cached field of a chapter in every repository, or of every chapter."""
+        with self._lock:
+            if chapter is None:
+                self._entries.clear()
+                self._by_chapter.clear()
+                self.bytes = 0
+                return
+            chapter = int(chapter)
+            for db, field in self._by_chapter.pop(chapter, ()):
+                self.bytes -= self._entries.pop((db, chapter, field))[1]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def log_stats(self) -> None:
+        log.info(f"Chapter cache: {self.stats()}")
+
+
+chapter_cache = ChapterCache()
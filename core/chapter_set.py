@@ -0,0 +1,260 @@
+# core/chapter_set.py
+
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from json import load
+from typing import Iterable, Iterator, Union
+
+from core.base import BASE
+from core.boundaries import FIRST_CHAPTER, LAST_CHAPTER, book_range, section_range
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Chapter Set                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+# Chapter numbers the source skipped; they have no text and no document.
+SKIPPED_PATH = f"{BASE}/json/skipped_chapters.json"
+
+
+@lru_cache(maxsize=None)
+def skipped_chapters(path: str = SKIPPED_PATH) -> frozenset[int]:
+    """The chapter numbers listed in `path`, read once."""
+    with open(path, "r") as infile:
+        return frozenset(int(chapter) for chapter in load(infile))
+
+
+#> Ranges
+def normalize(ranges: Iterable[tuple[int, int]]) -> tuple[tuple[int, int], ...]:
+    """Sort inclusive (first, last) ranges, dropping empty ones and merging any that overlap or touch."""
+    merged = []
+    for first, last in sorted(ranges):
+        if first > last:
+            continue
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1][1] = last
+        else:
+            merged.append([first, last])
+    return tuple((first, last) for first, last in merged)
+
+
+def intersect(a: tuple, b: tuple) -> list[tuple[int, int]]:
+    """The overlap of two normalized range tuples."""
+    result, i, j = [], 0, 0
+    while i < len(a) and j < len(b):
+        first, last = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if first <= last:
+            result.append((first, last))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def subtract(a: tuple, b: tuple) -> list[tuple[int, int]]:
+    """The ranges of `a` not covered by `b`, both normalized."""
+    result, j = [], 0
+    for first, last in a:
+        while j < len(b) and b[j][1] < first:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] <= last:
+            if b[k][0] > first:
+                result.append((first, b[k][0] - 1))
+            first = max(first, b[k][1] + 1)
+            k += 1
+        if first <= last:
+            result.append((first, last))
+    return result
+
+
+class ChapterSet:
+    """
+    An ordered set of chapter numbers, stored as sorted, disjoint, inclusive ranges.
+
+    The whole novel is a handful of ranges, so membership is a bisect, `len()`
+    is a lookup, and union, intersection and difference work range by range.
+    Indexing and slicing go by position, like a sorted list. `shards()` and
+    `chunks()` split the set into evenly sized work units for threads,
+    processes, or separate machines.
+
+    Args:
+        `chapters` (Iterable[int], optional):
+            The chapters in the set. Defaults to none.
+    """
+
+    __slots__ = ("ranges", "offsets")
+
+    def __init__(self, chapters: Iterable[int] = ()):
+        if isinstance(chapters, ChapterSet):
+            ranges = chapters.ranges
+        elif isinstance(chapters, range) and chapters.step == 1:
+            ranges = normalize([(chapters.start, chapters.stop - 1)])
+        else:
+            ranges = normalize((chapter, chapter) for chapter in chapters)
+        self._set_ranges(ranges)
+
+    def _set_ranges(self, ranges: tuple):
+        self.ranges = ranges
+        # offsets[i] is the position of ranges[i]'s first chapter
+        self.offsets = (0,) + tuple(accumulate(last - first + 1 for first, last in ranges))
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[tuple[int, int]]) -> "ChapterSet":
+        """A set from inclusive (first, last) ranges, in any order."""
+        chapter_set = cls.__new__(cls)
+        chapter_set._set_ranges(normalize(ranges))
+        return chapter_set
+
+    @classmethod
+    def span(cls, start: int = FIRST_CHAPTER, end: int = LAST_CHAPTER, skip: bool = True) -> "ChapterSet":
+        """
+        The chapters from `start` to `end`, inclusive.
+
+        Args:
+            `start` (int, optional):
+                The first chapter. Defaults to FIRST_CHAPTER.
+            `end` (int, optional):
+                The last chapter. Defaults to LAST_CHAPTER.
+            `skip` (bool, optional):
+                Leave out the skipped chapters. Defaults to True.
+        """
+        chapter_set = cls.from_ranges([(start, end)])
+        return chapter_set - cls(skipped_chapters()) if skip else chapter_set
+
+    @classmethod
+    def book(cls, book: int, skip: bool = True) -> "ChapterSet":
+        """The chapters of the given book."""
+        return cls.span(*book_range(book), skip=skip)
+
+    @classmethod
+    def section(cls, section: int, skip: bool = True) -> "ChapterSet":
+        """The chapters of the given section."""
+        return cls.span(*section_range(section), skip=skip)
+
+    #> Sequence
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    def __bool__(self) -> bool:
+        return bool(self.ranges)
+
+    def __iter__(self) -> Iterator[int]:
+        for first, last in self.ranges:
+            yield from range(first, last + 1)
+
+    def __reversed__(self) -> Iterator[int]:
+        for first, last in reversed(self.ranges):
+            yield from range(last, first - 1, -1)
+
+    def __contains__(self, chapter) -> bool:
+        index = bisect_right(self.ranges, (chapter, float("inf"))) - 1
+        return index >= 0 and self.ranges[index][0] <= chapter <= self.ranges[index][1]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, "ChapterSet"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return ChapterSet(self[position] for position in range(start, stop, step))
+            if start >= stop:
+                return ChapterSet()
+            first, last = self[start], self[stop - 1]
+            return ChapterSet.from_ranges(intersect(self.ranges, ((first, last),)))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChapterSet index out of range")
+        position = bisect_right(self.offsets, index) - 1
+        return self.ranges[position][0] + index - self.offsets[position]
+
+    def index(self, chapter: int) -> int:
+        """The position of `chapter` in the set."""
+        if chapter not in self:
+            raise ValueError(f"Chapter {chapter} is not in the set.")
+        position = bisect_right(self.ranges, (chapter, float("inf"))) - 1
+        return self.offsets[position] + chapter - self.ranges[position][0]
+
+    @property
+    def first(self) -> int:
+        return self.ranges[0][0]
+
+    @property
+    def last(self) -> int:
+        return self.ranges[-1][1]
+
+    #> Set algebra
+    def __or__(self, other: Iterable[int]) -> "ChapterSet":
+        return ChapterSet.from_ranges(self.ranges + ChapterSet(other).ranges)
+
+    def __and__(self, other: Iterable[int]) -> "ChapterSet":
+        return ChapterSet.from_ranges(intersect(self.ranges, ChapterSet(other).ranges))
+
+    def __sub__(self, other: Iterable[int]) -> "ChapterSet":
+        return ChapterSet.from_ranges(subtract(self.ranges, ChapterSet(other).ranges))
+
+    def __xor__(self, other: Iterable[int]) -> "ChapterSet":
+        other = ChapterSet(other)
+        return (self | other) - (self & other)
+
+    def __le__(self, other: Iterable[int]) -> bool:
+        return not (self - other)
+
+    def __ge__(self, other: Iterable[int]) -> bool:
+        return ChapterSet(other) <= self
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ChapterSet):
+            return self.ranges == other.ranges
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.ranges)
+
+    def __getstate__(self):
+        return self.ranges
+
+    def __setstate__(self, ranges):
+        self._set_ranges(ranges)
+
+    def __repr__(self) -> str:
+        ranges = ", ".join(str(first) if first == last else f"{first}-{last}" for first, last in self.ranges)
+        return f"ChapterSet({ranges})"
+
+    #> Work units
+    def shards(self, count: int) -> list["ChapterSet"]:
+        """
+        Split the set into `count` contiguous shards whose sizes differ by at most one chapter.
+
+        Args:
+            `count` (int):
+                The number of shards, e.g. workers or machines.
+
+        Returns:
+            `shards` (list[ChapterSet]):
+                The shards, in chapter order. Some are empty if `count` exceeds the chapters.
+        """
+        if count < 1:
+            raise ValueError(f"Cannot split into {count} shards.")
+        size, extra = divmod(len(self), count)
+        shards, start = [], 0
+        for shard in range(count):
+            stop = start + size + (shard < extra)
+            shards.append(self[start:stop])
+            start = stop
+        return shards
+
+    def shard(self, index: int, count: int) -> "ChapterSet":
+        """The `index`th of `count` shards, so separate machines can each take their own share."""
+        if not 0 <= index < count:
+            raise IndexError(f"Shard {index} of {count} does not exist.")
+        return self.shards(count)[index]
+
+    def chunks(self, size: int) -> Iterator["ChapterSet"]:
+        """Successive chunks of `size` chapters; only the last may be smaller."""
+        if size < 1:
+            raise ValueError(f"Cannot split into chunks of {size}.")
+        for start in range(0, len(self), size):
+            yield self[start : start + size]
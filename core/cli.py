@@ -6,7 +6,13 @@ from mongoengine import connect
 
 from core.atlas import sg, BASE
 from core.log import log, errwrap
+import core.backup as backup_
 import core.chapter as chapter_
+import core.compression as compression_
+import core.indexes as indexes_
+import core.rules as rules_
+import core.storage as storage_
+import core.toc_refresh as toc_refresh
 
 load_dotenv()
 
@@ -17,4 +23,45 @@ def get_chapter(chapter: int):
     sg()
     doc = chapter_.Chapter.objects(chapter=chapter).first()
     log.info(doc.__repr__())
-    return doc
\ No newline at end of file
+    return doc
+
+@app.command()
+def refresh_toc(full: bool = False, dry_run: bool = False, max_removed: int = toc_refresh.MAX_REMOVED):
+    diff = toc_refresh.refresh_toc(full=full, write=not dry_run, max_removed=max_removed)
+    log.info(f"{diff}\n<code>{diff.to_dict()}</code>")
+    return diff
+
+@app.command()
+def indexes(explain: bool = True, explain_only: bool = False):
+    if explain_only:
+        return indexes_.explain_queries()
+    return indexes_.bootstrap(explain_plans=explain)
+
+@app.command()
+def seed_local(path: str = storage_.SQLITE_PATH, chapters: bool = True):
+    repository = storage_.SQLiteRepository(path)
+    return storage_.seed(repository, chapters_dir=storage_.CHAPTER_DICTS_DIR if chapters else None)
+
+@app.command()
+def compress_chapters(codec: str = "zlib", batch_size: int = 100):
+    return compression_.migrate_chapters(codec, batch_size)
+
+
+@app.command()
+def compression_benchmark(samples: int = 500):
+    return compression_.benchmark(compression_.sample_texts(samples))
+
+
+@app.command()
+def export_chapters(out_dir: str = backup_.BACKUP_DIR, compress: bool = True, workers: int = 0):
+    return backup_.export_chapters(out_dir, compress=compress, workers=workers or None)
+
+
+@app.command()
+def import_chapters(in_dir: str = backup_.BACKUP_DIR, verify: bool = True, workers: int = 0):
+    return backup_.import_chapters(in_dir, verify=verify, workers=workers or None)
+
+
+@app.command()
+def profile_rules(limit: int = 0):
+    return rules_.profile_rules(rules_.sample_chapters(limit))
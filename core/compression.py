@@ -0,0 +1,259 @@
+# core/compression.py
+
+import os
+import zlib
+from glob import glob
+from json import load
+from time import perf_counter
+from typing import Iterable, Optional
+
+from bson.binary import Binary
+from dotenv import load_dotenv
+from mongoengine.fields import StringField
+
+from core.base import BASE
+from core.log import errwrap, log
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Compression                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+load_dotenv()
+
+#> Constants
+# "off" (the default), "zlib", or "zstd". Only affects what is written; compressed values are always readable.
+COMPRESSION = os.getenv("SUPERFORGE_COMPRESSION", "off").lower()
+CODECS = ("zlib", "zstd")
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+# Shorter strings are stored as they are.
+MIN_SIZE = 512
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# The Chapter fields holding near-copies of the chapter's prose.
+COMPRESSED_FIELDS = ("unparsed_text", "text", "md", "html")
+
+
+class UnknownCodec(Exception):
+    pass
+
+
+def available_codec(codec: str) -> str:
+    """`codec` if it can be used here, "zlib" if zstd was asked for but isn't installed."""
+    if codec not in CODECS:
+        raise UnknownCodec(f"Unknown compression codec: {codec}")
+    if codec == "zstd" and zstandard is None:
+        log.warning("zstandard is not installed; compressing with zlib instead.")
+        return "zlib"
+    return codec
+
+
+def compress(value: str, codec: str = "zlib") -> bytes:
+    data = value.encode("utf-8")
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return zlib.compress(data, ZLIB_LEVEL)
+
+
+def decompress(value):
+    """Decompress a stored value, passing strings and None through unchanged."""
+    if not isinstance(value, bytes):
+        return value
+    if value[:4] == ZSTD_MAGIC:
+        if zstandard is None:
+            raise ImportError("zstandard is needed to read zstd-compressed fields.")
+        return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+    return zlib.decompress(value).decode("utf-8")
+
+
+def stored_size(value) -> int:
+    """The bytes a stored string or compressed value takes."""
+    return len(value) if isinstance(value, bytes) else len(value.encode("utf-8"))
+
+
+def decode_doc(doc: dict) -> dict:
+    """Decompress the compressed values of a raw document, e.g. from `as_pymongo()`, in place."""
+    for field, value in doc.items():
+        if isinstance(value, bytes):
+            doc[field] = decompress(value)
+    return doc
+
+
+class CompressedStringField(StringField):
+    """
+    A StringField stored compressed when SUPERFORGE_COMPRESSION is zlib or zstd.
+
+    Strings of at least MIN_SIZE bytes are written as BSON binary; anything
+    shorter, and everything while compression is off, is written as a plain
+    string. Both forms read back as `str`, so existing documents keep working
+    and a collection can be migrated gradually. Raw reads that skip the model
+    (`as_pymongo()`, the storage repository) pass documents through `decode_doc()`.
+
+    Compressed values can't be matched by regex or text-index queries.
+
+    Args:
+        `codec` (str, optional):
+            "zlib" or "zstd", or "off". Defaults to SUPERFORGE_COMPRESSION.
+    """
+
+    def __init__(self, codec: Optional[str] = None, **kwargs):
+        self.codec = codec or COMPRESSION
+        super().__init__(**kwargs)
+
+    def to_python(self, value):
+        return super().to_python(decompress(value))
+
+    def to_mongo(self, value):
+        if self.codec == "off" or not isinstance(value, str) or len(value) < MIN_SIZE:
+            return value
+        return Binary(compress(value, available_codec(self.codec)))
+
+    def prepare_query_value(self, op, value):
+        # Updates such as `set__md=...` bypass to_mongo
+        if op in ("set", "setOnInsert") and isinstance(value, str):
+            self.validate(value)
+            return self.to_mongo(value)
+        return super().prepare_query_value(op, value)
+
+
+#> Migration
+@errwrap()
+def migrate_chapters(codec: Optional[str] = None, batch_size: int = 100) -> dict:
+    """
+    Rewrite the large Chapter fields in the given codec.
+
+    Documents are read and written raw, in batches, so nothing is decoded
+    into Chapter documents. Values already in the target form are skipped, so
+    an interrupted migration can simply be run again.
+
+    Args:
+        `codec` (str, optional):
+            "zlib", "zstd", or "off" to decompress everything. Defaults to SUPERFORGE_COMPRESSION.
+        `batch_size` (int, optional):
+            Chapters per bulk write. Defaults to 100.
+
+    Returns:
+        `result` (dict):
+            Chapters scanned and modified, and the stored bytes of the migrated fields before and after.
+    """
+    from pymongo import UpdateOne
+
+    from core.atlas import sg
+    from core.chapter import Chapter
+    from core.chapter_cache import chapter_cache
+
+    codec = codec or COMPRESSION
+    if codec != "off":
+        codec = available_codec(codec)
+    sg()
+    collection = Chapter._get_collection()
+    projection = {"_id": False, "chapter": True, **{field: True for field in COMPRESSED_FIELDS}}
+    result = {"chapters": 0, "modified": 0, "bytes_before": 0, "bytes_after": 0}
+    ops = []
+
+    def flush():
+        if ops:
+            result["modified"] += collection.bulk_write(ops, ordered=False).modified_count
+            ops.clear()
+
+    for doc in collection.find({}, projection).batch_size(batch_size):
+        result["chapters"] += 1
+        updates = {}
+        for field in COMPRESSED_FIELDS:
+            value = doc.get(field)
+            if value is None:
+                continue
+            text = decompress(value)
+            stored = text if codec == "off" or len(text) < MIN_SIZE else compress(text, codec)
+            result["bytes_before"] += stored_size(value)
+            result["bytes_after"] += stored_size(stored)
+            if stored != value:
+                updates[field] = Binary(stored) if isinstance(stored, bytes) else stored
+        if updates:
+            ops.append(UpdateOne({"chapter": doc["chapter"]}, {"$set": updates}))
+            chapter_cache.invalidate(doc["chapter"])
+        if len(ops) >= batch_size:
+            flush()
+    flush()
+    log.info(f"Migrated chapters to {codec}: {result}")
+    return result
+
+
+#> Benchmark
+def sample_texts(limit: int = 500) -> list[str]:
+    """Chapter texts from json/chapter_dicts, for benchmarking without a database."""
+    texts = []
+    for path in sorted(glob(f"{BASE}/json/chapter_dicts/chapter-*.json"))[:limit]:
+        with open(path, "r") as infile:
+            texts.append(dict(load(infile))["text"])
+    return texts
+
+
+def benchmark(texts: Optional[Iterable[str]] = None, fields: int = len(COMPRESSED_FIELDS), documents: int = 3462) -> list[dict]:
+    """
+    Measure what each codec saves in storage and costs in CPU.
+
+    For each codec, reports the compression ratio, compression and
+    decompression throughput, and an estimate for a full-collection scan:
+    the bytes transferred and the CPU seconds spent decompressing them.
+
+    Args:
+        `texts` (Iterable[str], optional):
+            Sample field values. Defaults to `sample_texts()`.
+        `fields` (int, optional):
+            Large fields per document, for the full-scan estimate. Defaults to 4.
+        `documents` (int, optional):
+            Documents in the collection, for the full-scan estimate. Defaults to 3462.
+
+    Returns:
+        `results` (list[dict]):
+            One row per codec, including "off".
+    """
+    texts = list(texts) if texts is not None else sample_texts()
+    raw = [text.encode("utf-8") for text in texts]
+    raw_bytes = sum(len(data) for data in raw)
+    per_doc = raw_bytes / len(raw) * fields
+    results = [
+        {
+            "codec": "off",
+            "ratio": 1.0,
+            "compress_mb_s": None,
+            "decompress_mb_s": None,
+            "scan_mb": round(per_doc * documents / 1e6, 1),
+            "scan_cpu_s": 0.0,
+        }
+    ]
+    codecs = [codec for codec in CODECS if codec != "zstd" or zstandard is not None]
+    for codec in codecs:
+        start = perf_counter()
+        packed = [compress(text, codec) for text in texts]
+        compress_s = perf_counter() - start
+        start = perf_counter()
+        for data in packed:
+            decompress(data)
+        decompress_s = perf_counter() - start
+        ratio = raw_bytes / sum(len(data) for data in packed)
+        results.append(
+            {
+                "codec": codec,
+                "ratio": round(ratio, 2),
+                "compress_mb_s": round(raw_bytes / compress_s / 1e6, 1),
+                "decompress_mb_s": round(raw_bytes / decompress_s / 1e6, 1),
+                "scan_mb": round(per_doc * documents / ratio / 1e6, 1),
+                "scan_cpu_s": round(decompress_s / len(texts) * fields * documents, 2),
+            }
+        )
+    table = "\n".join(
+        [f"{'codec':<6} {'ratio':>6} {'comp MB/s':>10} {'decomp MB/s':>12} {'scan MB':>8} {'scan CPU s':>11}"]
+        + [
+            f"{row['codec']:<6} {row['ratio']:>6} {str(row['compress_mb_s']):>10} {str(row['decompress_mb_s']):>12}"
+            f" {row['scan_mb']:>8} {row['scan_cpu_s']:>11}"
+            for row in results
+        ]
+    )
+    log.info(f"Compression benchmark over {len(texts)} texts:\n<code>{table}</code>")
+    return results
@@ -57,7 +57,8 @@ class Defaultdoc(Document):
     metadata = StringField()
     default_doc = StringField()
     title = StringField()
-    meta = {"collection": "defaultdoc"}
+    # The unique `book` index is the only one needed
+    meta = {"collection": "defaultdoc", "auto_create_index": False}
 
 
 @errwrap()
@@ -11,6 +11,7 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from tqdm.auto import tqdm
 from alive_progress import alive_it, alive_bar
 import sh
@@ -19,6 +20,8 @@ from core.atlas import sg, BASE, max_title
 from core.log import log, errwrap
 from core.chapter import Chapter
 import core.chapter as chapter_
+from core.mt_get_text import ChapterTextNotFound, ChapterTextNotFoundInTime
+from core.reader_session import bootstrap, ensure_reader_settings
 
 DRIVER_PATH = "driver/chromedriver"
 
@@ -40,6 +43,7 @@ def get_text_from_ch(chapter: int) -> str:
     options = ChromeOptions()
     options.add_argument("--headless")
     driver = webdriver.Chrome(PATH, options=options)
+    bootstrap(driver)
 
     #> Get Chapter Page
     driver.get(URL)
@@ -50,15 +54,7 @@ def get_text_from_ch(chapter: int) -> str:
     article_title = article_title.replace(title_prefix, "").replace(title_suffix, "")
 
     try:
-        settings_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.LINK_TEXT, "SETTING"))
-        )
-        settings_button.click()
-
-        change_bad_words_button = driver.find_element(
-            By.XPATH, '//*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a'
-        )
-        change_bad_words_button.click()
+        ensure_reader_settings(driver, chapter)
         try:
             text = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.ID, "vung_doc"))
@@ -115,8 +111,11 @@ def get_text_from_ch(chapter: int) -> str:
             
             return text
 
-        except:
+        except NoSuchElementException as e:
             log.warning(f"Error 404\nChapter {chapter}: Unable to locate text on page.\n")
+            raise ChapterTextNotFound(chapter) from e
+        except TimeoutException as e:
+            log.warning(f"Chapter {chapter}: Timed out waiting for text on page.")
+            raise ChapterTextNotFoundInTime(chapter) from e
     finally:
-        driver.quit()
-    return text
\ No newline at end of file
+        driver.quit()
\ No newline at end of file
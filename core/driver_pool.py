@@ -0,0 +1,265 @@
+# core/driver_pool.py
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Condition
+from time import monotonic, perf_counter
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from core.log import errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Driver Pool                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+POOL_SIZE = 8
+MAX_PAGES = 100
+CHECKOUT_TIMEOUT = 120
+
+
+class DriverPoolClosed(Exception):
+    pass
+
+
+class DriverPoolExhausted(Exception):
+    pass
+
+
+def headless_chrome() -> webdriver.Chrome:
+    """
+    Start a new headless Chrome session.
+
+    Returns:
+        `driver` (webdriver.Chrome):
+            A fresh headless Chrome webdriver.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    return webdriver.Chrome(options=options)
+
+
+@dataclass
+class PooledDriver:
+    """A webdriver session owned by a `DriverPool`, with its usage counters."""
+
+    driver: webdriver.Chrome
+    number: int
+    pages: int = 0
+    started: float = field(default_factory=perf_counter)
+
+
+class DriverPool:
+    """
+    A bounded pool of long-lived webdriver sessions.
+
+    Sessions are started lazily, up to `size` of them. Workers check a session
+    out with `pool.driver()`, use it for one page, and hand it back. A session is
+    health-checked before every checkout and is quit and replaced once it has
+    served `max_pages` pages.
+
+    Args:
+        `size` (int, optional):
+            The maximum number of concurrent browser sessions. Defaults to POOL_SIZE.
+        `max_pages` (int, optional):
+            The number of pages a session serves before it is recycled. Defaults to MAX_PAGES.
+        `factory` (Callable, optional):
+            Starts a new webdriver session. Defaults to `headless_chrome`.
+        `on_start` (Callable, optional):
+            Called with each newly started driver, e.g. to prepare the session.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_pages: int = MAX_PAGES,
+        factory: Optional[Callable[[], webdriver.Chrome]] = None,
+        on_start: Optional[Callable[[webdriver.Chrome], None]] = None,
+    ):
+        if size < 1:
+            raise ValueError("A DriverPool needs at least one session.", f"size: {size}")
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory or headless_chrome
+        self.on_start = on_start
+        self._idle: deque = deque()
+        self._cond = Condition()
+        self._live = 0
+        self._started = 0
+        self._recycled = 0
+        self._closed = False
+
+    def __repr__(self):
+        return f"DriverPool(size={self.size}, live={self._live}, idle={len(self._idle)}, started={self._started}, recycled={self._recycled})"
+
+    def __enter__(self) -> "DriverPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # > Session lifecycle
+    def _start(self) -> PooledDriver:
+        """Start a new session. The caller must already hold a reserved slot."""
+        try:
+            driver = self.factory()
+            if self.on_start is not None:
+                self.on_start(driver)
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._started += 1
+            number = self._started
+        log.debug(f"Started browser session {number}.")
+        return PooledDriver(driver=driver, number=number)
+
+    def _quit(self, pooled: PooledDriver) -> None:
+        """Quit a session and free its slot."""
+        try:
+            pooled.driver.quit()
+        except WebDriverException as wde:
+            log.warning(f"Browser session {pooled.number} did not quit cleanly: {wde}")
+        finally:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+        log.debug(f"Quit browser session {pooled.number} after {pooled.pages} pages.")
+
+    @staticmethod
+    def healthy(pooled: PooledDriver) -> bool:
+        """
+        Cheaply verify that a session still responds.
+
+        Args:
+            `pooled` (PooledDriver):
+                The session to check.
+
+        Returns:
+            `healthy` (bool):
+                Whether the session answered a trivial script.
+        """
+        try:
+            return pooled.driver.execute_script("return 1;") == 1
+        except WebDriverException:
+            return False
+
+    # > Checkout / Return
+    def acquire(self, timeout: Optional[float] = CHECKOUT_TIMEOUT) -> PooledDriver:
+        """
+        Check a healthy session out of the pool, starting one if there is room.
+
+        Args:
+            `timeout` (float, optional):
+                Seconds to wait for a session to be returned. Defaults to CHECKOUT_TIMEOUT.
+
+        Raises:
+            `DriverPoolClosed`: The pool has been closed.
+            `DriverPoolExhausted`: No session became available in time.
+
+        Returns:
+            `pooled` (PooledDriver):
+                The checked out session.
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            pooled = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise DriverPoolClosed("Unable to check out a driver from a closed pool.")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._live < self.size:
+                        # Reserve a slot; the session is started outside the lock.
+                        self._live += 1
+                        break
+                    remaining = None if deadline is None else deadline - monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise DriverPoolExhausted(
+                            f"No browser session was returned within {timeout} seconds."
+                        )
+                    self._cond.wait(remaining)
+            if pooled is None:
+                return self._start()
+            if self.healthy(pooled):
+                return pooled
+            log.warning(f"Browser session {pooled.number} failed its health check. Replacing it.")
+            self._quit(pooled)
+
+    def release(self, pooled: PooledDriver, discard: bool = False) -> None:
+        """
+        Return a session to the pool, recycling it if it is worn out.
+
+        Args:
+            `pooled` (PooledDriver):
+                The session being returned.
+            `discard` (bool, optional):
+                Quit the session instead of returning it. Defaults to False.
+        """
+        pooled.pages += 1
+        if discard or self._closed or pooled.pages >= self.max_pages:
+            if not discard and not self._closed:
+                with self._cond:
+                    self._recycled += 1
+            self._quit(pooled)
+            return
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = CHECKOUT_TIMEOUT):
+        """
+        Context manager that checks out a webdriver and returns it afterwards.
+
+        Args:
+            `timeout` (float, optional):
+                Seconds to wait for a free session. Defaults to CHECKOUT_TIMEOUT.
+
+        Yields:
+            `driver` (webdriver.Chrome):
+                A healthy webdriver session.
+        """
+        pooled = self.acquire(timeout=timeout)
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            # A driver-level failure may have left the session in an unknown state.
+            self.release(pooled, discard=not self.healthy(pooled))
+            raise
+        except BaseException:
+            self.release(pooled)
+            raise
+        else:
+            self.release(pooled)
+
+    @errwrap(entry=False)
+    def close(self) -> dict:
+        """
+        Quit every idle session and refuse further checkouts.
+
+        Returns:
+            `stats` (dict):
+                The number of sessions started and recycled over the pool's life.
+        """
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._quit(pooled)
+        stats = {"started": self._started, "recycled": self._recycled}
+        log.info(f"Closed driver pool. Started {self._started} sessions; recycled {self._recycled}.")
+        return stats
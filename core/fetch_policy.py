@@ -0,0 +1,377 @@
+# core/fetch_policy.py
+
+import asyncio
+import random
+from json import dump, load
+from os.path import exists
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Awaitable, Callable, Optional
+
+from requests import ConnectionError, HTTPError, Timeout
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from core.base import BASE
+from core.driver_pool import DriverPoolExhausted
+from core.http_fetch import ChapterTextInvalid
+from core.log import log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          Fetch Policy                           │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+DEAD_LETTERS_PATH = f"{BASE}/json/dead_letters.json"
+RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+# The breaker opens when at least BREAKER_RATIO of the last BREAKER_WINDOW
+# fetches failed in a retryable way, and stays open for BREAKER_COOLDOWN seconds.
+BREAKER_WINDOW = 20
+BREAKER_RATIO = 0.5
+BREAKER_COOLDOWN = 60.0
+# How long other callers wait while a half-open breaker's probe is in flight.
+PROBE_WAIT = 1.0
+
+# Transient: the site or the browser may behave on the next try.
+RETRYABLE = (
+    TimeoutException,
+    ConnectionError,
+    Timeout,
+    ChapterTextInvalid,
+    DriverPoolExhausted,
+    WebDriverException,
+)
+# Permanent: the page loaded but is not a chapter page we can read.
+PERMANENT = (NoSuchElementException, KeyError, ValueError)
+
+
+def is_retryable(e: BaseException) -> bool:
+    """
+    Classify a fetch failure.
+
+    Missing page elements, unknown chapters, and parse errors are permanent.
+    Timeouts, connection errors, crashed browser sessions, 5xx/429 responses,
+    and censored text are retryable.
+
+    Args:
+        `e` (BaseException):
+            The exception raised while fetching a chapter.
+
+    Returns:
+        `retryable` (bool):
+            Whether the fetch is worth another attempt.
+    """
+    if isinstance(e, HTTPError):
+        status = e.response.status_code if e.response is not None else None
+        return status is None or status == 429 or status >= 500
+    if isinstance(e, PERMANENT):
+        return False
+    return isinstance(e, RETRYABLE)
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter.
+
+    The delay before retry `n` is drawn uniformly from `[0, min(cap, base * 2**n)]`,
+    so workers that failed together don't retry together.
+
+    Args:
+        `base` (float, optional):
+            The delay ceiling of the first retry, in seconds. Defaults to BACKOFF_BASE.
+        `cap` (float, optional):
+            The largest delay ceiling, in seconds. Defaults to BACKOFF_CAP.
+    """
+
+    def __init__(self, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP):
+        self.base = base
+        self.cap = cap
+
+    def __repr__(self):
+        return f"Backoff(base={self.base}, cap={self.cap})"
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.cap, self.base * 2**attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops every worker from hammering the site once it starts failing broadly.
+
+    Tracks the outcomes of the last `window` fetches. When at least `ratio` of them
+    failed, the breaker opens and callers wait `cooldown` seconds. Then one
+    probe is let through: success closes the breaker, failure re-opens it. A
+    probe that ends without an outcome, e.g. cancelled, is released so the next
+    caller can probe instead.
+
+    Args:
+        `window` (int, optional):
+            The number of recent outcomes considered. Defaults to BREAKER_WINDOW.
+        `ratio` (float, optional):
+            The failure ratio that opens the breaker. Defaults to BREAKER_RATIO.
+        `cooldown` (float, optional):
+            Seconds the breaker stays open. Defaults to BREAKER_COOLDOWN.
+    """
+
+    def __init__(
+        self,
+        window: int = BREAKER_WINDOW,
+        ratio: float = BREAKER_RATIO,
+        cooldown: float = BREAKER_COOLDOWN,
+    ):
+        self.window = window
+        self.ratio = ratio
+        self.cooldown = cooldown
+        self.outcomes: list[bool] = []
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        # Numbers each probe, so a release can't free a later probe's slot
+        self._probe = 0
+        self.trips = 0
+        self._lock = Lock()
+
+    def __repr__(self):
+        return f"CircuitBreaker(state={self.state!r}, trips={self.trips})"
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if monotonic() - self.opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def admit(self) -> tuple[float, Optional[int]]:
+        """
+        Check whether a call may go ahead.
+
+        Returns:
+            `seconds` (float):
+                0 if the call may go ahead now, otherwise how long to wait before asking again.
+            `probe` (int | None):
+                When the call goes ahead as the half-open probe, the probe to pass to `release_probe()`.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0, None
+            remaining = self.cooldown - (monotonic() - self.opened_at)
+            if remaining > 0:
+                return remaining, None
+            if self.probing:
+                return PROBE_WAIT, None
+            self.probing = True
+            self._probe += 1
+            return 0.0, self._probe
+
+    def release_probe(self, probe: Optional[int]) -> None:
+        """Free the probe slot if `probe` still holds it, i.e. it ended without recording an outcome."""
+        with self._lock:
+            if probe is not None and self.probing and self._probe == probe:
+                log.debug("Circuit breaker probe ended without an outcome. Releasing it.")
+                self.probing = False
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                if not self.probing:
+                    # A call that started before the breaker opened
+                    return
+                self.probing = False
+                if success:
+                    log.info("Circuit breaker closed.")
+                    self.opened_at = None
+                    self.outcomes.clear()
+                else:
+                    self.opened_at = monotonic()
+                return
+            self.outcomes.append(success)
+            del self.outcomes[: -self.window]
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.window and failures >= self.ratio * self.window:
+                self.opened_at = monotonic()
+                self.trips += 1
+                log.warning(
+                    f"Circuit breaker opened: {failures} of the last {self.window} fetches failed. Pausing for {self.cooldown} seconds."
+                )
+
+
+class DeadLetters:
+    """
+    Chapters that failed permanently or ran out of retries, kept in json/dead_letters.json for a later retry.
+
+    The file is read once and kept in memory, and only rewritten when a chapter
+    is added or removed, so discarding a chapter that was never dead-lettered
+    costs nothing.
+
+    Args:
+        `path` (str, optional):
+            The dead-letter file. Defaults to DEAD_LETTERS_PATH.
+    """
+
+    def __init__(self, path: str = DEAD_LETTERS_PATH):
+        self.path = path
+        self._lock = Lock()
+        self._letters: Optional[dict] = None
+
+    def __repr__(self):
+        return f"DeadLetters(path={self.path!r})"
+
+    @property
+    def letters(self) -> dict:
+        """Chapter -> its dead letter, loaded on first use."""
+        if self._letters is None:
+            with self._lock:
+                if self._letters is None:
+                    self._letters = self.read()
+        return self._letters
+
+    def read(self) -> dict:
+        if not exists(self.path):
+            return {}
+        with open(self.path, "r") as infile:
+            return dict((load(infile)))
+
+    def _write(self, letters: dict) -> None:
+        with open(self.path, "w") as outfile:
+            dump(letters, outfile, indent=4)
+
+    def add(self, chapter: int, e: BaseException, attempts: int) -> None:
+        letters = self.letters
+        with self._lock:
+            letters[str(chapter)] = {
+                "chapter": int(chapter),
+                "error": repr(e),
+                "retryable": is_retryable(e),
+                "attempts": attempts,
+                "time": round(time(), 3),
+            }
+            self._write(letters)
+        log.warning(f"Chapter {chapter}: Sent to the dead-letter list after {attempts} attempts ({e!r}).")
+
+    def discard(self, chapter: int) -> None:
+        letters = self.letters
+        if str(chapter) not in letters:
+            return
+        with self._lock:
+            if letters.pop(str(chapter), None) is not None:
+                self._write(letters)
+
+    def chapters(self) -> list[int]:
+        """The dead-lettered chapters, ready to be passed back to the downloader."""
+        return sorted(int(chapter) for chapter in self.letters)
+
+
+dead_letters = DeadLetters()
+
+
+class FetchPolicy:
+    """
+    Retries, backoff, a circuit breaker, and a dead-letter list around a chapter fetch.
+
+    Args:
+        `retries` (int, optional):
+            Retries after the first attempt for retryable failures. Defaults to RETRIES.
+        `backoff` (Backoff, optional):
+            The delay between attempts. Defaults to `Backoff()`.
+        `breaker` (CircuitBreaker, optional):
+            Shared by every worker using this policy. Defaults to `CircuitBreaker()`.
+        `dead_letters` (DeadLetters, optional):
+            Where chapters that give up go. Pass None to disable. Defaults to `DeadLetters()`.
+    """
+
+    def __init__(
+        self,
+        retries: int = RETRIES,
+        backoff: Optional[Backoff] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        dead_letters: Optional[DeadLetters] = dead_letters,
+    ):
+        self.retries = retries
+        self.backoff = backoff or Backoff()
+        self.breaker = breaker or CircuitBreaker()
+        self.dead_letters = dead_letters
+
+    def __repr__(self):
+        return f"FetchPolicy(retries={self.retries}, {self.backoff!r}, {self.breaker!r})"
+
+    def _outcome(self, chapter: int, attempt: int, e: Optional[BaseException]) -> Optional[float]:
+        # Returns the delay before the next attempt, or None when done.
+        if e is None:
+            self.breaker.record(True)
+            if self.dead_letters is not None:
+                self.dead_letters.discard(chapter)
+            return None
+        retryable = is_retryable(e)
+        # A permanent failure still means the site answered
+        self.breaker.record(not retryable)
+        if not retryable or attempt >= self.retries:
+            if self.dead_letters is not None:
+                self.dead_letters.add(chapter, e, attempt + 1)
+            return None
+        delay = self.backoff.delay(attempt)
+        log.debug(f"Chapter {chapter}: Attempt {attempt + 1} failed ({e!r}). Retrying in {delay:.1f}s.")
+        return delay
+
+    def call(self, func: Callable, chapter: int, *args):
+        """
+        Call `func(chapter, *args)` under the policy, blocking between attempts.
+
+        Raises:
+            The last exception, once the chapter has been dead-lettered.
+        """
+        attempt = 0
+        while True:
+            wait, probe = self.breaker.admit()
+            while wait > 0:
+                sleep(wait)
+                wait, probe = self.breaker.admit()
+            try:
+                result = func(chapter, *args)
+            except Exception as e:
+                delay = self._outcome(chapter, attempt, e)
+                if delay is None:
+                    raise
+                sleep(delay)
+                attempt += 1
+            else:
+                self._outcome(chapter, attempt, None)
+                return result
+            finally:
+                # e.g. KeyboardInterrupt: no outcome was recorded
+                self.breaker.release_probe(probe)
+
+    async def acall(self, func: Callable[[], Awaitable], chapter: int):
+        """
+        Await `func()` under the policy, sleeping between attempts without blocking the event loop.
+
+        Raises:
+            The last exception, once the chapter has been dead-lettered.
+        """
+        attempt = 0
+        while True:
+            wait, probe = self.breaker.admit()
+            while wait > 0:
+                await asyncio.sleep(wait)
+                wait, probe = self.breaker.admit()
+            try:
+                result = await func()
+            except Exception as e:
+                delay = self._outcome(chapter, attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                self._outcome(chapter, attempt, None)
+                return result
+            finally:
+                # e.g. CancelledError: no outcome was recorded
+                self.breaker.release_probe(probe)
+
+
+fetch_policy = FetchPolicy()
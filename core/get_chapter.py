@@ -14,7 +14,8 @@ from tqdm.auto import tqdm
 
 from core.atlas import sg, BASE
 import core.chapter as chapter_
-from sg310.SG import badWords, fixDemigod, geno_r, status, removeDotCom
+from core.reader_session import bootstrap, ensure_reader_settings
+from core.rules import parse_rules
     
 
 LOG_PATH = "logs/supergene.log"
@@ -58,6 +59,7 @@ def get_text_from_ch(chapter: str) -> str:
     options = ChromeOptions()
     options.add_argument("--headless")
     driver = webdriver.Chrome(PATH, options=options)
+    bootstrap(driver)
 
     # Get Chapter Page
     driver.get(URL)
@@ -68,15 +70,7 @@ def get_text_from_ch(chapter: str) -> str:
     article_title = article_title.replace(title_prefix, "").replace(title_suffix, "")
 
     try:
-        settings_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.LINK_TEXT, "SETTING"))
-        )
-        settings_button.click()
-
-        change_bad_words_button = driver.find_element(
-            By.XPATH, '//*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a'
-        )
-        change_bad_words_button.click()
+        ensure_reader_settings(driver, chapter_num)
         try:
             text = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.ID, "vung_doc"))
@@ -111,53 +105,6 @@ def get_text_from_ch(chapter: str) -> str:
     return text
 
 
-def vog(text):
-    text = str(text)
-    blockquote_regex = [
-        r"\n(^\".*?killed.*?beast soul.*?point.*?\")$",
-        r"\n(^\".*?flesh.*?point.*?\")$",
-        r"\n(^\".*?Xenogeneic.*?hunted.*?gene.*?\")$",
-        r"\n(^\".*?hunted.*?:.*?beast soul.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?inedible.*?\")$",
-        r"\n(^\".*?beast soul.*?:.*?\")$",
-        r"\n(^\".*?beast soul.*?;.*?\")$",
-        r"\n(^\".*?:.*?gene lock.*?\")$",
-        r"\n(^\".*?gene.*?\+\d+.*?\")$",
-        r"\n(^\".*?hunted.*?found.*?.*?\")$",
-        r"\n(^\".*?body.*?evol.*?success.*?\")$",
-        r"\n(^\".*?consumed.*?geno point.*?\")$",
-        r"\n(^\".*?;.*?status.*?\")$",
-        r"\n(^\".*?retrieve.*?beast soul.*?from.*?\")$",
-        r"\n(^\".*?obtained.*?random.*?\")$",
-        r"\n(^\".*?absorb.*?geno point.*?\")$",
-        r"\n(^\".*?announce.*?:.*?\")$",
-        r"\n(^\".*?eaten\..*?geno point.*?\")$",
-        r"\n(^\".*?egg broken.*?identi.*?\")$",
-        r"\n(^\".*?Identifying.*?beast soul.*?\")$",
-        r"\n(^\".*?beast soul.*?identi.*?gained.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?life essence.*?\")$",
-        r"\n(^\".*?evolution.*?super body.*?\")$",
-        r"^(\".*?killed.*?beast soul.*?geno core.*?flesh.*?\")$",
-        r"\n(^\"Deified Gene.*?+1.*?\")$",
-        r"\n(^\"God.*?Evolu.*?\")$",
-    ]
-    matches = []
-    for regex in blockquote_regex:
-        matches = findall(regex, text, re.I | re.M)
-        if matches:
-            for match in matches:
-                block = str("> " + match)
-                block = block.title()
-                text = sub(match, block, text, re.I, re.M)
-            duplicate_regex = r"^(> > )\""
-            duplicate_results = findall(duplicate_regex, text, re.I | re.M)
-            if duplicate_results:
-                for x in duplicate_results:
-                    rep_str = r"> "
-                    text = sub(x, rep_str, text, re.I | re.M)
-    return text
-
-
 def parse_chapter(text: str, chapter: str) -> str:
     text = str(text)
     chapter = str(chapter)
@@ -166,87 +113,10 @@ def parse_chapter(text: str, chapter: str) -> str:
     title = chapter_dict["title"]
     tags = {"redownload", "reparsed"}
 
-    # Search for HTML Header in Text:
-    remove_meta_regex = r"(Chapter.*\n\n.*?Nyoi-Bo Studio.*\n)\n$|(.*?Nyoi-Bo Studio.*\n)$\n|(.*?Chapter.*$\n)\n"
-    article_header = re.search(remove_meta_regex, text, re.I | re.M)
-    if article_header:
-        # If HTML Header found, replace it with Head
-        article_header = article_header.group()
-        article_header = str(article_header)
-        text = str(text.replace(article_header, ""))
-    studioRegex = r"(.*?Nyoi.*\n\n)"
-    studioResults = findall(studioRegex, text, re.M | re.I)
-    if studioResults:
-        text = sub(studioRegex, "", text, flags=re.M | re.I)
-    if chapter in text:
-        regex_string = str(r"^(.*?)" + chapter + r"(.*)$")
-        text = sub(regex_string, "", text)
-
-    # Remove Title and Chapter data from top of chapter
-    split_text = text.split("\n\n")
-    first2lines = split_text[0:1]
-    if title in first2lines:
-        for x, line in enumerate(first2lines):
-            if title in line:
-                line = sub(title, "", text)
-                split_text[x] = line
-    if chapter in first2lines:
-        for x, line in enumerate(first2lines):
-            if chapter in line:
-                line = sub(chapter, "", text)
-                split_text[x] = line
-    updated_text = "\n\n".join(split_text)
-    if updated_text != text:
-        text = updated_text
-
-    # Blockquote - VoG  -----------------------------------------
-    vog_text = str(vog(text))
-    if vog_text != text:
-        if text != "None":
-            text = str(vog_text)
-            tags.add("vog")
-        else:
-            sys.exit()
+    # Header, VoG, status and geno-r tables, censored words, advertisements...
+    text, parsed_tags = parse_rules.apply(text, chapter=chapter_num, title=title)
+    tags |= parsed_tags
 
-    # Check for Status Table ------------------------------------
-    status_text = str(status(text))
-    if status_text != text:
-        if status_text != "None":
-            text = str(status_text)
-            tags.add("status")
-
-    # Check for Geno-r Table --------------------------------------
-    genoR_text = str(geno_r(text))
-    if genoR_text != text:
-        if genoR_text != "None":
-            text = str(genoR_text)
-            tags.add("geno_r")
-
-    # Check for new Beast Soul
-    regex = r"(.*?)beast soul(.*?)type(.*?)$"
-    chapter_matches = findall(regex, text)
-    if chapter_matches:
-        tags.add("beast")
-    else:
-        regex = r"(.*?)type(.*?)beast soul(.*?)$"
-        chapter_matches = findall(regex, text)
-        if chapter_matches:
-            tags.add("beast")
-
-    # Fix censored bad words
-    text = badWords(text, chapter)
-    parsed_text = str(text)
-
-    # Fix Demigod and Advertisements
-    text = fixDemigod(parsed_text)
-    text = removeDotCom(text)
-
-    # Fix Jadeskin
-    jadeskin_results = findall("jadeskin", text)
-    if jadeskin_results:
-        for result in jadeskin_results:
-            text = sub(result, "Jadeskin", text)
-    
     book = chapter_.generate_book(chapter_num)
     book_str = str(book).zfill(2)
     with open(f"books/book{book_str}/ParseChapter.md", "w") as outfile:
@@ -0,0 +1,270 @@
+# core/html_cache.py
+
+import gzip
+import os
+from hashlib import sha256
+from json import dumps, loads
+from tempfile import mkstemp
+from threading import Lock
+from time import time
+from typing import Iterator, Optional
+
+from core.base import BASE
+from core.log import errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          HTML Cache                             │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+CACHE_DIR = f"{BASE}/cache/html"
+MAX_BYTES = 512 * 1024 * 1024
+# After an eviction the cache is trimmed to this fraction of MAX_BYTES.
+LOW_WATER = 0.9
+# index.jsonl is rewritten once it holds this many lines per live URL (plus slack),
+# so access records from cache hits can't grow it without bound.
+COMPACT_RATIO = 4
+COMPACT_SLACK = 1024
+
+
+class HTMLCache:
+    """
+    An on-disk cache of raw chapter pages.
+
+    Pages are stored gzipped under the sha256 of their content, so identical
+    pages are stored once. `index.jsonl` is an append-only log mapping each URL
+    to its current content hash and recording each read, so the access order
+    survives a restart; it is replayed on load and compacted on eviction or
+    once it holds about `COMPACT_RATIO` lines per URL. When the objects exceed
+    `max_bytes`, the least recently used URLs are dropped until the cache is
+    back under `LOW_WATER * max_bytes`.
+
+    Args:
+        `path` (str, optional):
+            The cache directory. Defaults to CACHE_DIR.
+        `max_bytes` (int, optional):
+            The size limit of the stored objects. Defaults to MAX_BYTES.
+    """
+
+    def __init__(self, path: str = CACHE_DIR, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.index_path = f"{path}/index.jsonl"
+        self._lock = Lock()
+        self._entries: Optional[dict] = None
+        self._lines = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        entries = self._entries or {}
+        return f"HTMLCache(path={self.path!r}, urls={len(entries)}, bytes={self.size}, hits={self.hits}, misses={self.misses})"
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url: str):
+        return url in self.entries
+
+    # > Index
+    @property
+    def entries(self) -> dict:
+        """URL -> {hash, chapter, size, fetched, accessed}, loaded on first use."""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._load()
+        return self._entries
+
+    @property
+    def size(self) -> int:
+        """The bytes on disk of every object still referenced by a URL."""
+        objects = {entry["hash"]: entry["size"] for entry in (self._entries or {}).values()}
+        return sum(objects.values())
+
+    def _load(self) -> dict:
+        entries = {}
+        if not os.path.exists(self.index_path):
+            return entries
+        with open(self.index_path, "r") as infile:
+            for line in infile:
+                line = line.strip()
+                if not line:
+                    continue
+                self._lines += 1
+                record = loads(line)
+                url = record.pop("url")
+                if "hash" not in record:
+                    if url in entries:
+                        entries[url]["accessed"] = record["accessed"]
+                elif record["hash"] is None:
+                    entries.pop(url, None)
+                else:
+                    record.setdefault("accessed", record["fetched"])
+                    entries[url] = record
+        return entries
+
+    def _append(self, record: dict) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.index_path, "a") as outfile:
+            outfile.write(dumps(record) + "\n")
+        self._lines += 1
+        if self._lines > COMPACT_RATIO * len(self._entries) + COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as outfile:
+            for url, entry in self._entries.items():
+                outfile.write(dumps({"url": url, **entry}) + "\n")
+        os.replace(tmp_path, self.index_path)
+        self._lines = len(self._entries)
+
+    def object_path(self, digest: str) -> str:
+        return f"{self.path}/objects/{digest[:2]}/{digest}.html.gz"
+
+    # > Read / Write
+    def put(self, url: str, html: str, chapter: Optional[int] = None) -> str:
+        """
+        Store the raw page fetched from a URL.
+
+        Args:
+            `url` (str):
+                The URL the page was fetched from.
+            `html` (str):
+                The raw page.
+            `chapter` (int, optional):
+                The chapter the page belongs to.
+
+        Returns:
+            `digest` (str):
+                The sha256 of the page, which names its object.
+        """
+        data = html.encode("utf-8")
+        digest = sha256(data).hexdigest()
+        object_path = self.object_path(digest)
+        object_dir = os.path.dirname(object_path)
+        os.makedirs(object_dir, exist_ok=True)
+        # Compress outside the lock into a temp file only this call uses
+        fd, tmp_path = mkstemp(dir=object_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            with gzip.open(tmp_path, "wb", compresslevel=6) as outfile:
+                outfile.write(data)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        entries = self.entries
+        with self._lock:
+            # An eviction can't remove the object between here and the entry being recorded
+            if os.path.exists(object_path):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, object_path)
+            now = time()
+            entry = {
+                "hash": digest,
+                "chapter": chapter,
+                "size": os.path.getsize(object_path),
+                "fetched": now,
+                "accessed": now,
+            }
+            previous = entries.get(url)
+            entries[url] = entry
+            self._append({"url": url, **entry})
+            if previous is not None and previous["hash"] != digest:
+                self._remove_unreferenced([previous["hash"]])
+            over = self.size > self.max_bytes
+        if over:
+            self.evict()
+        return digest
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        Retrieve the cached page for a URL.
+
+        Args:
+            `url` (str):
+                The URL of the page.
+
+        Returns:
+            `html` (str | None):
+                The cached page, or None if the URL is not cached.
+        """
+        entry = self.entries.get(url)
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            with gzip.open(self.object_path(entry["hash"]), "rb") as infile:
+                html = infile.read().decode("utf-8")
+        except FileNotFoundError:
+            # Unless another thread evicted the URL meanwhile, the object went missing
+            if self.entries.get(url) is entry:
+                log.warning(f"Cached page for {url} is missing its object. Dropping it.")
+                self.discard(url)
+            self.misses += 1
+            return None
+        with self._lock:
+            if self._entries.get(url) is entry:
+                entry["accessed"] = time()
+                self._append({"url": url, "accessed": entry["accessed"]})
+        self.hits += 1
+        return html
+
+    def discard(self, url: str) -> None:
+        """Forget a URL, deleting its object if nothing else references it."""
+        entries = self.entries
+        with self._lock:
+            entry = entries.pop(url, None)
+            if entry is None:
+                return
+            self._append({"url": url, "hash": None})
+            self._remove_unreferenced([entry["hash"]])
+
+    def _remove_unreferenced(self, digests: list[str]) -> None:
+        referenced = {entry["hash"] for entry in self._entries.values()}
+        for digest in set(digests) - referenced:
+            try:
+                os.remove(self.object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    @errwrap(entry=False)
+    def evict(self) -> int:
+        """
+        Drop least recently used URLs until the cache is under its low-water mark.
+
+        Returns:
+            `evicted` (int):
+                The number of URLs dropped.
+        """
+        target = int(self.max_bytes * LOW_WATER)
+        with self._lock:
+            sizes, refs = {}, {}
+            for entry in self._entries.values():
+                sizes[entry["hash"]] = entry["size"]
+                refs[entry["hash"]] = refs.get(entry["hash"], 0) + 1
+            total = sum(sizes.values())
+            evicted = []
+            for url, entry in sorted(self._entries.items(), key=lambda item: item[1]["accessed"]):
+                if total <= target:
+                    break
+                del self._entries[url]
+                evicted.append(entry["hash"])
+                refs[entry["hash"]] -= 1
+                if refs[entry["hash"]] == 0:
+                    total -= sizes[entry["hash"]]
+            self._remove_unreferenced(evicted)
+            self._compact()
+        log.info(f"Evicted {len(evicted)} pages from the HTML cache.")
+        return len(evicted)
+
+    def chapters(self) -> Iterator[tuple[int, str]]:
+        """Yield (chapter, url) for every cached page that belongs to a chapter."""
+        for url, entry in sorted(self.entries.items(), key=lambda item: item[1]["chapter"] or 0):
+            if entry["chapter"] is not None:
+                yield entry["chapter"], url
+
+
+html_cache = HTMLCache()
@@ -0,0 +1,198 @@
+# core/http_fetch.py
+
+from threading import Lock, local
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from core.html_cache import html_cache
+from core.log import errwrap, log
+from core.reader_session import CENSORED_REGEX, load_reader_cookies
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                           HTTP Fetch                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+TIMEOUT = 15
+MIN_LENGTH = 200
+FAILURE_LIMIT = 10
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+try:
+    import lxml
+
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+
+class ChapterTextInvalid(Exception):
+    chapter: int
+    msg: str = "Chapter text failed validation."
+
+    def __init__(self, chapter: int, msg: str = "Chapter text failed validation."):
+        self.chapter = chapter
+        self.msg = msg
+
+    def __repr__(self):
+        return f"ChapterTextInvalid: Chapter {self.chapter}: {self.msg}"
+
+
+#> Session
+_thread = local()
+
+
+def get_session() -> requests.Session:
+    """
+    Retrieve this thread's HTTP session, creating it on first use.
+
+    Returns:
+        `session` (requests.Session):
+            A keep-alive session with the reader cookies applied.
+    """
+    session = getattr(_thread, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        _thread.session = session
+    session.cookies.update(load_reader_cookies())
+    return session
+
+
+#> Fetch, Extract, Validate
+def fetch_chapter_html(url: str, timeout: float = TIMEOUT) -> str:
+    """
+    Request a chapter page over plain HTTP.
+
+    Args:
+        `url` (str):
+            The chapter's URL from json/toc2.json.
+        `timeout` (float, optional):
+            Seconds to wait for the response. Defaults to TIMEOUT.
+
+    Returns:
+        `html` (str):
+            The raw HTML of the chapter page.
+    """
+    response = get_session().get(url, timeout=timeout)
+    response.raise_for_status()
+    return response.text
+
+
+def extract_chapter_text(html: str, chapter: int) -> str:
+    """
+    Extract the paragraphs of `#vung_doc` from a chapter page.
+
+    Only the `#vung_doc` subtree is built, and each paragraph's whitespace is
+    collapsed the same way a browser renders `paragraph.text`.
+
+    Args:
+        `html` (str):
+            The raw HTML of the chapter page.
+        `chapter` (int):
+            The chapter the page belongs to.
+
+    Raises:
+        `ChapterTextInvalid`: The page has no `#vung_doc`.
+
+    Returns:
+        `text` (str):
+            The chapter's paragraphs separated by blank lines.
+    """
+    soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer(id="vung_doc"))
+    vung_doc = soup.find(id="vung_doc")
+    if vung_doc is None:
+        raise ChapterTextInvalid(chapter, "Unable to find #vung_doc on the page.")
+    paragraphs = [" ".join(p.get_text().split()) for p in vung_doc.find_all("p")]
+    return "\n\n".join(paragraphs).strip()
+
+
+def validate_chapter_text(text: str, chapter: int) -> str:
+    """
+    Check that extracted chapter text is complete and uncensored.
+
+    Args:
+        `text` (str):
+            The extracted chapter text.
+        `chapter` (int):
+            The given chapter.
+
+    Raises:
+        `ChapterTextInvalid`: The text is too short or still censored.
+
+    Returns:
+        `text` (str):
+            The validated text.
+    """
+    if len(text) < MIN_LENGTH:
+        raise ChapterTextInvalid(chapter, f"Chapter text is only {len(text)} characters long.")
+    censored = CENSORED_REGEX.search(text)
+    if censored:
+        raise ChapterTextInvalid(
+            chapter, f"Chapter text is still censored ('{censored.group()}')."
+        )
+    return text
+
+
+#> Engine
+class HTTPEngine:
+    """
+    Tracks whether the HTTP path is worth trying.
+
+    If the lightweight path fails validation `FAILURE_LIMIT` times in a row
+    (e.g. the reader settings cannot be reproduced with cookies), it is
+    switched off for the rest of the run and every chapter goes straight to
+    the browser.
+    """
+
+    def __init__(self, failure_limit: int = FAILURE_LIMIT):
+        self.failure_limit = failure_limit
+        self.failures = 0
+        self.enabled = True
+        self._lock = Lock()
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self.failures = 0
+
+    def failed(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.enabled and self.failures >= self.failure_limit:
+                self.enabled = False
+                log.warning(
+                    f"HTTP chapter fetch failed validation {self.failures} times in a row. Using the browser for the rest of this run."
+                )
+
+
+http_engine = HTTPEngine()
+
+
+@errwrap(entry=False, exit=False)
+def get_chapter_text_http(chapter: int, url: str) -> str:
+    """
+    Fetch and extract a chapter's text without a browser.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+        `url` (str):
+            The chapter's URL.
+
+    Raises:
+        `ChapterTextInvalid`: The extracted text failed validation.
+        `requests.RequestException`: The request failed.
+
+    Returns:
+        `text` (str):
+            The chapter's unparsed text.
+    """
+    html = fetch_chapter_html(url)
+    html_cache.put(url, html, chapter)
+    text = extract_chapter_text(html, chapter)
+    return validate_chapter_text(text, chapter)
@@ -0,0 +1,174 @@
+# core/indexes.py
+
+from dataclasses import asdict, dataclass
+from typing import Iterable, Optional
+
+from mongoengine import Document
+from mongoengine.queryset import QuerySet
+
+from core.atlas import sg
+from core.book import Book
+from core.chapter import Chapter
+from core.defaultdoc import Defaultdoc
+from core.log import errwrap, log
+from core.section import Section
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                            Indexes                              │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+# The models whose `meta["indexes"]` are built by bootstrap(). None of them
+# build indexes on first access, so this is the one place it happens.
+MODELS = (Chapter, Section, Book, Defaultdoc)
+
+
+@dataclass
+class QueryPlan:
+    """How MongoDB answered one of the lookups the project makes."""
+
+    query: str
+    stages: list[str]
+    index: Optional[str]
+    keys_examined: Optional[int]
+    docs_examined: Optional[int]
+    returned: Optional[int]
+
+    @property
+    def collection_scan(self) -> bool:
+        return "COLLSCAN" in self.stages
+
+    def row(self) -> str:
+        stages = " > ".join(self.stages)
+        return (
+            f"{self.query:<22} {str(self.index):<22} {str(self.keys_examined):>6}"
+            f" {str(self.docs_examined):>6} {str(self.returned):>6}  {stages}"
+        )
+
+
+HEADER = f"{'query':<22} {'index':<22} {'keys':>6} {'docs':>6} {'found':>6}  stages"
+
+
+def sample_queries() -> dict[str, QuerySet]:
+    """The lookups the rest of the project makes, one representative query each."""
+    return {
+        "chapter": Chapter.objects(chapter=1),
+        "chapter range": Chapter.objects(chapter__gte=1, chapter__lte=100).order_by("chapter"),
+        "chapters of book": Chapter.objects(book=1).order_by("chapter"),
+        "chapters of section": Chapter.objects(section=1).order_by("chapter"),
+        "chapter text search": Chapter.objects.search_text('"gene"'),
+        "section": Section.objects(section=1),
+        "sections of book": Section.objects(book=1),
+        "book": Book.objects(book=1),
+        "defaultdoc": Defaultdoc.objects(book=1),
+    }
+
+
+#> Plans
+def plan_stages(plan: dict) -> list[str]:
+    """Flatten a winning plan into its stages, outermost first."""
+    # Slot-based engine plans nest the classic plan under queryPlan
+    plan = plan.get("queryPlan", plan)
+    stages = [plan.get("stage", "?")]
+    children = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+    for child in children:
+        stages.extend(plan_stages(child))
+    return stages
+
+
+def plan_index(plan: dict) -> Optional[str]:
+    """The name of the first index a winning plan reads, if any."""
+    plan = plan.get("queryPlan", plan)
+    if "indexName" in plan:
+        return plan["indexName"]
+    for child in plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else []):
+        index = plan_index(child)
+        if index is not None:
+            return index
+    return None
+
+
+def explain(name: str, queryset: QuerySet) -> QueryPlan:
+    """
+    Ask MongoDB how it answers a query.
+
+    Args:
+        `name` (str):
+            A label for the query.
+        `queryset` (QuerySet):
+            The query to explain.
+
+    Returns:
+        `plan` (QueryPlan):
+            The winning plan's stages and index, with the execution counts when the server reports them.
+    """
+    result = queryset.explain()
+    winning = result["queryPlanner"]["winningPlan"]
+    stats = result.get("executionStats", {})
+    return QueryPlan(
+        query=name,
+        stages=plan_stages(winning),
+        index=plan_index(winning),
+        keys_examined=stats.get("totalKeysExamined"),
+        docs_examined=stats.get("totalDocsExamined"),
+        returned=stats.get("nReturned"),
+    )
+
+
+@errwrap()
+def explain_queries(queries: Optional[dict[str, QuerySet]] = None) -> list[QueryPlan]:
+    """
+    Explain the project's lookups and log the plans, warning about collection scans.
+
+    Args:
+        `queries` (dict[str, QuerySet], optional):
+            Name -> query. Defaults to `sample_queries()`.
+
+    Returns:
+        `plans` (list[QueryPlan]):
+            One plan per query.
+    """
+    sg()
+    queries = queries if queries is not None else sample_queries()
+    plans = [explain(name, queryset) for name, queryset in queries.items()]
+    table = "\n".join([HEADER] + [plan.row() for plan in plans])
+    log.info(f"Query plans:\n<code>{table}</code>")
+    scans = [plan.query for plan in plans if plan.collection_scan]
+    if scans:
+        log.warning(f"Collection scans: {', '.join(scans)}. Run the index bootstrap.")
+    return plans
+
+
+#> Bootstrap
+@errwrap()
+def bootstrap(models: Iterable[type[Document]] = MODELS, explain_plans: bool = True) -> dict:
+    """
+    Build the declared indexes of each model, then report every query's plan.
+
+    Building an index that already exists is a no-op, so this is safe to re-run.
+    Indexes in MongoDB that a model no longer declares are reported, not dropped.
+
+    Args:
+        `models` (Iterable[type[Document]], optional):
+            The models to index. Defaults to MODELS.
+        `explain_plans` (bool, optional):
+            Whether to explain `sample_queries()` afterwards. Defaults to True.
+
+    Returns:
+        `report` (dict):
+            `indexes`: model -> index names, `extra`: model -> undeclared indexes, `plans`: the query plans.
+    """
+    sg()
+    report = {"indexes": {}, "extra": {}, "plans": []}
+    for model in models:
+        model.ensure_indexes()
+        name = model.__name__
+        report["indexes"][name] = sorted(model._get_collection().index_information())
+        extra = model.compare_indexes()["extra"]
+        if extra:
+            report["extra"][name] = extra
+            log.warning(f"{name}: indexes not declared by the model: {extra}")
+        log.info(f"{name}: {', '.join(report['indexes'][name])}")
+    if explain_plans:
+        report["plans"] = [asdict(plan) for plan in explain_queries()]
+    return report
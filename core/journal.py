@@ -0,0 +1,161 @@
+# core/journal.py
+
+import os
+from json import dumps, loads
+from threading import Lock
+from time import time
+from typing import Iterable, Optional
+
+from core.base import BASE
+from core.log import current_run, errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                        Download Journal                         │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+JOURNAL_PATH = f"{BASE}/json/download_journal.jsonl"
+
+# Chapter states, in pipeline order
+FETCHED = "fetched"
+PARSED = "parsed"
+PERSISTED = "persisted"
+FAILED = "failed"
+STATES = (FETCHED, PARSED, PERSISTED, FAILED)
+
+
+class DownloadJournal:
+    """
+    An append-only record of each chapter's progress through the downloader.
+
+    Every state change is one JSON line appended to the journal, so recording
+    progress never rewrites a file, and a crash loses at most the line being
+    written. Replaying the journal gives each chapter's latest state; a restart
+    only needs the chapters that have not reached `persisted`.
+
+    Args:
+        `path` (str, optional):
+            The journal file. Defaults to JOURNAL_PATH.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self._lock = Lock()
+        self._file = None
+
+    def __repr__(self):
+        return f"DownloadJournal(path={self.path!r})"
+
+    def __enter__(self) -> "DownloadJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, chapter: int, state: str, reason: Optional[str] = None) -> None:
+        """
+        Append a chapter's new state to the journal.
+
+        Args:
+            `chapter` (int):
+                The given chapter.
+            `state` (str):
+                One of `fetched`, `parsed`, `persisted`, or `failed`.
+            `reason` (str, optional):
+                Why the chapter failed.
+        """
+        if state not in STATES:
+            raise ValueError("Invalid journal state.", f"state: {state}")
+        entry = {"chapter": int(chapter), "state": state, "time": round(time(), 3), "run": current_run}
+        if reason is not None:
+            entry["reason"] = reason
+        line = dumps(entry) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a", buffering=1)
+            self._file.write(line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def replay(self) -> dict:
+        """
+        Read the journal back.
+
+        Returns:
+            `latest` (dict):
+                Chapter -> the chapter's latest journal entry.
+        """
+        latest = {}
+        if not os.path.exists(self.path):
+            return latest
+        with open(self.path, "r") as infile:
+            for line in infile:
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    # A torn final line from a crash mid-write
+                    continue
+                latest[entry["chapter"]] = entry
+        return latest
+
+    def pending(self, chapters: Iterable[int]) -> list[int]:
+        """
+        Filter the given chapters down to the ones that still need downloading.
+
+        Args:
+            `chapters` (Iterable[int]):
+                The chapters of the job.
+
+        Returns:
+            `pending` (list[int]):
+                The chapters that are missing from the journal, failed, or never persisted.
+        """
+        latest = self.replay()
+        return [
+            chapter
+            for chapter in chapters
+            if chapter is not None and latest.get(int(chapter), {}).get("state") != PERSISTED
+        ]
+
+    def failed(self) -> dict:
+        """
+        Retrieve the chapters whose latest state is `failed`.
+
+        Returns:
+            `failed` (dict):
+                Chapter -> reason.
+        """
+        return {
+            chapter: entry.get("reason")
+            for chapter, entry in self.replay().items()
+            if entry["state"] == FAILED
+        }
+
+    @errwrap(entry=False)
+    def compact(self) -> int:
+        """
+        Rewrite the journal with only each chapter's latest entry.
+
+        Returns:
+            `entries` (int):
+                The number of entries kept.
+        """
+        latest = self.replay()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as outfile:
+                for chapter in sorted(latest):
+                    outfile.write(dumps(latest[chapter]) + "\n")
+            os.replace(tmp_path, self.path)
+        log.debug(f"Compacted download journal to {len(latest)} entries.")
+        return len(latest)
+
+
+journal = DownloadJournal()
@@ -1,7 +1,10 @@
 # core/log.py
+import atexit
 import functools
 import os
 import sys
+import threading
+from bisect import bisect_left
 from json import dump, load
 from platform import platform
 from subprocess import run
@@ -511,22 +514,117 @@ def errwrap(*, entry=True, exit=True, level="DEBUG", test: bool=False):
     return wrapper
 
 
-class CommandLogger(monitoring.CommandListener):
+#> Command monitoring
+# Upper bounds of the latency buckets, in milliseconds; the last bucket is open-ended.
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+SLOW_COMMAND_MS = 500
+
+
+class CommandStats(monitoring.CommandListener):
+    """
+    Aggregates MongoDB commands in memory instead of logging each one.
+
+    Commands are grouped by command name and collection. Each group keeps a
+    count, failures, total and slowest latency, and a histogram over
+    LATENCY_BUCKETS. Commands slower than SLOW_COMMAND_MS are still logged
+    individually. `log_summary()` logs the table, and runs at exit.
+    """
+
+    def __init__(self, slow_ms: float = SLOW_COMMAND_MS):
+        self.slow_ms = slow_ms
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.stats = {}
+
     def started(self, event):
-        log.debug("Command {0.command_name} with request id "
-            "{0.request_id} started on server "
-            "{0.connection_id}".format(event))
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            # getMore names its cursor id there, and its collection under "collection"
+            collection = event.command.get("collection")
+            if not isinstance(collection, str):
+                collection = ""
+        with self.lock:
+            self.pending[(event.connection_id, event.request_id)] = (event.command_name, collection)
 
     def succeeded(self, event):
-        log.debug("Command {0.command_name} with request id "
-            "{0.request_id} on server {0.connection_id} "
-            "succeeded in {0.duration_micros} "
-            "microseconds".format(event))
+        self.record(event, failed=False)
 
     def failed(self, event):
-        log.debug("Command {0.command_name} with request id "
-            "{0.request_id} on server {0.connection_id} "
-            "failed in {0.duration_micros} "
-            "microseconds".format(event))
-            
-monitoring.register(CommandLogger())
+        self.record(event, failed=True)
+
+    def record(self, event, failed: bool):
+        ms = event.duration_micros / 1000
+        with self.lock:
+            key = self.pending.pop((event.connection_id, event.request_id), (event.command_name, ""))
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self.stats[key] = {
+                    "count": 0,
+                    "failed": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
+            stats["count"] += 1
+            stats["failed"] += failed
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["buckets"][bisect_left(LATENCY_BUCKETS, ms)] += 1
+        if ms >= self.slow_ms:
+            log.debug(f"Slow command: {key[0]} on '{key[1]}' took {ms:.0f} ms.")
+
+    def percentile(self, buckets: list[int], fraction: float) -> str:
+        """The upper bound of the bucket holding the given fraction of commands."""
+        target = fraction * sum(buckets)
+        seen = 0
+        for index, count in enumerate(buckets):
+            seen += count
+            if seen >= target:
+                return f"{LATENCY_BUCKETS[index]}" if index < len(LATENCY_BUCKETS) else f">{LATENCY_BUCKETS[-1]}"
+        return "-"
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            `summary` (dict):
+                "command collection" -> count, failed, error rate, mean, p50, p95 and max latency in ms, and the histogram.
+        """
+        with self.lock:
+            stats = {key: dict(value, buckets=list(value["buckets"])) for key, value in self.stats.items()}
+        labels = [f"<={bound}" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}"]
+        summary = {}
+        for (command, collection), value in sorted(stats.items(), key=lambda item: -item[1]["total_ms"]):
+            summary[f"{command} {collection}".strip()] = {
+                "count": value["count"],
+                "failed": value["failed"],
+                "error_rate": round(value["failed"] / value["count"], 4),
+                "mean_ms": round(value["total_ms"] / value["count"], 2),
+                "p50_ms": self.percentile(value["buckets"], 0.5),
+                "p95_ms": self.percentile(value["buckets"], 0.95),
+                "max_ms": round(value["max_ms"], 2),
+                "buckets": dict(zip(labels, value["buckets"])),
+            }
+        return summary
+
+    def log_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        rows = [f"{'command':<32} {'count':>7} {'errors':>7} {'mean':>8} {'p50':>7} {'p95':>7} {'max':>9}"]
+        for name, value in summary.items():
+            rows.append(
+                f"{name:<32} {value['count']:>7} {value['error_rate']:>7.2%} {value['mean_ms']:>8} "
+                f"{value['p50_ms']:>7} {value['p95_ms']:>7} {value['max_ms']:>9}"
+            )
+        table = "\n".join(rows)
+        log.info(f"MongoDB commands this run (latency in ms):\n<code>{table}</code>")
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+            self.pending.clear()
+
+
+command_stats = CommandStats()
+monitoring.register(command_stats)
+atexit.register(command_stats.log_summary)
@@ -10,33 +10,31 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from requests import RequestException
 from core.log import log
 from core.chapter import Chapter, generate_book
 from core.base import BASE
+from core.driver_pool import DriverPool, headless_chrome
+from core.fetch_policy import fetch_policy
+from core.html_cache import html_cache
+from core.http_fetch import (
+    ChapterTextInvalid,
+    extract_chapter_text,
+    get_chapter_text_http,
+    http_engine,
+)
+from core.reader_session import (
+    BadWordsButtonNotFound,
+    SettingsButtonNotFound,
+    apply_reader_settings,
+    bootstrap,
+    click_bad_words,
+    click_settings,
+    ensure_reader_settings,
+    is_censored,
+)
 
 #> Declare Custom Exceptions
-class SettingsButtonNotFound(NoSuchElementException):
-    chapter: int
-    msg: str = "Unable to find settings button."
-
-    def __init__(self, chapter: int, msg: str = "Unable to find settings button."):
-        self.chapter = chapter
-        self.msg = msg
-
-    def __repr__(self):
-        return f"SettingsButtonNotFound: Chapter {self.chapter}: {self.msg}"
-
-class BadWordsButtonNotFound(NoSuchElementException):
-    chapter: int
-    msg: str = "Unable to find bad words button."
-
-    def __init__(self, chapter: int, msg: str = "Unable to find bad words button."):
-        self.chapter = chapter
-        self.msg = msg
-
-    def __repr__(self):
-        return f"BadWordsButtonNotFound: Chapter {self.chapter}: {self.msg}"
-
 class ChapterTextNotFound(NoSuchElementException):
     chapter: int
     msg: str = "Unable to find chapter text."
@@ -76,6 +74,15 @@ class UnableToParseChapterText(Exception):
 
 
 NUM_THREADS = 24
+MAX_PAGES = 100
+# How scrape_chapter_text reads the page: "script", "html", or "elements".
+SCRAPE_MODE = "script"
+# Every paragraph's rendered text in one round trip; trimmed like WebElement.text.
+PARAGRAPHS_SCRIPT = """
+return Array.prototype.map.call(arguments[0].getElementsByTagName("p"), function (p) {
+    return p.innerText.trim();
+});
+"""
 chapter_dicts = []
 
 # read toc2
@@ -122,11 +129,13 @@ def timer(*, entry: bool = True, exit: bool = True, level="DEBUG"):
 
 
 #> Driver
-# called by get_chapter_text()
 def browser():
-    chromeoptions = webdriver.ChromeOptions().add_argument("--headless")
-    driver = webdriver.Chrome(options=chromeoptions)
-    return driver
+    return headless_chrome()
+
+# Long-lived sessions shared by get_chapter_text() workers.
+# Sessions are started lazily, so importing this module starts no browsers.
+# New sessions are seeded with the stored reader settings.
+driver_pool = DriverPool(size=NUM_THREADS, max_pages=MAX_PAGES, factory=browser, on_start=bootstrap)
 
 # called by get_chapter_text()
 
@@ -136,49 +145,42 @@ def get_chapter_dict(chapter: int) -> dict:
     return chapter_dict
 
 
- # called by get_chapter_text()
-def click_settings(driver, chapter: int):
-    # Wait for Settings Button to load, then click it
-    try:
-        settings_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.LINK_TEXT, "SETTING"))
-        )
-        settings_button.click()
-    except NoSuchElementException:
-        raise SettingsButtonNotFound(chapter)
-    else:
-        log.debug(f"Chapter {chapter}: Clicked settings button.")
-
-
-# @timer() # called by get_chapter_text()
-def click_bad_words(driver, chapter: int):
-    # Click Bad Words Button
-    try:
-        change_bad_words_button = driver.find_element(
-            By.XPATH, '//*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a'
-        )
-        change_bad_words_button.click()
-    except NoSuchElementException:
-        raise BadWordsButtonNotFound(chapter)
-    else:
-        log.debug(f"Chapter {chapter}: Clicked bad words button.")
-
-
 # @timer()# called by get_chapter_text()
-def scrape_chapter_text(driver, chapter: int) -> str:
+def scrape_chapter_text(driver, chapter: int, mode: str = SCRAPE_MODE) -> str:
+    """
+    Scrape the paragraphs of `#vung_doc` from the chapter page loaded in `driver`.
+
+    Args:
+        `driver` (webdriver.Chrome):
+            A driver on a chapter page.
+        `chapter` (int):
+            The chapter on the page.
+        `mode` (str, optional):
+            `script` reads every paragraph's text in one script execution, `html` reads
+            `#vung_doc`'s innerHTML once and parses it locally, and `elements` reads each
+            paragraph's text in its own round trip. Defaults to SCRAPE_MODE.
+
+    Returns:
+        `text` (str):
+            The chapter's paragraphs separated by blank lines.
+    """
     # Wait for text to load; then get it
     try:
-        text = WebDriverWait(driver, 10).until(
+        vung_doc = WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, "vung_doc"))
         )
-        text = driver.find_element(By.ID, "vung_doc")
-        paragraphs = text.find_elements(By.TAG_NAME, "p")
-        text = ""
-        for paragraph in paragraphs:
-            text = str(text + paragraph.text + "\n\n")
+        if mode == "script":
+            paragraphs = driver.execute_script(PARAGRAPHS_SCRIPT, vung_doc)
+        elif mode == "html":
+            inner_html = vung_doc.get_attribute("innerHTML")
+            return extract_chapter_text(f'<div id="vung_doc">{inner_html}</div>', chapter)
+        elif mode == "elements":
+            paragraphs = [paragraph.text for paragraph in vung_doc.find_elements(By.TAG_NAME, "p")]
+        else:
+            raise ValueError("Invalid scrape mode.", f"mode: {mode}")
 
         # Strip erroneous whitespace characters
-        text = text.strip()
+        text = "\n\n".join(paragraphs).strip()
 
     except NoSuchElementException:
         raise ChapterTextNotFound(chapter)
@@ -226,25 +228,69 @@ def parse_chapter_text(chapter: int, text: str) -> str:
         log.debug(f"Chapter {chapter}: Parsed chapter text.")
     return text
 
-count = 0
-timer = {}
-# @timer() 
-def get_chapter_text(chapter: int) -> str:
-    t1 = perf_counter_ns()
-    CHAPTER = str(chapter)
-    with open ("json/toc2.json", "r") as infile:
-        toc = load(infile)
-        chapter_url = toc[CHAPTER]["url"]
-        chapter = int(toc[CHAPTER]["chapter"])
-        chapter_title = toc[CHAPTER]["title"]
-    driver = browser()
-    driver.get(chapter_url)
+def browser_chapter_text(chapter: int, chapter_url: str) -> str:
+    # Load the page in a pooled browser, with the session's reader settings applied, and scrape it.
+    with driver_pool.driver() as driver:
+        driver.get(chapter_url)
+        ensure_reader_settings(driver, chapter)
+        text = scrape_chapter_text(driver, chapter)
+
+        # The session's stored settings didn't take; click through the menu again
+        if is_censored(text):
+            log.debug(f"Chapter {chapter}: Chapter text is still censored. Reapplying reader settings.")
+            apply_reader_settings(driver, chapter)
+            text = scrape_chapter_text(driver, chapter)
+        html_cache.put(chapter_url, driver.page_source, chapter)
+    return text
 
-    click_settings(driver, chapter)
-    click_bad_words(driver, chapter)
-    text = scrape_chapter_text(driver, chapter)
-    text = parse_chapter_text(chapter, text)
 
+def fetch_chapter_text(chapter: int, chapter_url: str) -> str:
+    """
+    Retrieve a chapter's unparsed text, over plain HTTP when possible.
+
+    The browser is only used when the HTTP path fails or its text fails validation.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+        `chapter_url` (str):
+            The chapter's URL from json/toc2.json.
+
+    Returns:
+        `text` (str):
+            The chapter's unparsed text.
+    """
+    if http_engine.enabled:
+        try:
+            text = get_chapter_text_http(chapter, chapter_url)
+        except (ChapterTextInvalid, RequestException) as e:
+            http_engine.failed()
+            log.debug(f"Chapter {chapter}: HTTP fetch failed ({e!r}). Falling back to the browser.")
+        else:
+            http_engine.succeeded()
+            log.debug(f"Chapter {chapter}: Fetched chapter text over HTTP.")
+            return text
+    return browser_chapter_text(chapter, chapter_url)
+
+
+def save_chapter_text(chapter: int, title: str, url: str, text: str) -> dict:
+    """
+    Write a chapter's parsed text to its book's text directory and its chapter_dict to json/chapter_dicts.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+        `title` (str):
+            The chapter's title.
+        `url` (str):
+            The chapter's URL.
+        `text` (str):
+            The chapter's parsed text.
+
+    Returns:
+        `chapter_dict` (dict):
+            The chapter's chapter_dict.
+    """
     # Write chapter text to disk
     book = generate_book(chapter)
     chapter_zfill = str(chapter).zfill(4)
@@ -258,16 +304,77 @@ def get_chapter_text(chapter: int) -> str:
     # Write chapter_dict to disk
     chapter_dict = {
         "chapter": chapter,
-        "title": chapter_title,
-        "url": chapter_url,
+        "title": title,
+        "url": url,
         "text": text,
     }
-    with open(f"json/chapter_dicts/chapter-{chapter_zfill}.json", "w") as outfile:
+    with open(f"{BASE}/json/chapter_dicts/chapter-{chapter_zfill}.json", "w") as outfile:
         dump(chapter_dict, outfile, indent=4)
+    return chapter_dict
+
+
+def reparse_chapter_text(chapter: int) -> str:
+    """
+    Re-run extraction and parsing on a chapter's cached page without touching the network.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+
+    Raises:
+        `ChapterTextNotFound`: The chapter's page is not in the HTML cache.
+
+    Returns:
+        `text` (str):
+            The chapter's parsed text.
+    """
+    chapter_url = get_chapter_dict(chapter)["url"]
+    html = html_cache.get(chapter_url)
+    if html is None:
+        raise ChapterTextNotFound(chapter, "Chapter page is not in the HTML cache.")
+    text = extract_chapter_text(html, chapter)
+    return parse_chapter_text(chapter, text)
+
+
+def reparse_cached_chapters(save: bool = False) -> dict:
+    """
+    Re-parse every chapter in the HTML cache.
+
+    Args:
+        `save` (bool, optional):
+            Whether to rewrite the chapters' text files and chapter_dicts. Defaults to False.
+
+    Returns:
+        `texts` (dict):
+            Chapter -> parsed text.
+    """
+    toc = read_toc()
+    texts = {}
+    for chapter, url in html_cache.chapters():
+        text = reparse_chapter_text(chapter)
+        texts[chapter] = text
+        if save:
+            save_chapter_text(chapter, toc[str(chapter)]["title"], url, text)
+    log.info(f"Re-parsed {len(texts)} chapters from the HTML cache.")
+    return texts
+
+
+count = 0
+timer = {}
+# @timer() 
+def get_chapter_text(chapter: int) -> str:
+    t1 = perf_counter_ns()
+    CHAPTER = str(chapter)
+    with open ("json/toc2.json", "r") as infile:
+        toc = load(infile)
+        chapter_url = toc[CHAPTER]["url"]
+        chapter = int(toc[CHAPTER]["chapter"])
+        chapter_title = toc[CHAPTER]["title"]
+    text = fetch_policy.call(fetch_chapter_text, chapter, chapter_url)
+    text = parse_chapter_text(chapter, text)
+    chapter_dict = save_chapter_text(chapter, chapter_title, chapter_url, text)
     chapter_dicts.append(chapter_dict)
 
-    driver.quit()
-    
     t2 = perf_counter_ns()
     elapsed_time = t2 - t1
     timer = f"Chapter {chapter}: elapsed time: {elapsed_time}\n"
@@ -0,0 +1,232 @@
+# core/reader_session.py
+
+import re
+from json import dump, dumps, load
+from os.path import exists
+from threading import Lock
+
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from core.base import BASE
+from core.log import log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                         Reader Session                          │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+READER_STATE_PATH = f"{BASE}/json/reader_state.json"
+BAD_WORDS_XPATH = '//*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a'
+# Set on a driver once its reader settings are in place.
+READY_ATTR = "reader_settings_applied"
+
+# Words the site censors unless the reader's bad-words toggle is off.
+CENSORED_REGEX = re.compile(r"sh\*t|s\*#t|f\*#k|f\*ck|\*ss\b", re.I)
+
+
+class SettingsButtonNotFound(NoSuchElementException):
+    chapter: int
+    msg: str = "Unable to find settings button."
+
+    def __init__(self, chapter: int, msg: str = "Unable to find settings button."):
+        self.chapter = chapter
+        self.msg = msg
+
+    def __repr__(self):
+        return f"SettingsButtonNotFound: Chapter {self.chapter}: {self.msg}"
+
+class BadWordsButtonNotFound(NoSuchElementException):
+    chapter: int
+    msg: str = "Unable to find bad words button."
+
+    def __init__(self, chapter: int, msg: str = "Unable to find bad words button."):
+        self.chapter = chapter
+        self.msg = msg
+
+    def __repr__(self):
+        return f"BadWordsButtonNotFound: Chapter {self.chapter}: {self.msg}"
+
+
+#> Stored state
+_state_lock = Lock()
+_reader_state = None
+
+
+def load_reader_state() -> dict:
+    """
+    Retrieve the reader settings harvested from a browser session.
+
+    Returns:
+        `state` (dict):
+            `cookies`: the session's cookies as returned by `driver.get_cookies()`,
+            `local_storage`: the site's localStorage. Both empty until a session has saved them.
+    """
+    global _reader_state
+    with _state_lock:
+        if _reader_state is None:
+            if exists(READER_STATE_PATH):
+                with open(READER_STATE_PATH, "r") as infile:
+                    _reader_state = dict((load(infile)))
+            else:
+                _reader_state = {}
+        return {
+            "cookies": list(_reader_state.get("cookies", [])),
+            "local_storage": dict(_reader_state.get("local_storage", {})),
+        }
+
+
+def load_reader_cookies() -> dict:
+    """
+    Retrieve the stored reader cookies for plain HTTP requests.
+
+    Returns:
+        `cookies` (dict):
+            Cookie name -> value.
+    """
+    return {cookie["name"]: cookie["value"] for cookie in load_reader_state()["cookies"]}
+
+
+def save_reader_state(driver) -> dict:
+    """
+    Save the cookies and localStorage of a browser session whose reader settings
+    have been set, so new sessions and plain HTTP requests start with the same settings.
+
+    Args:
+        `driver` (webdriver.Chrome):
+            A driver on a chapter page with the reader settings applied.
+
+    Returns:
+        `state` (dict):
+            The saved state.
+    """
+    global _reader_state
+    state = {
+        "cookies": driver.get_cookies(),
+        "local_storage": driver.execute_script(
+            "var items = {};"
+            "for (var i = 0; i < localStorage.length; i++) {"
+            "  var key = localStorage.key(i); items[key] = localStorage.getItem(key);"
+            "}"
+            "return items;"
+        )
+        or {},
+    }
+    with _state_lock:
+        _reader_state = state
+        with open(READER_STATE_PATH, "w") as outfile:
+            dump(state, outfile, indent=4)
+    log.debug(
+        f"Saved {len(state['cookies'])} reader cookies and {len(state['local_storage'])} localStorage items to {READER_STATE_PATH}."
+    )
+    return state
+
+
+#> Bootstrap
+def bootstrap(driver) -> bool:
+    """
+    Seed a new browser session with the stored reader settings before it loads any page.
+
+    Cookies are set and a localStorage script is registered through the Chrome
+    DevTools protocol, so no page load is spent on it. Meant as a `DriverPool`
+    `on_start` hook.
+
+    Args:
+        `driver` (webdriver.Chrome):
+            A freshly started driver.
+
+    Returns:
+        `ready` (bool):
+            Whether stored settings were applied. If not, the first chapter page sets them by clicking.
+    """
+    state = load_reader_state()
+    if not state["cookies"] and not state["local_storage"]:
+        return False
+    cookies = []
+    for cookie in state["cookies"]:
+        cookie = dict(cookie)
+        if "expiry" in cookie:
+            cookie["expires"] = cookie.pop("expiry")
+        cookies.append(cookie)
+    try:
+        if cookies:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        if state["local_storage"]:
+            items = dumps(state["local_storage"])
+            driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {
+                    "source": f"(function (items) {{ for (var key in items) {{ "
+                    f"if (localStorage.getItem(key) === null) localStorage.setItem(key, items[key]); }} }})({items});"
+                },
+            )
+    except (AttributeError, WebDriverException) as e:
+        log.debug(f"Unable to seed reader settings into the browser session: {e!r}")
+        return False
+    setattr(driver, READY_ATTR, True)
+    log.debug("Seeded browser session with stored reader settings.")
+    return True
+
+
+def click_settings(driver, chapter: int):
+    # Wait for Settings Button to load, then click it
+    try:
+        settings_button = WebDriverWait(driver, 10).until(
+            EC.presence_of_element_located((By.LINK_TEXT, "SETTING"))
+        )
+        settings_button.click()
+    except NoSuchElementException:
+        raise SettingsButtonNotFound(chapter)
+    else:
+        log.debug(f"Chapter {chapter}: Clicked settings button.")
+
+
+def click_bad_words(driver, chapter: int):
+    # Click Bad Words Button
+    try:
+        change_bad_words_button = driver.find_element(By.XPATH, BAD_WORDS_XPATH)
+        change_bad_words_button.click()
+    except NoSuchElementException:
+        raise BadWordsButtonNotFound(chapter)
+    else:
+        log.debug(f"Chapter {chapter}: Clicked bad words button.")
+
+
+def apply_reader_settings(driver, chapter: int) -> None:
+    """
+    Turn the reader's bad-words filter off by clicking through the settings menu, and store the result.
+
+    Args:
+        `driver` (webdriver.Chrome):
+            A driver on a chapter page.
+        `chapter` (int):
+            The chapter on the page.
+    """
+    click_settings(driver, chapter)
+    click_bad_words(driver, chapter)
+    setattr(driver, READY_ATTR, True)
+    save_reader_state(driver)
+
+
+def ensure_reader_settings(driver, chapter: int) -> None:
+    """
+    Apply the reader settings unless this session already has them.
+
+    Called after loading each chapter page. Only a session's first page pays
+    for the clicks; later pages skip both waits.
+
+    Args:
+        `driver` (webdriver.Chrome):
+            A driver on a chapter page.
+        `chapter` (int):
+            The chapter on the page.
+    """
+    if not getattr(driver, READY_ATTR, False):
+        apply_reader_settings(driver, chapter)
+
+
+def is_censored(text: str) -> bool:
+    """Whether the scraped text shows the session's settings did not take, e.g. the stored cookies expired."""
+    return CENSORED_REGEX.search(text) is not None
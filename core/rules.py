@@ -0,0 +1,417 @@
+# core/rules.py
+
+import re
+from dataclasses import dataclass
+from glob import glob
+from json import load
+from time import perf_counter
+from typing import Callable, Iterable, Optional, Union
+
+from core.base import BASE
+from core.log import errwrap, log
+from core.vog import blockquote
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                             Rules                               │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Rule types
+@dataclass(frozen=True)
+class Sub:
+    """
+    Replace every match of `pattern` with `replacement`.
+
+    `replacement` is literal text, or a function from the matched text to
+    its replacement. Consecutive Sub rules with the same flags and no `count`
+    are fused into one pass over the text, so their patterns can't use
+    numbered backreferences, and context a pattern needs but doesn't replace,
+    such as surrounding spaces, belongs in lookarounds: a consumed delimiter
+    can't also start or end the next rule's match.
+    """
+
+    name: str
+    pattern: str
+    replacement: Union[str, Callable[[str], str]] = ""
+    flags: int = 0
+    count: int = 0
+    tag: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Detect:
+    """Tag the text if `pattern` matches anywhere, leaving it unchanged."""
+
+    name: str
+    pattern: str
+    flags: int = 0
+    tag: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class Transform:
+    """Apply `func(text, context) -> (text, hits)`, for rewrites a pattern alone can't express."""
+
+    name: str
+    func: Callable[[str, dict], tuple[str, int]]
+    tag: Optional[str] = None
+
+
+Rule = Union[Sub, Detect, Transform]
+
+
+#> Passes
+class SubPass:
+    """
+    One scan of the text applying one or more Sub rules with the same flags.
+
+    The rules are combined into a plain alternation, which keeps the regex
+    engine's fast scan for the characters a match can start with. Which
+    rule matched is worked out only when something matches, by trying each
+    rule's own pattern at the match's position in order, just as the
+    alternation did.
+
+    This gives the same text as applying the rules one after another only
+    when their matches can't overlap or share characters, and no replacement
+    creates or removes a match of a later rule. PARSE_RULES keeps to that by
+    matching delimiters with lookarounds.
+    """
+
+    def __init__(self, rules: list[Sub]):
+        self.rules = rules
+        self.name = "+".join(rule.name for rule in rules)
+        flags = rules[0].flags
+        self.pattern = re.compile("|".join(f"(?:{rule.pattern})" for rule in rules), flags)
+        self.compiled = [(rule, re.compile(rule.pattern, flags)) for rule in rules]
+        self.count = rules[0].count
+
+    def run(self, text: str, context: dict) -> tuple[str, dict[str, int]]:
+        hits = {}
+
+        def replace(match: re.Match) -> str:
+            rule = self.rules[0]
+            if len(self.rules) > 1:
+                for rule, pattern in self.compiled:
+                    if pattern.match(match.string, match.start()):
+                        break
+            hits[rule.name] = hits.get(rule.name, 0) + 1
+            if callable(rule.replacement):
+                return rule.replacement(match.group())
+            return rule.replacement
+
+        return self.pattern.sub(replace, text, count=self.count), hits
+
+
+class DetectPass:
+    def __init__(self, rule: Detect):
+        self.rules = [rule]
+        self.name = rule.name
+        self.pattern = re.compile(rule.pattern, rule.flags)
+
+    def run(self, text: str, context: dict) -> tuple[str, dict[str, int]]:
+        return text, {self.name: 1} if self.pattern.search(text) else {}
+
+
+class TransformPass:
+    def __init__(self, rule: Transform):
+        self.rules = [rule]
+        self.name = rule.name
+        self.func = rule.func
+
+    def run(self, text: str, context: dict) -> tuple[str, dict[str, int]]:
+        text, hits = self.func(text, context)
+        return text, {self.name: hits} if hits else {}
+
+
+def compile_passes(rules: Iterable[Rule]) -> list:
+    """Compile rules into passes, fusing each run of consecutive Sub rules that share flags and have no `count`."""
+    passes, fused = [], []
+    for rule in rules:
+        if fused and not (isinstance(rule, Sub) and not rule.count and rule.flags == fused[0].flags):
+            passes.append(SubPass(fused))
+            fused = []
+        if isinstance(rule, Sub) and not rule.count:
+            fused.append(rule)
+            continue
+        if isinstance(rule, Sub):
+            passes.append(SubPass([rule]))
+        elif isinstance(rule, Detect):
+            passes.append(DetectPass(rule))
+        else:
+            passes.append(TransformPass(rule))
+    if fused:
+        passes.append(SubPass(fused))
+    return passes
+
+
+#> Pipeline
+class Pipeline:
+    """
+    An ordered set of text rules, compiled once and applied to chapter after chapter.
+
+    Rules run in the order declared. Each pass is timed, and each rule's
+    hits and the chapters it changed are counted, so `report()` shows which
+    rules dominate parse time across a corpus.
+
+    Args:
+        `rules` (Iterable[Rule]):
+            The Sub, Detect, and Transform rules, in order.
+    """
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = tuple(rules)
+        names = [rule.name for rule in self.rules]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate rule names: {sorted(duplicates)}")
+        self.tags = {rule.name: rule.tag for rule in self.rules if rule.tag}
+        self.passes = compile_passes(self.rules)
+        self.reset()
+
+    def reset(self):
+        self.texts = 0
+        self.seconds = {parse_pass.name: 0.0 for parse_pass in self.passes}
+        self.hits = {name: 0 for name in (rule.name for rule in self.rules)}
+        self.chapters = dict.fromkeys(self.hits, 0)
+
+    def apply(self, text: str, **context) -> tuple[str, set[str]]:
+        """
+        Apply every rule to `text`.
+
+        Args:
+            `text` (str):
+                The chapter text.
+            `**context`:
+                Values the Transform rules read, e.g. `chapter` and `title`.
+
+        Returns:
+            `text` (str):
+                The transformed text.
+            `tags` (set[str]):
+                The tags of the rules that matched.
+        """
+        text = str(text)
+        tags = set()
+        self.texts += 1
+        for parse_pass in self.passes:
+            start = perf_counter()
+            text, hits = parse_pass.run(text, context)
+            self.seconds[parse_pass.name] += perf_counter() - start
+            for name, count in hits.items():
+                self.hits[name] += count
+                self.chapters[name] += 1
+                if name in self.tags:
+                    tags.add(self.tags[name])
+        return text, tags
+
+    def report(self) -> list[dict]:
+        """
+        Returns:
+            `rows` (list[dict]):
+                One row per pass, slowest first: its seconds, and each of its rules' hits and chapters.
+        """
+        rows = [
+            {
+                "pass": parse_pass.name,
+                "seconds": round(self.seconds[parse_pass.name], 4),
+                "rules": {
+                    rule.name: {"hits": self.hits[rule.name], "chapters": self.chapters[rule.name]}
+                    for rule in parse_pass.rules
+                },
+            }
+            for parse_pass in self.passes
+        ]
+        return sorted(rows, key=lambda row: -row["seconds"])
+
+    def log_report(self):
+        total = sum(self.seconds.values()) or 1.0
+        lines = [f"{'rule':<24} {'hits':>7} {'chapters':>9} {'pass s':>8} {'share':>6}"]
+        for row in self.report():
+            for x, (name, counts) in enumerate(row["rules"].items()):
+                seconds = f"{row['seconds']:>8.3f} {row['seconds'] / total:>6.1%}" if x == 0 else ""
+                lines.append(f"{name:<24} {counts['hits']:>7} {counts['chapters']:>9} {seconds}")
+        table = "\n".join(lines)
+        log.info(f"Parse rules over {self.texts} chapters ({total:.2f}s):\n<code>{table}</code>")
+
+
+#> Chapter transforms
+def comment_out_lines(lines: str, table: str) -> str:
+    """Append `lines` to `table` as HTML comments, one per line."""
+    lines = lines.splitlines()
+    count = len(lines)
+    for x, line in enumerate(lines, start=1):
+        if x < count:
+            table = str(table + "\n<!-- " + line + " -->")
+        else:
+            table = str(table + "\n<!-- " + line + " -->\n")
+    return table.replace("<!--  -->\n", "")
+
+
+# A leftmost match of a pattern starting with .*? always starts at a line start, so
+# the ^ anchors keep the matches the same while sparing a scan from every column.
+HEADER_REGEX = re.compile(
+    r"(Chapter.*\n\n.*?Nyoi-Bo Studio.*\n)\n$|(^.*?Nyoi-Bo Studio.*\n)$\n|(^.*?Chapter.*$\n)\n", re.I | re.M
+)
+
+
+def strip_header(text: str, context: dict) -> tuple[str, int]:
+    """Remove the page header the source prepends to the chapter."""
+    header = HEADER_REGEX.search(text)
+    if not header:
+        return text, 0
+    return text.replace(header.group(), ""), 1
+
+
+def normalize_heading(line: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", line.lower()).strip()
+
+
+def strip_heading(text: str, context: dict) -> tuple[str, int]:
+    """Remove a first paragraph that only repeats the chapter number and/or title."""
+    chapter, title = context.get("chapter"), context.get("title")
+    paragraphs = text.split("\n\n", 1)
+    first = normalize_heading(paragraphs[0])
+    if not first:
+        return text, 0
+    chapter = str(chapter) if chapter is not None else None
+    title = normalize_heading(title) if title else None
+    headings = set()
+    if chapter:
+        headings |= {chapter, f"chapter {chapter}"}
+    if title:
+        headings.add(title)
+    if chapter and title:
+        headings |= {f"{chapter} {title}", f"chapter {chapter} {title}"}
+    if first not in headings:
+        return text, 0
+    return (paragraphs[1] if len(paragraphs) > 1 else ""), 1
+
+
+def vog_lines(text: str, context: dict) -> tuple[str, int]:
+    text, fired = blockquote(text)
+    return text, sum(fired.values())
+
+
+STATUS_REGEX = re.compile(
+    r"(^Han Sen:.*$\n\n.*?^Status.*$\n\n.*?^Life.*)$"
+    r"|(^Han Se:.*$\n\n.*?^Super.*$\n\n.*?^Status.*$\n\n.*?^Life.*)$"
+    r"|(^Han Sen.*$\n\n.*?^Stage.*$\n\n.*?^Life.*)$"
+    r"|(^Han Sen.*$\n\n.*?^Level.*$\n\n.*?^Life.*)$",
+    re.I | re.M,
+)
+# Every status block ends with a paragraph starting "Life"; finding that first skips the full pattern in most chapters
+STATUS_HINT = re.compile(r"\n\nlife", re.I)
+# Lifespan -> the status table's rows
+STATUS_ROWS = {
+    600: {"Status": "God", "Geno Body": "Not Created", "Lifespan": "600 years"},
+    500: {"Status": "Demigod", "Super Body": "Super King Spirit - Ultimate", "Lifespan": "500 years"},
+    400: {"Status": "Surpasser", "Super Body": "Super King Spirit", "Lifespan": "400 years"},
+    300: {"Status": "Evolver", "Super Body": "King Spirit", "Lifespan": "300 years"},
+    200: {"Status": "Unevolved", "Lifespan": "200 years"},
+}
+LIFESPAN_WORDS = (("six", 600), ("five", 500), ("four", 400), ("three", 300))
+
+
+def lifespan_of(status: str) -> int:
+    status = status.replace(":", "").replace("-", "").replace("–", "").replace(".", "")
+    life = re.search(r"(.*?Life.*)$", status, re.I)
+    if not life:
+        return 200
+    life = life.group()
+    digits = re.search(r"\d+", life)
+    if digits:
+        return int(digits[0])
+    for word, years in LIFESPAN_WORDS:
+        if word in life.lower():
+            return years
+    return 200
+
+
+def status_table(text: str, context: dict) -> tuple[str, int]:
+    """Replace Han Sen's status block with a status table, keeping the original lines as comments."""
+    found = STATUS_HINT.search(text) and STATUS_REGEX.search(text)
+    if not found:
+        return text, 0
+    status = found.group()
+    rows = STATUS_ROWS.get(lifespan_of(status), STATUS_ROWS[200])
+    table = '<table class="status">\n\t<tr>\n\t\t<th colspan="2">Han Sen</th>\n\t</tr>'
+    for label, value in rows.items():
+        table += f"<tr>\n\t\t<td>{label}</td>\n\t\t\t<td>{value}</td>\n\t\t</tr>"
+    table = comment_out_lines(status, table + "\n</table>")
+    return text.replace(status, table), 1
+
+
+GENO_R_REGEX = re.compile(r"(^.*?.evol.*?:.*)$", re.I | re.M)
+GENO_R_TABLE = (
+    '<table class="geno-r">\n\t<tr>\n\t\t<th colspan="2">Geno Points</th>\n\t</tr><tr>\n'
+    "\t\t<td>Required to Evolve</td>\n\t\t<td>REQUIRE</td>\n\t</tr>\n</table>"
+)
+
+
+def geno_r_table(text: str, context: dict) -> tuple[str, int]:
+    """Replace the geno points required to evolve with a table, keeping the original line as a comment."""
+    found = GENO_R_REGEX.search(text)
+    if not found:
+        return text, 0
+    line = found.group()
+    require = re.search(r"\d+", line)
+    table = GENO_R_TABLE.replace("REQUIRE", require.group() if require else "Unknown")
+    return text.replace(line, comment_out_lines(line, table)), 1
+
+
+#> Rules
+PARSE_RULES = (
+    Transform("header", strip_header),
+    Sub("nyoi_bo", r"^.*?Nyoi.*\n\n", flags=re.I | re.M),
+    Transform("heading", strip_heading),
+    Transform("vog", vog_lines, tag="vog"),
+    Transform("status", status_table, tag="status"),
+    Transform("geno_r", geno_r_table, tag="geno_r"),
+    Detect("beast_soul", r"beast soul.*?type|type.*?beast soul", tag="beast"),
+    # Censored words
+    Sub("shit_lower", r"sh\*t|s\*#t", "shit"),
+    Sub("shit_title", r"Sh\*t|S\*#t", "Shit"),
+    Sub("fuck_lower", r"f\*#k", "fuck"),
+    Sub("fuck_title", r"(?<= )F\*(?:#k|ck)(?= )", "Fuck"),
+    Sub("ass_line", r"(?<=\n)\*ss(?= )", "Ass"),
+    Sub("ass_sentence", r"(?<=\. )\*ss(?= )", "Ass"),
+    Sub("ass_lower", r"(?<= )\*ss(?= )", "ass"),
+    Sub("demigod_lower", r"demiGod", "demigod"),
+    Sub("demigod_title", r"DemiGod", "Demigod"),
+    Sub("jadeskin", r"jadeskin", "Jadeskin"),
+    # Advertisements
+    Sub("dot_com", r"^.*?\.com.*$", flags=re.I | re.M),
+)
+parse_rules = Pipeline(PARSE_RULES)
+
+
+#> Profiling
+def sample_chapters(limit: int = 0) -> list[dict]:
+    """Chapter dicts (chapter, title, text) from json/chapter_dicts, for profiling without a database."""
+    paths = sorted(glob(f"{BASE}/json/chapter_dicts/chapter-*.json"))
+    chapters = []
+    for path in paths[:limit] if limit else paths:
+        with open(path, "r") as infile:
+            chapters.append(dict(load(infile)))
+    return chapters
+
+
+@errwrap(exit=False)
+def profile_rules(chapters: Optional[Iterable[dict]] = None, pipeline: Optional[Pipeline] = None) -> list[dict]:
+    """
+    Run the parse rules over many chapters and log which rules dominate.
+
+    Args:
+        `chapters` (Iterable[dict], optional):
+            Dicts with "chapter", "title", and "text". Defaults to `sample_chapters()`.
+        `pipeline` (Pipeline, optional):
+            The rules to profile. Defaults to a fresh Pipeline of PARSE_RULES.
+
+    Returns:
+        `report` (list[dict]):
+            `Pipeline.report()` for the run.
+    """
+    pipeline = pipeline or Pipeline(PARSE_RULES)
+    for chapter in chapters if chapters is not None else sample_chapters():
+        pipeline.apply(chapter["text"], chapter=chapter["chapter"], title=chapter.get("title"))
+    pipeline.log_report()
+    return pipeline.report()
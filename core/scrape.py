@@ -27,26 +27,6 @@ CHROME_DRIVER = "driver/chromedriver"
 EDGE_DRIVER = "driver/msedgedriver.exe"
 TOC_PATH = "json/toc.json"
 
-@errwrap()
-def generator_list(chunk_size: int = 4) -> list:
-    """
-    Generate a list of chapter numbers.
-    """
-    for j in range(1, 3463, chunk_size):
-        if j == 3095 | j == 3117:
-            continue
-        else: 
-            yield j
-            
-@errwrap()
-def chunks(l, n):
-    """Yield successive n-sized chunks from l."""
-    for i in range(1, 3463, n):
-        if i == 3095 | i == 3117:
-            continue
-        else:
-            yield l[i : i + n]
-
 @errwrap()
 def parse_chapter_title(title: str) -> str:
     """
@@ -14,9 +14,10 @@ from alive_progress import alive_bar, alive_it
 from yaml import dump_all
 
 from core.base import BASE
-from core.atlas import max_title, sg
+from core.atlas import max_title
+from core.boundaries import book_of_section
 from core.log import errwrap, log
-import core.book as book_
+from core.storage import repository
 
 # .┌─────────────────────────────────────────────────────────────────┐.#
 # .│                            Section                              │.#
@@ -60,14 +61,17 @@ class Section(Document):
     html_path = StringField()
     html = StringField()
     section_files = ListField(StringField())
+    meta = {
+        "indexes": ["section", ("book", "section")],
+        "auto_create_index": False,
+    }
 
     def __int__(self):
         return self.section
 
 
-@errwrap()  # . Verified
 def get_book(section: int) -> int:
-    """Determine the book of a given chapter.
+    """Determine the book of a given section.
 
     Args:
         `section` (int):
@@ -77,27 +81,7 @@ def get_book(section: int) -> int:
         `book` (int):
             The book the given section is in.
     """
-    book_sections = {
-        1: 1,
-        2: 2,
-        3: 3,
-        4: 4,
-        5: 4,
-        6: 5,
-        7: 5,
-        8: 6,
-        9: 6,
-        10: 7,
-        11: 7,
-        12: 8,
-        13: 8,
-        14: 9,
-        15: 9,
-        16: 10,
-        17: 10,
-    }
-    book = book_sections[section]
-    return book
+    return book_of_section(section)
 
 
 @errwrap()  # . Verified
@@ -164,7 +148,7 @@ def generate_title(section: int, save: bool = False):
         `section` (int):
             The given section
         `save` (bool, optional):
-            Whether to save the title to MongoDB. Defaults to False.
+            Whether to save the title to storage. Defaults to False.
 
     Returns:
         `title` (str):
@@ -173,10 +157,8 @@ def generate_title(section: int, save: bool = False):
 
     book = get_book(section)
 
-    # > Get section's book from MongoDB
-    sg()
-    section_book = book_.Book.objects(book=book).first()
-    title = section_book.title  # Get book title
+    # > Get section's book from storage
+    title = repository.get("book", book, ("title",))["title"]  # Get book title
 
     # > Part (if applicable)
     part = generate_part(section)
@@ -192,23 +174,17 @@ def generate_title(section: int, save: bool = False):
     log.debug(f"Section {section}'s title: {title}")
 
     if save:
-        sg()
-        section_doc = Section.objects(section=section).first()
-        if section_doc is None:
-            raise SectionNotFound(f"Section {section} not found in MongoDB.")
-        else:
-            section_doc.title = title
-            section_doc.save()
-            log.debug(f"Saved title for Section {section}'s Section Page to MongoDB.")
+        if not repository.update("section", section, title=title):
+            raise SectionNotFound(f"Section {section} not found in {repository.name}.")
+        log.debug(f"Saved title for Section {section}'s Section Page to {repository.name}.")
 
     return title
 
 
 @errwrap()
 def get_title(section: int) -> str:
-    sg()
-    doc = Section.objects(section=section).first()
-    return max_title(doc.title)
+    doc = repository.get("section", section, ("title",))
+    return max_title(doc["title"])
 
 
 @errwrap()
@@ -235,14 +211,9 @@ def generate_md_path(section: int, save: bool = False) -> str:
     book_dir = f"book{book_str}"
     md_path = f"{BASE}/books/{book_dir}/md/{filename}.md"
     if save:
-        sg()
-        section_page = Section.objects(section=section).first()
-        if section_page is None:
+        if not repository.update("section", section, md_path=md_path):
             raise SectionNotFound(f"Section {section} not found.")
-        else:
-            section_page.md_path = md_path
-            section_page.save()
-            log.debug(f"Saved md_path for section {section} to MongoDB.")
+        log.debug(f"Saved md_path for section {section} to {repository.name}.")
     return md_path
 
 
@@ -265,14 +236,9 @@ def generate_html_path(section: int, save: bool = False) -> str:
     book_dir = f"book{book_str}"
     html_path = f"{BASE}/books/{book_str}/html/{filename}.html"
     if save:
-        sg()
-        section_page = Section.objects(section=section).first()
-        if section_page is None:
+        if not repository.update("section", section, html_path=html_path):
             raise SectionNotFound(f"Section {section} not found.")
-        else:
-            section_page.html_path = html_path
-            section_page.save()
-            log.debug(f"Saved html_path for section {section} to MongoDB.")
+        log.debug(f"Saved html_path for section {section} to {repository.name}.")
     return html_path
     
 
@@ -289,9 +255,7 @@ def get_start(section: int) -> int:
         `start` (int):
             The chapter the given section begins.
     """
-    sg()
-    doc = Section.objects(section=section).first()
-    return doc.start
+    return repository.get("section", section, ("start",))["start"]
 
 
 @errwrap() # . Verified
@@ -307,9 +271,9 @@ def get_end(section: int) -> int:
         `end` (int):
             The chapter the given section ends.
     """
-    sg()
-    for doc in Section.objects(section=section):
-        return doc.end
+    doc = repository.get("section", section, ("end",))
+    if doc is not None:
+        return doc["end"]
 
 
 @errwrap() # . Verified
@@ -321,7 +285,7 @@ def generate_md(section: int, save: bool = False, write: bool = False):
         `section` (int):
             The given section.
         `save` (bool):
-            Whether to save the Section Page Markdown to MongoDB. Defualts to false.
+            Whether to save the Section Page Markdown to storage. Defualts to false.
         `write` (bool):
             Whether to write the Section Page's Markdown to Disk. Defualts to False.
 
@@ -329,18 +293,17 @@ def generate_md(section: int, save: bool = False, write: bool = False):
         `md` (str):
             The markdown of the given section's Section Page.
     """
-    sg()
-    section_page = Section.objects(section=section).first()
+    section_page = repository.get("section", section, ("title", "book", "start", "end", "md_path"))
     if section_page is None:
         raise SectionNotFound(f"Section {section} not found.")
     else:
         log.debug(f"Section {section} Document:<code>\n{section_page}\n</code>")
-        title = section_page.title
-        book = section_page.book
+        title = section_page["title"]
+        book = section_page["book"]
         book_word = str(num2words(book)).capitalize()
-        start = section_page.start
-        end = section_page.end
-        md_path = section_page.md_path
+        start = section_page["start"]
+        end = section_page["end"]
+        md_path = section_page["md_path"]
         part = generate_part(section)
 
         # < Yaml Frontmatter Metadata
@@ -356,9 +319,8 @@ def generate_md(section: int, save: bool = False, write: bool = False):
         md = f"{meta}{atx}{text}"
 
         if save:
-            section_page.md = md
-            section_page.save()
-            log.info(f"Saved md for section {section} to MongoDB.")
+            repository.update("section", section, md=md)
+            log.info(f"Saved md for section {section} to {repository.name}.")
 
         if write:
             with open(md_path, "w") as infile:
@@ -381,9 +343,9 @@ def get_md(section: int):
         `md` (str):
             The multimarkdown for the given section.
     """
-    sg()
-    for doc in Section.objects(section=section):
-        return doc.md
+    doc = repository.get("section", section, ("md",))
+    if doc is not None:
+        return doc["md"]
 
 
 @errwrap()  #. Verified
@@ -402,18 +364,17 @@ def generate_html(section: int, save: bool = False):
         `html` (str):
             The HTML for the given section.
     """
-    sg()
-    section_page = Section.objects(section=section).first()
+    section_page = repository.get("section", section, ("md_path", "html_path"))
     if section_page is None:
-        log.error(f"Section {section} not found in MongoDB.")
+        log.error(f"Section {section} not found in {repository.name}.")
         raise SectionNotFound(
-            f"MongoDB does not contain the following section: {section}."
+            f"{repository.name} does not contain the following section: {section}."
         )
     else:
-        md_path = section_page.md_path
+        md_path = section_page["md_path"]
         log.debug(f"Section {section}'s Markdown path:\n{md_path}")
 
-        html_path = section_page.html_path
+        html_path = section_page["html_path"]
         log.debug(f"Section {section}'s HTML path:\n{html_path}")
 
         mmd_cmd = [
@@ -421,8 +382,8 @@ def generate_html(section: int, save: bool = False):
             "-f",
             "--nolabels",
             "-o",
-            f"{section_page.html_path}",
-            f"{section_page.md_path}",
+            f"{html_path}",
+            f"{md_path}",
         ]
 
         try:
@@ -439,24 +400,22 @@ def generate_html(section: int, save: bool = False):
             html = generated_html.strip()
 
             if save:
-                section_page.html = html
-                section_page.save()
-                log.debug(f"Saved Section {section}'s HTML to MongoDB.")
+                repository.update("section", section, html=html)
+                log.debug(f"Saved Section {section}'s HTML to {repository.name}.")
 
             return html
 
 
 @errwrap() # . Verified
 def generate_section_pages():
-    sg()
     bar = alive_it(
-        Section.objects(),
+        list(repository.find("section", ("section",))),
         bar="smooth",
         dual_line=True,
         title="Generateing Section Pages",
     )
     for section_doc in bar:
-        section = section_doc.section
+        section = section_doc["section"]
 
         bar.title(f"Generating Section {section}'s Section Page")
 
@@ -472,17 +431,14 @@ def generate_section_pages():
 
 @errwrap()
 def generate_section_titles():
-    sg()
     bar = alive_it(
-        Section.objects(),
+        list(repository.find("section", ("section",))),
         bar="smooth",
         dual_line=True,
         title="Generating Section Titles",
     )
     for section_doc in bar:
-        section = section_doc.section
+        section = section_doc["section"]
         bar.title(f"Generating Section {section}'s Section Title")
         title = generate_title(section, save=True)
         bar.text(f"Section {section} Title: {title}")
-        section_doc.title = title
-        section_doc.save()
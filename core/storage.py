@@ -0,0 +1,596 @@
+# core/storage.py
+
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from glob import glob
+from importlib import import_module
+from json import dumps, load, loads
+from os.path import basename, exists, splitext
+from threading import RLock
+from typing import Iterable, Iterator, Optional
+
+from dotenv import load_dotenv
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.base import BASE
+from core.boundaries import book_of, section_of
+from core.compression import decode_doc
+from core.log import errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                            Storage                              │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+load_dotenv()
+
+#> Constants
+# Which backend `repository` uses: "mongo" (the default) or "sqlite".
+STORAGE = os.getenv("SUPERFORGE_STORAGE", "mongo").lower()
+SQLITE_PATH = os.getenv("SUPERFORGE_SQLITE", f"{BASE}/json/superforge.sqlite3")
+EXPORT_DIR = f"{BASE}/json/export"
+CHAPTER_DICTS_DIR = f"{BASE}/json/chapter_dicts"
+# Documents read back per query when seeding merges into existing ones.
+SEED_BATCH_SIZE = 500
+
+# Collection -> (module, model). Models are imported on first use so a local
+# run never imports the MongoDB side of the project.
+MODELS = {
+    "chapter": ("core.chapter", "Chapter"),
+    "section": ("core.section", "Section"),
+    "book": ("core.book", "Book"),
+    "titlepage": ("core.titlepage", "Titlepage"),
+    "endofbook": ("core.endofbook", "EndOfBook"),
+    "metadata": ("core.metadata", "Metadata"),
+    "epubmetadata": ("core.epubmetadata", "Epubmeta"),
+    "defaultdoc": ("core.defaultdoc", "Defaultdoc"),
+    "coverpage": ("core.cover", "Coverpage"),
+}
+# The field that identifies a document of each collection.
+KEYS = {"chapter": "chapter", "section": "section"}
+DEFAULT_KEY = "book"
+# Fields the SQLite backend keeps in their own indexed columns for filtering.
+INDEXED_FIELDS = ("book", "section")
+
+
+class UnknownCollection(Exception):
+    pass
+
+
+class UnknownStorage(Exception):
+    pass
+
+
+def key_field(collection: str) -> str:
+    """The field that identifies a document of `collection`."""
+    if collection not in MODELS:
+        raise UnknownCollection(f"Unknown collection: {collection}")
+    return KEYS.get(collection, DEFAULT_KEY)
+
+
+def model(collection: str):
+    """The mongoengine model of `collection`."""
+    key_field(collection)
+    module, name = MODELS[collection]
+    return getattr(import_module(module), name)
+
+
+def project(doc: dict, fields: Optional[Iterable[str]]) -> dict:
+    """Keep the requested fields of `doc`, None for missing ones."""
+    if fields is None:
+        return doc
+    return {field: doc.get(field) for field in fields}
+
+
+def to_mongo(collection: str, fields: dict) -> dict:
+    """Encode field values the way the model stores them in MongoDB, e.g. compressed text."""
+    model_fields = model(collection)._fields
+    return {
+        name: model_fields[name].to_mongo(value) if name in model_fields and value is not None else value
+        for name, value in fields.items()
+    }
+
+
+def invalidate(collection: str, keys: Iterable[int]) -> None:
+    """Drop written chapters from the chapter cache so it doesn't serve what was just overwritten."""
+    if collection == "chapter":
+        from core.chapter_cache import chapter_cache
+
+        for key in keys:
+            chapter_cache.invalidate(key)
+
+
+class Repository(ABC):
+    """
+    Document storage for the project's collections, independent of where the documents live.
+
+    Documents are plain dicts, identified by their collection's key field:
+    `chapter` for chapters, `section` for sections, and `book` for everything
+    else. Every query returns documents in key order. A backend implements
+    every abstract method, so an incomplete one fails when it is constructed.
+    """
+
+    name = "repository"
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    @property
+    def scope(self) -> str:
+        """Identifies where the documents live, so caches of them don't mix backends or databases."""
+        return self.name
+
+    @abstractmethod
+    def get(self, collection: str, key: int, fields: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Retrieve one document, or None."""
+
+    @abstractmethod
+    def get_many(self, collection: str, keys: Iterable[int], fields: Optional[Iterable[str]] = None) -> list[dict]:
+        """Retrieve the documents with the given keys in one query, in key order."""
+
+    @abstractmethod
+    def find(
+        self,
+        collection: str,
+        fields: Optional[Iterable[str]] = None,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        batch_size: int = 500,
+        **filters,
+    ) -> Iterator[dict]:
+        """
+        Stream documents in key order.
+
+        Args:
+            `collection` (str):
+                The collection to read.
+            `fields` (Iterable[str], optional):
+                The fields to return. The key is always returned. Defaults to every field.
+            `start` (int, optional):
+                The first key, inclusive.
+            `end` (int, optional):
+                The last key, inclusive.
+            `batch_size` (int, optional):
+                Documents fetched per round trip.
+            `**filters`:
+                Field -> value that matching documents must equal.
+        """
+
+    @abstractmethod
+    def count(self, collection: str, start: Optional[int] = None, end: Optional[int] = None, **filters) -> int:
+        """Count the documents `find()` would return."""
+
+    @abstractmethod
+    def missing(self, collection: str, field: str) -> list[int]:
+        """The keys of the documents whose `field` is absent, None, or empty, without reading its values."""
+
+    @abstractmethod
+    def put(self, collection: str, docs: Iterable[dict]) -> int:
+        """Insert or replace whole documents, returning how many were written."""
+
+    @abstractmethod
+    def bulk_update(self, collection: str, updates: dict[int, dict], ordered: bool = False) -> dict:
+        """
+        Set some fields of many documents in one batch.
+
+        Args:
+            `collection` (str):
+                The collection to write.
+            `updates` (dict[int, dict]):
+                Key -> field -> new value.
+            `ordered` (bool, optional):
+                Stop at the first failed update. Defaults to False.
+
+        Returns:
+            `result` (dict):
+                `matched` and `modified` counts, and `errors`, the failed updates.
+        """
+
+    @abstractmethod
+    def delete(self, collection: str, key: int) -> bool:
+        """Delete one document, returning whether it existed."""
+
+    def update(self, collection: str, key: int, **fields) -> bool:
+        """Set some fields of one document, returning whether it exists."""
+        return self.update_many(collection, {key: fields}) > 0
+
+    def update_many(self, collection: str, updates: dict[int, dict]) -> int:
+        """Set some fields of many documents in one batch, returning how many exist."""
+        if not updates:
+            return 0
+        return self.bulk_update(collection, updates)["matched"]
+
+    def _fields(self, collection: str, fields: Optional[Iterable[str]]) -> Optional[tuple[str, ...]]:
+        if fields is None:
+            return None
+        return tuple(dict.fromkeys((key_field(collection),) + tuple(fields)))
+
+    def _invalidate(self, collection: str, keys: Iterable[int]) -> None:
+        invalidate(collection, keys)
+
+
+#> MongoDB
+class MongoRepository(Repository):
+    """
+    The MongoDB backend: the collections of the mongoengine models, through the connection registry.
+
+    Args:
+        `database` (str, optional):
+            The database to use. Defaults to "SUPERGENE".
+    """
+
+    name = "mongo"
+
+    def __init__(self, database: str = "SUPERGENE"):
+        self.database = database
+
+    def __repr__(self):
+        return f"MongoRepository(database={self.database!r})"
+
+    @property
+    def scope(self) -> str:
+        return f"mongo:{self.database}"
+
+    def _collection(self, collection: str):
+        # Through the database's own alias, so the documents' `default` connection is left alone
+        from core.atlas import registry
+
+        return registry.database(self.database)[model(collection)._get_collection_name()]
+
+    def _query(self, collection: str, start: Optional[int], end: Optional[int], filters: dict) -> dict:
+        query = dict(filters)
+        bounds = {}
+        if start is not None:
+            bounds["$gte"] = start
+        if end is not None:
+            bounds["$lte"] = end
+        if bounds:
+            query[key_field(collection)] = bounds
+        return query
+
+    def _projection(self, collection: str, fields: Optional[Iterable[str]]) -> dict:
+        fields = self._fields(collection, fields)
+        if fields is None:
+            return {"_id": False}
+        return {"_id": False, **{field: True for field in fields}}
+
+    def get(self, collection, key, fields=None):
+        doc = self._collection(collection).find_one({key_field(collection): key}, self._projection(collection, fields))
+        if doc is not None:
+            return project(decode_doc(doc), self._fields(collection, fields))
+
+    def get_many(self, collection, keys, fields=None):
+        key = key_field(collection)
+        cursor = (
+            self._collection(collection)
+            .find({key: {"$in": list(keys)}}, self._projection(collection, fields))
+            .sort(key, 1)
+        )
+        return [project(decode_doc(doc), self._fields(collection, fields)) for doc in cursor]
+
+    def find(self, collection, fields=None, start=None, end=None, batch_size=500, **filters):
+        fields = self._fields(collection, fields)
+        cursor = (
+            self._collection(collection)
+            .find(self._query(collection, start, end, filters), self._projection(collection, fields))
+            .sort(key_field(collection), 1)
+            .batch_size(batch_size)
+        )
+        for doc in cursor:
+            yield project(decode_doc(doc), fields)
+
+    def count(self, collection, start=None, end=None, **filters):
+        return self._collection(collection).count_documents(self._query(collection, start, end, filters))
+
+    def missing(self, collection, field):
+        key = key_field(collection)
+        cursor = self._collection(collection).find({field: {"$in": [None, ""]}}, {"_id": False, key: True}).sort(key, 1)
+        return [doc[key] for doc in cursor]
+
+    def put(self, collection, docs):
+        key = key_field(collection)
+        docs = list(docs)
+        if not docs:
+            return 0
+        ops = [ReplaceOne({key: doc[key]}, to_mongo(collection, doc), upsert=True) for doc in docs]
+        self._collection(collection).bulk_write(ops, ordered=False)
+        self._invalidate(collection, [doc[key] for doc in docs])
+        return len(ops)
+
+    def bulk_update(self, collection, updates, ordered=False):
+        if not updates:
+            return {"matched": 0, "modified": 0, "errors": []}
+        key = key_field(collection)
+        ops = [UpdateOne({key: k}, {"$set": to_mongo(collection, fields)}) for k, fields in updates.items()]
+        try:
+            result = self._collection(collection).bulk_write(ops, ordered=ordered)
+            matched, modified, errors = result.matched_count, result.modified_count, []
+        except BulkWriteError as bwe:
+            details = bwe.details
+            matched, modified = details.get("nMatched", 0), details.get("nModified", 0)
+            errors = details.get("writeErrors", [])
+        finally:
+            self._invalidate(collection, list(updates))
+        return {"matched": matched, "modified": modified, "errors": errors}
+
+    def delete(self, collection, key):
+        result = self._collection(collection).delete_one({key_field(collection): key})
+        self._invalidate(collection, [key])
+        return result.deleted_count > 0
+
+
+#> SQLite
+class SQLiteRepository(Repository):
+    """
+    The local backend: one SQLite file, one table per collection.
+
+    Each document is stored as JSON next to its key and the INDEXED_FIELDS it
+    has, so lookups by chapter, book, or section are index seeks. Field
+    projections are done by SQLite, so reading titles never parses chapter text.
+
+    Args:
+        `path` (str, optional):
+            The database file. Defaults to SQLITE_PATH.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = RLock()
+
+    def __repr__(self):
+        return f"SQLiteRepository(path={self.path!r})"
+
+    @property
+    def scope(self) -> str:
+        return f"sqlite:{self.path}"
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    for collection in MODELS:
+                        conn.execute(
+                            f"CREATE TABLE IF NOT EXISTS {collection} "
+                            f"(key INTEGER PRIMARY KEY, book INTEGER, section INTEGER, doc TEXT NOT NULL)"
+                        )
+                        for field in INDEXED_FIELDS:
+                            conn.execute(f"CREATE INDEX IF NOT EXISTS {collection}_{field} ON {collection} ({field}, key)")
+                    self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _select(self, collection: str, fields: Optional[tuple[str, ...]]) -> tuple[str, list]:
+        key_field(collection)
+        if fields is None:
+            return f"SELECT doc FROM {collection}", []
+        # json_object() over json_extract() keeps nested lists and objects as JSON
+        pairs = ", ".join("?, json_extract(doc, ?)" for _ in fields)
+        params = [part for field in fields for part in (field, f'$."{field}"')]
+        return f"SELECT json_object({pairs}) FROM {collection}", params
+
+    def _where(self, collection: str, start: Optional[int], end: Optional[int], filters: dict) -> tuple[str, list]:
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("key >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("key <= ?")
+            params.append(end)
+        for field, value in filters.items():
+            if field == key_field(collection):
+                clauses.append("key = ?")
+            elif field in INDEXED_FIELDS:
+                clauses.append(f"{field} = ?")
+            else:
+                clauses.append("json_extract(doc, ?) = ?")
+                params.append(f'$."{field}"')
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def get(self, collection, key, fields=None):
+        fields = self._fields(collection, fields)
+        select, params = self._select(collection, fields)
+        row = self.conn.execute(f"{select} WHERE key = ?", params + [key]).fetchone()
+        if row is not None:
+            return project(loads(row[0]), fields)
+
+    def get_many(self, collection, keys, fields=None):
+        keys = list(keys)
+        if not keys:
+            return []
+        fields = self._fields(collection, fields)
+        select, params = self._select(collection, fields)
+        marks = ", ".join("?" for _ in keys)
+        rows = self.conn.execute(f"{select} WHERE key IN ({marks}) ORDER BY key", params + keys).fetchall()
+        return [project(loads(doc), fields) for (doc,) in rows]
+
+    def find(self, collection, fields=None, start=None, end=None, batch_size=500, **filters):
+        fields = self._fields(collection, fields)
+        select, params = self._select(collection, fields)
+        where, where_params = self._where(collection, start, end, filters)
+        cursor = self.conn.execute(f"{select}{where} ORDER BY key", params + where_params)
+        while rows := cursor.fetchmany(batch_size):
+            for (doc,) in rows:
+                yield project(loads(doc), fields)
+
+    def count(self, collection, start=None, end=None, **filters):
+        where, params = self._where(collection, start, end, filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {collection}{where}", params).fetchone()[0]
+
+    def missing(self, collection, field):
+        key_field(collection)
+        rows = self.conn.execute(
+            f"SELECT key FROM {collection} WHERE coalesce(json_extract(doc, ?), '') = '' ORDER BY key",
+            (f'$."{field}"',),
+        ).fetchall()
+        return [key for (key,) in rows]
+
+    def _row(self, collection: str, doc: dict) -> tuple:
+        return (doc[key_field(collection)], doc.get("book"), doc.get("section"), dumps(doc))
+
+    def put(self, collection, docs):
+        rows = [self._row(collection, doc) for doc in docs]
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    f"INSERT OR REPLACE INTO {collection} (key, book, section, doc) VALUES (?, ?, ?, ?)", rows
+                )
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        self._invalidate(collection, [row[0] for row in rows])
+        return len(rows)
+
+    def bulk_update(self, collection, updates, ordered=False):
+        # One transaction, so a failed update leaves nothing half-written whether or not `ordered` is set
+        matched = modified = 0
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, fields in updates.items():
+                    row = self.conn.execute(f"SELECT doc FROM {collection} WHERE key = ?", (key,)).fetchone()
+                    if row is None:
+                        continue
+                    doc = loads(row[0])
+                    matched += 1
+                    if all(doc.get(field) == value for field, value in fields.items()):
+                        continue
+                    doc.update(fields)
+                    self.conn.execute(
+                        f"UPDATE {collection} SET book = ?, section = ?, doc = ? WHERE key = ?",
+                        self._row(collection, doc)[1:] + (key,),
+                    )
+                    modified += 1
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        self._invalidate(collection, list(updates))
+        return {"matched": matched, "modified": modified, "errors": []}
+
+    def delete(self, collection, key):
+        deleted = self.conn.execute(f"DELETE FROM {collection} WHERE key = ?", (key,)).rowcount > 0
+        self._invalidate(collection, [key])
+        return deleted
+
+
+#> Seeding
+def read_export(path: str) -> list[dict]:
+    """Read a mongoexport JSON array, dropping MongoDB's `_id`."""
+    with open(path, "r") as infile:
+        docs = list(load(infile))
+    for doc in docs:
+        doc.pop("_id", None)
+    return docs
+
+
+def with_boundaries(doc: dict) -> dict:
+    """Fill in a chapter's book and section from its number when the dump left them out."""
+    if doc.get("book") is None:
+        doc["book"] = book_of(doc["chapter"])
+    if doc.get("section") is None:
+        doc["section"] = section_of(doc["chapter"])
+    return doc
+
+
+def merge(repository: Repository, collection: str, docs: list[dict], batch_size: int = SEED_BATCH_SIZE) -> int:
+    """
+    Write documents over the stored ones field by field, so fields the new documents lack are kept.
+
+    Returns:
+        `written` (int):
+            The documents written.
+    """
+    key = key_field(collection)
+    written = 0
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start : start + batch_size]
+        stored = {doc[key]: doc for doc in repository.get_many(collection, [doc[key] for doc in batch])}
+        merged = [
+            {**stored.get(doc[key], {}), **{field: value for field, value in doc.items() if value is not None}}
+            for doc in batch
+        ]
+        written += repository.put(collection, merged)
+    return written
+
+
+@errwrap()
+def seed(
+    repository: Repository,
+    export_dir: str = EXPORT_DIR,
+    chapters_dir: Optional[str] = CHAPTER_DICTS_DIR,
+) -> dict[str, int]:
+    """
+    Load the JSON dumps into a repository.
+
+    Every `<collection>.json` in `export_dir` is loaded into the collection of
+    that name. Chapters are then loaded from the per-chapter dumps in
+    `chapters_dir` when it exists; those only carry the chapter, title, url,
+    and text, so each chapter's book and section are derived from its number.
+    Documents are merged into any stored under the same key, so re-seeding, or
+    a sparser dump, never drops fields that are already there.
+
+    Args:
+        `repository` (Repository):
+            The repository to fill, usually a `SQLiteRepository`.
+        `export_dir` (str, optional):
+            The mongoexport dumps. Defaults to EXPORT_DIR.
+        `chapters_dir` (str, optional):
+            The `chapter-NNNN.json` dumps. Pass None to skip. Defaults to CHAPTER_DICTS_DIR.
+
+    Returns:
+        `counts` (dict[str, int]):
+            Collection -> documents written.
+    """
+    counts = {}
+    for path in sorted(glob(f"{export_dir}/*.json")):
+        collection = splitext(basename(path))[0]
+        if collection not in MODELS:
+            log.warning(f"Skipping {path}: {collection} is not a known collection.")
+            continue
+        docs = read_export(path)
+        if collection == "chapter":
+            docs = [with_boundaries(doc) for doc in docs]
+        counts[collection] = merge(repository, collection, docs)
+    if chapters_dir is not None and exists(chapters_dir):
+        docs = []
+        for path in sorted(glob(f"{chapters_dir}/chapter-*.json")):
+            with open(path, "r") as infile:
+                docs.append(with_boundaries(dict(load(infile))))
+        counts["chapter"] = merge(repository, "chapter", docs)
+    log.info(f"Seeded {repository!r}: {counts}")
+    return counts
+
+
+#> Backend
+def open_repository(storage: str = STORAGE) -> Repository:
+    """
+    Open the repository for a backend name.
+
+    Args:
+        `storage` (str, optional):
+            "mongo" or "sqlite". Defaults to $SUPERFORGE_STORAGE, or "mongo".
+    """
+    if storage == "mongo":
+        return MongoRepository()
+    if storage == "sqlite":
+        return SQLiteRepository()
+    raise UnknownStorage(f"Unknown storage backend: {storage}")
+
+
+repository = open_repository()
@@ -0,0 +1,332 @@
+# core/toc_refresh.py
+
+import re
+from dataclasses import asdict, dataclass, field
+from html.parser import HTMLParser
+from json import dump, load
+from os.path import exists
+from typing import Iterator, Optional
+
+import requests
+
+from core.atlas import max_title
+from core.base import BASE
+from core.log import errwrap, log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                          TOC Refresh                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+TOC_URL = "https://bestlightnovel.com/novel_888112448"
+TOC_PATH = f"{BASE}/json/toc2.json"
+TOC_STATE_PATH = f"{BASE}/json/toc_state.json"
+CHUNK_SIZE = 16 * 1024
+TIMEOUT = 30
+# Stop reading once this many known, unchanged chapters have been seen in a row.
+STOP_AFTER = 10
+# Refuse to write a diff removing more chapters than this; a truncated read looks like mass removal.
+MAX_REMOVED = 5
+# Tags with no end tag, which don't open a level of nesting.
+VOID_TAGS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"))
+
+
+@dataclass
+class TocDiff:
+    """The chapters added, retitled, moved to a new URL, and removed since the last refresh."""
+
+    added: list = field(default_factory=list)
+    retitled: list = field(default_factory=list)
+    moved: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    not_modified: bool = False
+    links_read: int = 0
+
+    def __bool__(self):
+        return bool(self.added or self.retitled or self.moved or self.removed)
+
+    def __repr__(self):
+        if self.not_modified:
+            return "TocDiff(not modified)"
+        return f"TocDiff(added={len(self.added)}, retitled={len(self.retitled)}, moved={len(self.moved)}, removed={len(self.removed)}, links_read={self.links_read})"
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ListChapterParser(HTMLParser):
+    """
+    Collects the links inside `#list_chapter` as the page is fed to it.
+
+    Links are appended to `links` as (href, text) tuples, so a caller feeding
+    the page in chunks can consume them and stop reading early.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links: list[tuple[str, str]] = []
+        self.done = False
+        self._depth = 0
+        self._href: Optional[str] = None
+        self._text: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+        if self._depth:
+            if tag not in VOID_TAGS:
+                self._depth += 1
+            if tag == "a":
+                self._href = attrs.get("href")
+                self._text = []
+        elif attrs.get("id") == "list_chapter":
+            self._depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        # A self-closing tag opens and closes nothing, so the depth is left alone
+        if self.done or not self._depth:
+            return
+        href = dict(attrs).get("href")
+        if tag == "a" and href is not None:
+            self.links.append((href, ""))
+
+    def handle_endtag(self, tag):
+        if not self._depth or tag in VOID_TAGS:
+            return
+        if tag == "a" and self._href is not None:
+            self.links.append((self._href, "".join(self._text).strip()))
+            self._href = None
+        self._depth -= 1
+        if not self._depth:
+            self.done = True
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+#> State
+def read_toc(path: str = TOC_PATH) -> dict:
+    with open(path, "r") as infile:
+        return dict((load(infile)))
+
+
+def read_state(path: str = TOC_STATE_PATH) -> dict:
+    if not exists(path):
+        return {}
+    with open(path, "r") as infile:
+        return dict((load(infile)))
+
+
+def write_state(state: dict, path: str = TOC_STATE_PATH) -> None:
+    with open(path, "w") as outfile:
+        dump(state, outfile, indent=4)
+
+
+#> Parsing
+def parse_link_title(chapter: str, link_text: str) -> str:
+    """
+    Parse a chapter's title out of its `#list_chapter` link text, the same way `core/get_toc.get_toc` does.
+
+    Args:
+        `chapter` (str):
+            The given chapter.
+        `link_text` (str):
+            The text of the chapter's link.
+
+    Returns:
+        `title` (str):
+            The chapter's title.
+    """
+    title = link_text.split(chapter, 1)[-1]
+    title = title.replace(":", "").replace("-", "").strip()
+    title = max_title(title) if title else title
+    if "-" in title:
+        title = " ".join(
+            "-".join(part.capitalize() for part in word.split("-")) if "-" in word else word
+            for word in title.split()
+        )
+    return title
+
+
+def title_key(title: str) -> str:
+    """Reduce a title to letters and digits so punctuation and case fixups don't count as retitles."""
+    return re.sub(r"[^0-9a-z]", "", title.lower())
+
+
+def stream_links(response: requests.Response) -> Iterator[tuple[str, str]]:
+    """
+    Yield the `#list_chapter` links of a streamed response as they arrive.
+
+    Args:
+        `response` (requests.Response):
+            A response opened with `stream=True`.
+
+    Yields:
+        `link` (tuple[str, str]):
+            The link's href and text.
+    """
+    parser = ListChapterParser()
+    response.encoding = response.encoding or "utf-8"
+    for chunk in response.iter_content(chunk_size=CHUNK_SIZE, decode_unicode=True):
+        parser.feed(chunk)
+        yield from parser.links
+        parser.links.clear()
+        if parser.done:
+            return
+    parser.close()
+    yield from parser.links
+
+
+#> Refresh
+@errwrap(entry=False, exit=False)
+def diff_links(links, toc: dict, full: bool = False, stop_after: int = STOP_AFTER) -> TocDiff:
+    """
+    Compare `#list_chapter` links, newest first, against the known table of contents.
+
+    Unless `full` is set, reading stops after `stop_after` known, unchanged
+    chapters in a row. Removals are then only reported for known chapters
+    above the oldest chapter read.
+
+    Args:
+        `links` (Iterable[tuple[str, str]]):
+            The (href, text) of each link, in site order.
+        `toc` (dict):
+            The known table of contents.
+        `full` (bool, optional):
+            Read every link. Defaults to False.
+        `stop_after` (int, optional):
+            Consecutive unchanged chapters that end an incremental read. Defaults to STOP_AFTER.
+
+    Returns:
+        `diff` (TocDiff):
+            The added, retitled, and removed chapters.
+    """
+    diff = TocDiff()
+    by_url = {entry["url"]: key for key, entry in toc.items()}
+    seen = set()
+    unchanged = 0
+    for href, link_text in links:
+        diff.links_read += 1
+        key = by_url.get(href)
+        if key is None:
+            numbers = re.findall(r"\d+", link_text) or re.findall(r"\d+", href)
+            if not numbers:
+                log.warning(f"Unable to find a chapter number in link: {link_text}")
+                continue
+            key = numbers[0]
+        title = parse_link_title(key, link_text)
+        seen.add(key)
+        known = toc.get(key)
+        if known is None:
+            diff.added.append({"chapter": key, "title": title, "url": href})
+            unchanged = 0
+        elif title and title_key(title) != title_key(known["title"]):
+            diff.retitled.append({"chapter": key, "old": known["title"], "new": title, "url": href})
+            unchanged = 0
+        elif href != known["url"]:
+            diff.moved.append({"chapter": key, "old": known["url"], "new": href})
+            unchanged = 0
+        else:
+            unchanged += 1
+            if not full and unchanged >= stop_after:
+                break
+
+    if full:
+        candidates = toc.keys()
+    else:
+        oldest = min((int(key) for key in seen), default=None)
+        candidates = [] if oldest is None else [key for key in toc if int(key) >= oldest]
+    diff.removed = [dict(toc[key]) for key in candidates if key not in seen]
+    return diff
+
+
+def apply_diff(toc: dict, diff: TocDiff) -> dict:
+    """
+    Apply a diff to a table of contents, keeping it ordered newest first.
+
+    Args:
+        `toc` (dict):
+            The known table of contents.
+        `diff` (TocDiff):
+            The changes to apply.
+
+    Returns:
+        `toc` (dict):
+            The updated table of contents.
+    """
+    toc = dict(toc)
+    for entry in diff.removed:
+        toc.pop(str(entry["chapter"]), None)
+    for entry in diff.retitled:
+        toc[entry["chapter"]] = {"chapter": entry["chapter"], "title": entry["new"], "url": entry["url"]}
+    for entry in diff.moved:
+        toc[entry["chapter"]] = {**toc[entry["chapter"]], "url": entry["new"]}
+    for entry in diff.added:
+        toc[entry["chapter"]] = dict(entry)
+    return {key: toc[key] for key in sorted(toc, key=int, reverse=True)}
+
+
+@errwrap(entry=False)
+def refresh_toc(
+    full: bool = False, write: bool = True, url: str = TOC_URL, max_removed: int = MAX_REMOVED
+) -> TocDiff:
+    """
+    Check the novel's page for new, retitled, or removed chapters.
+
+    Sends the stored ETag/Last-Modified validators, so an unchanged page costs a
+    single 304 response. Otherwise the page is streamed and parsing stops once
+    the listing reaches chapters already known in json/toc2.json. toc2.json is
+    only rewritten when something changed, and never when the diff removes
+    more than `max_removed` chapters, which usually means the page was cut short.
+
+    Args:
+        `full` (bool, optional):
+            Ignore the validators and read the whole listing. Defaults to False.
+        `write` (bool, optional):
+            Whether to write the changes to toc2.json. Defaults to True.
+        `url` (str, optional):
+            The novel's page. Defaults to TOC_URL.
+        `max_removed` (int, optional):
+            The most removals written without review. Defaults to MAX_REMOVED.
+
+    Returns:
+        `diff` (TocDiff):
+            The added, retitled, and removed chapters.
+    """
+    toc = read_toc()
+    state = read_state()
+    headers = {}
+    if not full:
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+    with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code == 304:
+            log.info("Table of contents not modified since the last refresh.")
+            return TocDiff(not_modified=True)
+        response.raise_for_status()
+        diff = diff_links(stream_links(response), toc, full=full)
+        validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+
+    if len(diff.removed) > max_removed:
+        log.error(
+            f"Refusing to update toc2.json: {len(diff.removed)} chapters would be removed "
+            f"after reading {diff.links_read} links. Rerun with a higher max_removed if this is intended."
+        )
+        return diff
+    if diff and write:
+        with open(TOC_PATH, "w") as outfile:
+            dump(apply_diff(toc, diff), outfile, indent=4)
+        log.info(f"Updated toc2.json: {diff}")
+    else:
+        log.info(f"Table of contents is up to date ({diff.links_read} links read).")
+    if write:
+        write_state(validators)
+    return diff
@@ -0,0 +1,105 @@
+# core/vog.py
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                         Voice of God                            │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+# Rule name -> what a quoted "voice of god" line contains between its quotes.
+# A line matches a rule when the whole line is one quotation matching the pattern.
+VOG_RULES = (
+    ("killed_beast_soul_points", r".*?killed.*?beast soul.*?point.*?"),
+    ("flesh_points", r".*?flesh.*?point.*?"),
+    ("xenogeneic_hunted", r".*?Xenogeneic.*?hunted.*?gene.*?"),
+    ("hunted_beast_soul", r".*?hunted.*?:.*?beast soul.*?"),
+    ("killed_beast_soul_inedible", r".*?killed.*?beast soul.*?inedible.*?"),
+    ("beast_soul_colon", r".*?beast soul.*?:.*?"),
+    ("beast_soul_semicolon", r".*?beast soul.*?;.*?"),
+    ("gene_lock", r".*?:.*?gene lock.*?"),
+    ("gene_plus", r".*?gene.*?\+\d+.*?"),
+    ("hunted_found", r".*?hunted.*?found.*?"),
+    ("body_evolution_success", r".*?body.*?evol.*?success.*?"),
+    ("consumed_geno_points", r".*?consumed.*?geno point.*?"),
+    ("status", r".*?;.*?status.*?"),
+    ("retrieve_beast_soul", r".*?retrieve.*?beast soul.*?from.*?"),
+    ("obtained_random", r".*?obtained.*?random.*?"),
+    ("absorb_geno_points", r".*?absorb.*?geno point.*?"),
+    ("announcement", r".*?announce.*?:.*?"),
+    ("eaten_geno_points", r".*?eaten\..*?geno point.*?"),
+    ("egg_identified", r".*?egg broken.*?identi.*?"),
+    ("identifying_beast_soul", r".*?Identifying.*?beast soul.*?"),
+    ("beast_soul_identified", r".*?beast soul.*?identi.*?gained.*?"),
+    ("killed_beast_soul_life_essence", r".*?killed.*?beast soul.*?life essence.*?"),
+    ("evolution_super_body", r".*?evolution.*?super body.*?"),
+    ("killed_geno_core_flesh", r".*?killed.*?beast soul.*?geno core.*?flesh.*?"),
+    ("deified_gene", r"Deified Gene.*?\+1.*?"),
+    ("god_evolution", r"God.*?Evolu.*?"),
+)
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules: tuple[tuple[str, str], ...] = VOG_RULES) -> re.Pattern:
+    """
+    Combine the rules into one pattern matching a whole quoted line.
+
+    Each rule is a named alternative, so `match.lastgroup` names the first
+    rule, in order, that the line satisfies.
+    """
+    alternatives = "|".join(f"(?P<{name}>{pattern})" for name, pattern in rules)
+    # The lookahead also keeps out lines with more than one quotation, e.g. dialogue around narration
+    return re.compile(f'^"(?=[^"\n]*"$)(?:{alternatives})"$', re.I | re.M)
+
+
+def blockquote(text: str, rules: tuple[tuple[str, str], ...] = VOG_RULES) -> tuple[str, Counter]:
+    """
+    Blockquote every "voice of god" line in one pass over the text.
+
+    Matching lines become `> ` followed by the line in title case. Lines
+    already blockquoted don't start with a quote, so running this twice
+    changes nothing. The first line of the text is checked like any other.
+
+    Args:
+        `text` (str):
+            The chapter text.
+        `rules` (tuple[tuple[str, str], ...], optional):
+            Rule name -> pattern. Defaults to VOG_RULES.
+
+    Returns:
+        `text` (str):
+            The rewritten text.
+        `fired` (Counter):
+            Rule name -> lines it matched.
+    """
+    fired = Counter()
+
+    def replace(match: re.Match) -> str:
+        fired[match.lastgroup] += 1
+        return f"> {match.group()}".title()
+
+    text = compile_rules(rules).sub(replace, str(text))
+    return text, fired
+
+
+def vog(text: str, fired: Optional[Counter] = None) -> str:
+    """
+    Blockquote the "voice of god" lines of a chapter's text.
+
+    Args:
+        `text` (str):
+            The chapter text.
+        `fired` (Counter, optional):
+            Updated with the lines each rule matched, e.g. to tally rules across a corpus.
+
+    Returns:
+        `text` (str):
+            The text with its "voice of god" lines blockquoted.
+    """
+    text, matched = blockquote(text)
+    if fired is not None:
+        fired.update(matched)
+    return text
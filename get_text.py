@@ -21,20 +21,24 @@ try:
     from core.base import BASE
     from core.log import log, errwrap
     from core.download_chapter import get_text_from_ch
+    from core.mt_get_text import save_chapter_text
+    from core.async_download import run_download
+    from core.reader_session import bootstrap, ensure_reader_settings
+    from core.chapter_set import ChapterSet
 except ImportError:
     from chapter import Chapter, generate_book
     from atlas import sg, get_atlas_uri
     from base import BASE
     from log import log
     from core.download_chapter import get_text_from_ch
+    from core.mt_get_text import save_chapter_text
+    from core.async_download import run_download
+    from core.reader_session import bootstrap, ensure_reader_settings
+    from chapter_set import ChapterSet
 
 with open ('json/toc2.json', 'r') as infile:
     toc = load(infile)
 
-def chunks(l, n):
-    for i in range(0, len(l), n):
-        yield l[i:i + n]
-        
 def get_text(chapter: int) -> dict:
     chapter = int(toc[str(chapter)]["chapter"])
     CHAPTER = str(chapter)
@@ -54,21 +58,14 @@ def get_text(chapter: int) -> dict:
     options = ChromeOptions()
     options.add_argument("--headless")
     driver = webdriver.Chrome(PATH, options=options)
+    bootstrap(driver)
 
     #> Get Chapter Page
     driver.get(url)
 
     #> Get Article
     try:
-        settings_button = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.LINK_TEXT, "SETTING"))
-        )
-        settings_button.click()
-
-        change_bad_words_button = driver.find_element(
-            By.XPATH, '//*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a'
-        )
-        change_bad_words_button.click()
+        ensure_reader_settings(driver, chapter)
         try:
             text = WebDriverWait(driver, 10).until(
                 EC.presence_of_element_located((By.ID, "vung_doc"))
@@ -127,26 +124,19 @@ def get_text(chapter: int) -> dict:
     finally:
         driver.quit()
 
-pool = mp.Pool(mp.cpu_count()-1)
-
-chapters = []
-for x in range(1,3463):
-    if x == 3095 | x == 3117:
-        continue
-    else:
-        chapters.append(x)
-
-result = pool.map(get_text, chapters)
-pool.close()
-
-final_result = list(chain.from_iterable([r.items() for r in result]))
-for x in alive_it(final_result,title="Updating MongoDB"):
+def save_unparsed_text(chapter: int, title: str, url: str, text: str) -> dict:
+    """Persist a downloaded chapter to disk and to MongoDB as soon as it completes."""
+    chapter_dict = save_chapter_text(chapter, title, url, text)
     sg()
-    chapter = int( x["chapter"] )
     for doc in Chapter.objects(chapter=chapter):
-        doc.unparsed_text = x["text"]
+        doc.unparsed_text = text
         doc.save()
         log.debug(f"Updated chapter {doc.chapter}")
-        
-sh("figlet 'Done!' | lolcat -a")
-ffrom
\ No newline at end of file
+    return chapter_dict
+
+
+if __name__ == "__main__":
+    result = run_download(ChapterSet.span(), persist=save_unparsed_text)
+    log.info(f"Updated {len(result['downloaded'])} chapters; {len(result['failed'])} failed.")
+
+    sh("figlet 'Done!' | lolcat -a")
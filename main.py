@@ -17,14 +17,14 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 # from mongoengine import connect
 from alive_progress import alive_bar, alive_it
-from core.chapter import chapter_gen
+from core.chapter_set import ChapterSet
 
 from core.log import errwrap, log, new_run
 from core.fix_tags import fix_tags
 from core.atlas import sg, BASE, max_title
 # import core.book as book_
 # import core.chapter as chapter_
-from core.chapter import Chapter, generate_section, generate_book, chapter_gen
+from core.chapter import Chapter, generate_section, generate_book
 # import core.cover as cover_
 # import core.defaultdoc as default_
 # import core.endofbook as eob_
@@ -35,7 +35,8 @@ from core.chapter import Chapter, generate_section, generate_book, chapter_gen
 # import core.get_toc as toc_
 # from core.yay import yay, finished
 # import core.download_chapter as dc
-from core.mt_get_text import get_chapter_text
+from core.mt_get_text import get_chapter_text, driver_pool
+from core.async_download import run_download
 
 load_dotenv()  # > Load .env file
 
@@ -48,9 +49,22 @@ with open("json/toc2.json", "r") as infile:
 
 unparsed_text = {}
 
-with alive_bar(795, title="Downloading chapters", dual_line=True) as bar:
-    with ThreadPoolExecutor(max_workers=20) as executor:
-        executor.map(get_chapter_text, chapter_gen(start=3096, end=3116))
+with alive_bar(title="Downloading chapters", dual_line=True) as bar:
+
+    def progress(chapter_dict: dict):
+        bar.text(f"Chapter {chapter_dict['chapter']}: {chapter_dict['title']}")
+        bar()
+
+    # Resume skips chapters the download journal already has as persisted
+    results = run_download(
+        ChapterSet.span(3096, 3116), concurrency=20, progress=progress, resume=True
+    )
+
+if results["failed"]:
+    log.warning(f"Failed chapters:\n<code>{dumps(results['failed'], indent=4)}</code>")
+
+# Quit the pooled browser sessions
+driver_pool.close()
 
 
 
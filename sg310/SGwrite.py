@@ -15,6 +15,10 @@ import logging
 import sys
 import re
 
+from core.boundaries import book_of_section, section_of
+from core.rules import parse_rules
+from core.vog import vog
+
 def write_chapter(ch):
     for doc in Chapter.objects(chapter=ch):
         chapter = str(ch)
@@ -34,19 +38,6 @@ def output(doc):
     chapter_text = str(head + text)
 
     chapter = str(doc.chapter)
-    chapterNum = int(chapter)
-    if chapterNum < 425:
-        section = "1"
-    elif chapterNum < 883:
-        section = "2"
-    elif chapterNum < 1339:
-        section = "3"
-    elif chapterNum < 1680:
-        section = "4"
-    elif chapterNum < 1712:
-        section = "5"
-    else:
-        section = "6"
     filename = str("chapter-" + chapter.zfill(5) + ".md")
     filepath = str("/" + filename)
     with open(filepath, "w") as outfile:
@@ -135,217 +126,6 @@ def remove_ch_title(doc):
             + split_text[0]
         )
         
-def badWords(text, chapter):
-    chapter = str(chapter)
-    badWords = {
-        "shit1": {"regex": r"sh\*t", "replacement": "shit"},
-        "shit2": {"regex": r"s\*#t", "replacement": "shit"},
-        "fuck1": {"regex": r"f\*#k", "replacement": "uc"},
-        "shit3": {"regex": r"Sh\*t", "replacement": "Shit"},
-        "shit4": {"regex": r"S\*#t", "replacement": "Shit"},
-        "fuck2": {"regex": r" F\*#k ", "replacement": " Fuck "},
-        "fuck3": {"regex": r" F\*ck ", "replacement": " Fuck "},
-    }
-    keys = badWords.keys()
-    for key in keys:
-        regex = badWords[key]["regex"]
-        results = findall(regex, text, re.I)
-        if results:
-            replacement = badWords[key]["replacement"]
-            for x in results:
-                text = sub(regex, replacement, text, re.I)
-                log.info("\n\t\t\tUpdated " + regex + " -> " + replacement)
-    badWords = {
-        "ass1": {"regex": r" \*ss ", "replacement": " ass "},
-        "ass2": {"regex": r"\n\*ss ", "replacement": "\nAss "},
-        "ass3": {"regex": r"\. \*ss ", "replacement": ". Ass "},
-    }
-    keys = badWords.keys()
-    for key in keys:
-        regex = badWords[key]["regex"]
-        results = findall(regex, text)
-        if results:
-            replacement = badWords[key]["replacement"]
-            for x in results:
-                text = sub(regex, replacement, text)
-    return text
-
-def removeDotCom(text):
-    text = str(text)
-    dotComRegex = r"^(.*?\.com.*)$"
-    results = findall(dotComRegex, text, re.I | re.M)
-    if results:
-        for match in results:
-            text = sub(match, "", text, re.I | re.M)
-    return text
-
-# Formatting Functions
-def comment_out_lines(lines, table):
-    lines = lines.splitlines()
-    count = len(lines)
-    for x, line in enumerate(lines, start=1):
-        if x < count:
-            line = "\n<!-- " + line + " -->"
-            table = str(table + line)
-        else:
-            line = "\n<!-- " + line + " -->\n"
-            table = str(table + line)
-    table = table.replace("<!--  -->\n", "")
-    return table
-
-def vog(text):
-    text = str(text)
-    blockquote_regex = [
-        r"\n(^\".*?killed.*?beast soul.*?point.*?\")$",
-        r"\n(^\".*?flesh.*?point.*?\")$",
-        r"\n(^\".*?Xenogeneic.*?hunted.*?gene.*?\")$",
-        r"\n(^\".*?hunted.*?:.*?beast soul.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?inedible.*?\")$",
-        r"\n(^\".*?beast soul.*?:.*?\")$",
-        r"\n(^\".*?beast soul.*?;.*?\")$",
-        r"\n(^\".*?:.*?gene lock.*?\")$",
-        r"\n(^\".*?gene.*?\+\d+.*?\")$",
-        r"\n(^\".*?hunted.*?found.*?.*?\")$",
-        r"\n(^\".*?body.*?evol.*?success.*?\")$",
-        r"\n(^\".*?consumed.*?geno point.*?\")$",
-        r"\n(^\".*?;.*?status.*?\")$",
-        r"\n(^\".*?retrieve.*?beast soul.*?from.*?\")$",
-        r"\n(^\".*?obtained.*?random.*?\")$",
-        r"\n(^\".*?absorb.*?geno point.*?\")$",
-        r"\n(^\".*?announce.*?:.*?\")$",
-        r"\n(^\".*?eaten\..*?geno point.*?\")$",
-        r"\n(^\".*?egg broken.*?identi.*?\")$",
-        r"\n(^\".*?Identifying.*?beast soul.*?\")$",
-        r"\n(^\".*?beast soul.*?identi.*?gained.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?life essence.*?\")$",
-        r"\n(^\".*?evolution.*?super body.*?\")$",
-        r"^(\".*?killed.*?beast soul.*?geno core.*?flesh.*?\")$",
-        r"\n(^\"Deified Gene.*?+1.*?\")$",
-        r"\n(^\"God.*?Evolu.*?\")$"
-    ]
-    matches = []
-    for regex in blockquote_regex:
-        matches = findall(regex, text, re.I | re.M)
-        if matches:
-            for match in matches:
-                block = str("> " + match)
-                block = block.title()
-                text = sub(match, block, text, re.I, re.M)
-            duplicate_regex = r"^(> > )\""
-            duplicate_results = findall(duplicate_regex, text, re.I | re.M)
-            if duplicate_results:
-                for x in duplicate_results:
-                    rep_str = r"> "
-                    text = sub(x, rep_str, text, re.I | re.M)
-    return text
-
-def geno_r(text):
-    text = str(text)
-    geno_r_regex = r"(.*?.evol.*?:.*)$"
-    geno_r_results = re.search(geno_r_regex, text, re.I | re.M)
-    if geno_r_results:
-        table = (
-            '<table class="geno-r">\n\t<tr>\n\t\t<th colspan="2">Geno Points</th>\n\t</tr><tr>\n\t\t<td>Required to Evolve</td>\n\t\t<td>REQUIRE</td>\n\t</tr>\n</table>'
-            ""
-        )
-        geno_r_results = geno_r_results.group()
-        require_regex = r".*?(\d+).*$"
-        require = findall(require_regex, geno_r_results)
-        if require:
-            require = require[0]
-            table = table.replace("REQUIRE", require)
-        else:
-            table = table.replace("REQUIRE", "Unknown")
-        table = comment_out_lines(geno_r_results, table)
-        text = text.replace(geno_r_results, table)
-    return text
-
-def status(text):
-    text = str(text)
-    status_regex = r"(.*?^Han Sen:.*$\n\n.*?^Status.*$\n\n.*?^Life.*)$|(.*?^Han Se:.*$\n\n.*?^Super.*$\n\n.*?^Status.*$\n\n.*?^Life.*)$|(.*?^Han Sen.*$\n\n.*?^Stage.*$\n\n.*?^Life.*)$|(.*?^Han Sen.*$\n\n.*?^Level.*$\n\n.*?^Life.*)$"
-
-    # Find, Eveluate, Comment-out, Create, & Replace with Table
-    status_search_results = re.search(status_regex, text, re.IGNORECASE | re.MULTILINE)
-    if status_search_results:
-        status = status_search_results.group()
-        status_no_punc = (
-            status.replace(":", "").replace("-", "").replace("–", "").replace(".", "")
-        )
-        regex_life = r"(.*?Life.*)$"
-        lifespan = re.search(regex_life, status_no_punc, re.I)
-        if lifespan:
-            try:
-                lifespan = lifespan.group()
-                lifespan = re.search(r"\d+", lifespan)[0]
-                lifespan = int(lifespan)
-            except:
-                lifespan = lifespan.lower()
-                if "six" in lifespan:
-                    lifespan = 600
-                elif "five" in lifespan:
-                    lifespan = 500
-                elif "four" in lifespan:
-                    lifespan = 400
-                elif "three" in lifespan:
-                    lifespan = 300
-                else:
-                    lifespan = 200
-
-            if lifespan == 600:
-                status_dict = {
-                    "Status": "God",
-                    "Geno Body": "Not Created",
-                    "Lifespan": "600 years",
-                }
-            elif lifespan == 500:
-                status_dict = {
-                    "Status": "Demigod",
-                    "Super Body": "Super King Spirit - Ultimate",
-                    "Lifespan": "500 years",
-                }
-            elif lifespan == 400:
-                status_dict = {
-                    "Status": "Surpasser",
-                    "Super Body": "Super King Spirit",
-                    "Lifespan": "400 years",
-                }
-            elif lifespan == 300:
-                status_dict = {
-                    "Status": "Evolver",
-                    "Super Body": "King Spirit",
-                    "Lifespan": "300 years",
-                }
-            else:
-                status_dict = {"Status": "Unevolved", "Lifespan": "200 years"}
-        else:
-            print("Lifespan not found in status results. Exiting Script")
-
-        # Create Status Table
-        table = (
-            '<table class="status">\n\t<tr>\n\t\t<th colspan="2">Han Sen</th>\n\t</tr>'
-        )
-        keys = status_dict.keys()
-        for key in keys:
-            td_lable = str(key)
-            td_value = str(status_dict.get(key))
-            table_row = str(
-                "<tr>\n\t\t<td>"
-                + td_lable
-                + "</td>\n\t\t\t<td>"
-                + td_value
-                + "</td>\n\t\t</tr>"
-            )
-            table = str(table + table_row)
-        table = str(table + "\n</table>")
-
-        # Comment out status text
-        status = str(status)
-        table = comment_out_lines(status, table)
-
-        # Replace Status text with HTML Status Table and HTML Commented Lines
-        text = text.replace(status, table)
-    return text
-
 def db_logVog(doc):
     text = doc.original_text
     chapter = str(doc.chapter)
@@ -370,13 +150,6 @@ def db_logVog(doc):
             else:
                 pass
 
-def fixDemigod(text):
-    if "demiGod" in text:
-        text = text.replace("demiGod","demigod")
-    if "DemiGod" in text:
-        text = text.replace("DemiGod","Demigod")
-    return text
-                
 def db_parse_chapter(doc):
     title = str(doc.title)
     chapter = str(doc.chapter)
@@ -385,172 +158,29 @@ def db_parse_chapter(doc):
         doc.text = final_text
     else:
         text = str(doc.original_text)
-        tags = set(([]))
-
-        # Search for HTML Header in Text:
-        remove_meta_regex = r"(Chapter.*\n\n.*?Nyoi-Bo Studio.*\n)\n$|(.*?Nyoi-Bo Studio.*\n)$\n|(.*?Chapter.*$\n)\n"
-        article_header = re.search(remove_meta_regex, text, re.I | re.M)
-        if article_header:
-            # If HTML Header found, replace it with Head
-            article_header = article_header.group()
-            article_header = str(article_header)
-            text = str(text.replace(article_header, ""))
-        studioRegex = r"(.*?Nyoi.*\n\n)"
-        studioResults = findall(studioRegex, text, re.M | re.I)
-        if studioResults:
-            text = sub(studioRegex, "", text, flags=re.M | re.I)
-        if chapter in text:
-            regex_string = str(r"^(.*?)" + chapter + r"(.*)$")
-            text = sub(regex_string, "", text)
-
-        # Blockquote - VoG  -----------------------------------------
-        vog_text = str(vog(text))
-        if vog_text != text:
-            if text != "None":
-                text = str(vog_text)
-                tags.add("vog")
-            else:
-                sys.exit()
-
-        # Check for Status Table ------------------------------------
-        status_text = str(status(text))
-        if status_text != text:
-            if status_text != "None":
-                text = str(status_text)
-                tags.add("status")
-
-        # Check for Geno-r Table --------------------------------------
-        genoR_text = str(geno_r(text))
-        if genoR_text != text:
-            if genoR_text != "None":
-                text = str(genoR_text)
-                tags.add("geno_r")
-
-        # Check for new Beast Soul
-        regex = r"(.*?)beast soul(.*?)type(.*?)$"
-        chapter_matches = findall(regex, text)
-        if chapter_matches:
-            tags.add("beast")
-        else:
-            regex = r"(.*?)type(.*?)beast soul(.*?)$"
-            chapter_matches = findall(regex, text)
-            if chapter_matches:
-                tags.add("beast")
-
-        # Fix censored bad words
-        text = badWords(text, chapter)
-        parsed_text = str(text)
-
-        # Fix Demigod and Advertisements
-        text = fixDemigod(parsed_text)
-        text = removeDotCom(text)
-
-        # Remove Title and Chapter data from top of chapter
-        split_text = text.split("\n\n")
-        first2lines = split_text[0:1]
-        if title in first2lines:
-            for x, line in enumerate(first2lines):
-                if title in line:
-                    line = sub(title, "", text)
-                    split_text[x] = line
-        if chapter in first2lines:
-            for x, line in enumerate(first2lines):
-                if chapter in line:
-                    line = sub(chapter, "", text)
-                    split_text[x] = line
-        updated_text = "\n\n".join(split_text)
-        if updated_text != text:
-            text = updated_text
-
+        text, tags = parse_rules.apply(text, chapter=int(chapter), title=title)
         doc.text = text
 
-        # Fix Jadeskin
-        jadeskin_results = findall("jadeskin", text)
-        if jadeskin_results:
-            for result in jadeskin_results:
-                text = sub(result, "Jadeskin", text)
-
-        # Fix tags
-        etags = set((doc.tags))
-        tags = []
-        for tag in etags:
-            tags.append(tag)
-        doc.tags = tags
+        # Keep the existing tags and add the vog, status, geno_r and beast tags the rules found
+        doc.tags = sorted(set(doc.tags or []) | tags)
         
     doc.save()
     lp("Parsed Chapter " + chapter)
     return doc  # End of parse_chapter
 
 def addSection(doc):
-    chapter = int(doc.chapter)
-    # Determine Secrtion from Chapter
-    if chapter < 425:
-        section = 1
-    elif chapter < 883:
-        section = 2
-    elif chapter < 1339:
-        section = 3
-    elif chapter < 1680:
-        section = 4
-    elif chapter < 1712:
-        section = 5
-    elif chapter < 1961:
-        section = 6
-    elif chapter < 2205:
-        section = 7
-    elif chapter < 2244:
-        section = 8
-    elif chapter < 2640:
-        section = 9
-    elif chapter < 2794:
-        section = 10
-    elif chapter < 3034:
-        section = 11
-    else:
-        section = 12
-    doc.section = section
+    doc.section = section_of(int(doc.chapter))
     return doc
 
 def get_section(chapter):
-    chapter = int(chapter)
-    # Determine Secrtion from Chapter
-    if chapter < 425:
-        section = 1
-    elif chapter < 883:
-        section = 2
-    elif chapter < 1339:
-        section = 3
-    elif chapter < 1680:
-        section = 4
-    elif chapter < 1712:
-        section = 5
-    elif chapter < 1961:
-        section = 6
-    elif chapter < 2205:
-        section = 7
-    elif chapter < 2244:
-        section = 8
-    elif chapter < 2640:
-        section = 9
-    elif chapter < 2794:
-        section = 10
-    elif chapter < 3034:
-        section = 11
-    else:
-        section = 12
-    return section
+    return section_of(int(chapter))
 
 def addBook(doc):
-    section = doc.section
-    books = {1: 1, 2: 2, 3: 3, 4: 4, 5: 4, 6: 5}
-    book = books[section]
-    doc.book = book
+    doc.book = book_of_section(doc.section)
     return doc
 
 def get_book(section):
-    books = {1: 1, 2: 2, 3: 3, 4: 4, 5: 4, 6: 5, 7: 6, 8: 7, 9: 8}
-    book = books[section]
-    return book
+    return book_of_section(section)
 
 def make_html(doc):
     chapter = str(doc.chapter)
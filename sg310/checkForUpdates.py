@@ -11,7 +11,6 @@ from mongoengine import Document, connect
 from mongoengine.fields import (DateTimeField, IntField, ListField,
                                 StringField, URLField)
 # Supergene mongoDB
-from pymongo import monitoring
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
@@ -21,6 +20,7 @@ from tqdm.auto import tqdm
 
 from main import Chapter, Section, atlas, get_toc, log, lp, max_title
 from SG import db_parse_chapter
+from core.vog import blockquote
 
 # Full paths
 INDEX_PATH= 'JSON/index.json'
@@ -40,26 +40,6 @@ logging.basicConfig(filename=LOG_PATH, level=logging.INFO,
                     format='%(asctime)s: %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
 
 
-class CommandLogger(monitoring.CommandListener):
-    def started(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} started on server "
-                  "{0.connection_id}".format(event))
-
-    def succeeded(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} on server {0.connection_id} "
-                  "succeeded in {0.duration_micros} "
-                  "microseconds".format(event))
-
-    def failed(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} on server {0.connection_id} "
-                  "failed in {0.duration_micros} "
-                  "microseconds".format(event))
-
-monitoring.register(CommandLogger())
-
 # User defined functions -------------------------
 def correct_title(chapter,title):
     chapter = str(chapter)
@@ -93,31 +73,10 @@ def correct_title(chapter,title):
     return title
 
 def vog(chapter_number, chapter_text_string):
-    chapter_number = int(chapter_number)
-    chapter_text = str(chapter_text_string)
-    blockquote_regex = [r"\n(^\".*?killed.*?beast soul.*?point.*?\")$", r"\n(^\".*?flesh.*?point.*?\")$", r"\n(^\".*?Xenogeneic.*?hunted.*?gene.*?\")$", r"\n(^\".*?hunted.*?:.*?beast soul.*?\")$", r"\n(^\".*?killed.*?beast soul.*?inedible.*?\")$", r"\n(^\".*?beast soul.*?:.*?\")$", r"\n(^\".*?beast soul.*?;.*?\")$", r"\n(^\".*?:.*?gene lock.*?\")$", r"\n(^\".*?gene.*?\+\d+.*?\")$", r"\n(^\".*?hunted.*?found.*?.*?\")$", r"\n(^\".*?body.*?evol.*?success.*?\")$", r"\n(^\".*?consumed.*?geno point.*?\")$",
-                        r"\n(^\".*?;.*?status.*?\")$", r"\n(^\".*?retrieve.*?beast soul.*?from.*?\")$", r"\n(^\".*?obtained.*?random.*?\")$", r"\n(^\".*?absorb.*?geno point.*?\")$", r"\n(^\".*?announce.*?:.*?\")$", r"\n(^\".*?eaten\..*?geno point.*?\")$", r"\n(^\".*?egg broken.*?identi.*?\")$", r"\n(^\".*?Identifying.*?beast soul.*?\")$", r"\n(^\".*?beast soul.*?identi.*?gained.*?\")$", r"\n(^\".*?killed.*?beast soul.*?life essence.*?\")$", r"\n(^\".*?evolution.*?super body.*?\")$"]
-    matches = []
-    addToSamples = False
-    for regex in blockquote_regex:
-        matches = re.findall(regex, chapter_text, re.I | re.M)
-        if matches:
-            for match in matches:
-                block = str('> ' + match)
-                block = block.title()
-                chapter_text = re.sub(match, block, chapter_text, re.I, re.M)
-            duplicate_regex = r'^(> > )\"'
-            duplicate_results = re.findall(
-                duplicate_regex, chapter_text, re.I | re.M)
-            if duplicate_results:
-                for x in duplicate_results:
-                    rep_str = r'> '
-                    chapter_text = re.sub(
-                        x, rep_str, chapter_text, re.I | re.M)
-            addToSamples = True
+    chapter_text, fired = blockquote(str(chapter_text_string))
     # If VoG was found, update JSON samples
-    if addToSamples == True:
-        addToSample(chapter_number, 'block')
+    if fired:
+        addToSample(int(chapter_number), 'block')
     return chapter_text
 
 def comment_out_lines(lines, table):
@@ -4,7 +4,6 @@ import sys
 from json import dump, load
 from re import I, M, findall, sub
 
-from pymongo import monitoring
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.common.by import By
@@ -14,6 +13,7 @@ from tqdm.auto import tqdm
 
 from main import Chapter, atlas, lp, max_title
 from SG import badWords, fixDemigod, geno_r, status, removeDotCom
+from core.vog import vog
 
 LOG_PATH = 'logs/get-chapter.log'
 DRIVERS_PATH = "Driver/chromedriver"
@@ -24,26 +24,6 @@ logging.basicConfig(filename=LOG_PATH, level=logging.INFO,
                     format='%(asctime)s: %(message)s', datefmt='%m/%d/%Y %I:%M:%S %p')
 
 
-class CommandLogger(monitoring.CommandListener):
-    def started(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} started on server "
-                  "{0.connection_id}".format(event))
-
-    def succeeded(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} on server {0.connection_id} "
-                  "succeeded in {0.duration_micros} "
-                  "microseconds".format(event))
-
-    def failed(self, event):
-        log.debug("Command {0.command_name} with request id "
-                  "{0.request_id} on server {0.connection_id} "
-                  "failed in {0.duration_micros} "
-                  "microseconds".format(event))
-
-monitoring.register(CommandLogger())
-
 def get_chapter_dict(chapter: str) -> dict:
     with open ("JSON/toc.json", "r") as infile:
         toc = dict((load(infile)))
@@ -132,52 +112,6 @@ def get_text_from_ch(chapter: str) -> str:
         driver.quit()
     return text  
 
-def vog(text):
-    text = str(text)
-    blockquote_regex = [
-        r"\n(^\".*?killed.*?beast soul.*?point.*?\")$",
-        r"\n(^\".*?flesh.*?point.*?\")$",
-        r"\n(^\".*?Xenogeneic.*?hunted.*?gene.*?\")$",
-        r"\n(^\".*?hunted.*?:.*?beast soul.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?inedible.*?\")$",
-        r"\n(^\".*?beast soul.*?:.*?\")$",
-        r"\n(^\".*?beast soul.*?;.*?\")$",
-        r"\n(^\".*?:.*?gene lock.*?\")$",
-        r"\n(^\".*?gene.*?\+\d+.*?\")$",
-        r"\n(^\".*?hunted.*?found.*?.*?\")$",
-        r"\n(^\".*?body.*?evol.*?success.*?\")$",
-        r"\n(^\".*?consumed.*?geno point.*?\")$",
-        r"\n(^\".*?;.*?status.*?\")$",
-        r"\n(^\".*?retrieve.*?beast soul.*?from.*?\")$",
-        r"\n(^\".*?obtained.*?random.*?\")$",
-        r"\n(^\".*?absorb.*?geno point.*?\")$",
-        r"\n(^\".*?announce.*?:.*?\")$",
-        r"\n(^\".*?eaten\..*?geno point.*?\")$",
-        r"\n(^\".*?egg broken.*?identi.*?\")$",
-        r"\n(^\".*?Identifying.*?beast soul.*?\")$",
-        r"\n(^\".*?beast soul.*?identi.*?gained.*?\")$",
-        r"\n(^\".*?killed.*?beast soul.*?life essence.*?\")$",
-        r"\n(^\".*?evolution.*?super body.*?\")$",
-        r"^(\".*?killed.*?beast soul.*?geno core.*?flesh.*?\")$",
-        r"\n(^\"Deified Gene.*?+1.*?\")$",
-        r"\n(^\"God.*?Evolu.*?\")$"
-    ]
-    matches = []
-    for regex in blockquote_regex:
-        matches = findall(regex, text, re.I | re.M)
-        if matches:
-            for match in matches:
-                block = str("> " + match)
-                block = block.title()
-                text = sub(match, block, text, re.I, re.M)
-            duplicate_regex = r"^(> > )\""
-            duplicate_results = findall(duplicate_regex, text, re.I | re.M)
-            if duplicate_results:
-                for x in duplicate_results:
-                    rep_str = r"> "
-                    text = sub(x, rep_str, text, re.I | re.M)
-    return text
-
 def parse_chapter(text: str, chapter: str) -> str:
     text = str(text)
     chapter = str(chapter)
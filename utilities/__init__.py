@@ -1 +1 @@
-__all__ = ['timer', 'update_css', 'scratch']
\ No newline at end of file
+__all__ = ['timer', 'update_css', 'scratch', 'mock_site', 'benchmark']
\ No newline at end of file
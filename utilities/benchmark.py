@@ -0,0 +1,286 @@
+# utilities/benchmark.py
+
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from json import dump
+from multiprocessing import get_context
+from tempfile import mkdtemp
+from time import perf_counter
+from typing import Callable, Optional
+
+import typer
+
+from core.log import log
+from utilities.mock_site import NOVEL_PATH, MockSite, mock_toc
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                           Benchmark                             │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+ENGINES = ("http", "async", "browser", "toc-legacy", "toc-stream")
+CONCURRENCY = (1, 4, 16)
+CHAPTERS = 200
+TOC_READS = 20
+
+
+@dataclass
+class BenchResult:
+    """The outcome of running one engine at one concurrency level against the mock site."""
+
+    engine: str
+    concurrency: int
+    items: int
+    failed: int
+    seconds: float
+    per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    error: Optional[str] = None
+
+    def row(self) -> str:
+        if self.error:
+            return f"{self.engine:<11} {self.concurrency:>5}  {self.error}"
+        return (
+            f"{self.engine:<11} {self.concurrency:>5} {self.items:>6} {self.failed:>6} {self.per_second:>9.1f}"
+            f" {self.p50_ms:>9.1f} {self.p99_ms:>9.1f} {self.peak_rss_mb:>9.1f}"
+        )
+
+
+HEADER = f"{'engine':<11} {'conc':>5} {'items':>6} {'failed':>6} {'per sec':>9} {'p50 ms':>9} {'p99 ms':>9} {'rss MB':>9}"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of `values`; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb() -> float:
+    """The peak resident set size of this process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def timed(func: Callable, latencies: list[float]) -> Callable:
+    """Wrap `func` so the duration of each successful call is appended to `latencies`."""
+
+    def wrapped(*args):
+        start = perf_counter()
+        result = func(*args)
+        latencies.append(perf_counter() - start)
+        return result
+
+    return wrapped
+
+
+def run_threaded(func: Callable, items: list, concurrency: int) -> tuple[list[float], int]:
+    latencies, failed = [], 0
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(timed(func, latencies), *item) for item in items]
+        for future in futures:
+            if future.exception() is not None:
+                failed += 1
+    return latencies, failed
+
+
+#> Engines
+# Each engine runs in its own process and returns (latencies, failed).
+def isolate_html_cache() -> None:
+    # Keep mock pages out of the real HTML cache
+    import core.http_fetch as http_fetch
+    import core.mt_get_text as mt_get_text
+    from core.html_cache import HTMLCache
+
+    cache = HTMLCache(mkdtemp(prefix="superforge-bench-"))
+    http_fetch.html_cache = cache
+    mt_get_text.html_cache = cache
+
+
+def engine_http(base_url: str, chapters: list[int], concurrency: int) -> tuple[list[float], int]:
+    from core.http_fetch import get_chapter_text_http
+
+    isolate_html_cache()
+    toc = mock_toc(base_url, max(chapters))
+    items = [(chapter, toc[str(chapter)]["url"]) for chapter in chapters]
+    return run_threaded(get_chapter_text_http, items, concurrency)
+
+
+def engine_async(base_url: str, chapters: list[int], concurrency: int) -> tuple[list[float], int]:
+    from core.async_download import run_download
+    from core.fetch_policy import FetchPolicy
+    from core.http_fetch import get_chapter_text_http
+
+    isolate_html_cache()
+    latencies = []
+    results = run_download(
+        chapters,
+        concurrency=concurrency,
+        limits={"127.0.0.1": (1_000_000.0, concurrency)},
+        persist=lambda chapter, title, url, text: {"chapter": chapter},
+        toc=mock_toc(base_url, max(chapters)),
+        journal=None,
+        # HTTP only: fetch_chapter_text would fall back to a real browser on the mock's errors
+        fetch=timed(get_chapter_text_http, latencies),
+        policy=FetchPolicy(dead_letters=None),
+    )
+    return latencies, len(results["failed"])
+
+
+def engine_browser(base_url: str, chapters: list[int], concurrency: int) -> tuple[list[float], int]:
+    from core.driver_pool import DriverPool
+    from core.mt_get_text import scrape_chapter_text
+    from core.reader_session import ensure_reader_settings
+
+    toc = mock_toc(base_url, max(chapters))
+
+    def fetch(chapter: int, url: str) -> str:
+        with pool.driver() as driver:
+            driver.get(url)
+            ensure_reader_settings(driver, chapter)
+            return scrape_chapter_text(driver, chapter)
+
+    with DriverPool(size=concurrency) as pool:
+        items = [(chapter, toc[str(chapter)]["url"]) for chapter in chapters]
+        return run_threaded(fetch, items, concurrency)
+
+
+def engine_toc_legacy(base_url: str, reads: list[int], concurrency: int) -> tuple[list[float], int]:
+    from core.get_toc import get_links, get_list_chapter, get_soup
+
+    def read(_):
+        return get_links(get_list_chapter(get_soup(f"{base_url}{NOVEL_PATH}")))
+
+    return run_threaded(read, [(x,) for x in reads], concurrency)
+
+
+def engine_toc_stream(base_url: str, reads: list[int], concurrency: int) -> tuple[list[float], int]:
+    import requests
+
+    from core.toc_refresh import stream_links
+
+    def read(_):
+        with requests.get(f"{base_url}{NOVEL_PATH}", stream=True, timeout=30) as response:
+            return sum(1 for _ in stream_links(response))
+
+    return run_threaded(read, [(x,) for x in reads], concurrency)
+
+
+ENGINE_FUNCS = {
+    "http": engine_http,
+    "async": engine_async,
+    "browser": engine_browser,
+    "toc-legacy": engine_toc_legacy,
+    "toc-stream": engine_toc_stream,
+}
+
+
+def run_case(engine: str, base_url: str, items: list[int], concurrency: int) -> BenchResult:
+    """Run one engine at one concurrency level. Meant to run in a fresh process so peak RSS is its own."""
+    start = perf_counter()
+    try:
+        latencies, failed = ENGINE_FUNCS[engine](base_url, items, concurrency)
+    except Exception as e:
+        return BenchResult(engine, concurrency, len(items), len(items), 0.0, 0.0, 0.0, 0.0, peak_rss_mb(), repr(e))
+    seconds = perf_counter() - start
+    return BenchResult(
+        engine=engine,
+        concurrency=concurrency,
+        items=len(items),
+        failed=failed,
+        seconds=round(seconds, 3),
+        per_second=round((len(items) - failed) / seconds, 2) if seconds else 0.0,
+        p50_ms=round(percentile(latencies, 50) * 1000, 2),
+        p99_ms=round(percentile(latencies, 99) * 1000, 2),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+    )
+
+
+def benchmark(
+    engines: tuple = ("http", "async", "toc-legacy", "toc-stream"),
+    concurrency: tuple = CONCURRENCY,
+    chapters: int = CHAPTERS,
+    toc_reads: int = TOC_READS,
+    site: Optional[MockSite] = None,
+) -> list[BenchResult]:
+    """
+    Benchmark the fetch engines against a local mock site.
+
+    Every (engine, concurrency) case runs in a fresh process, so its peak RSS
+    is not inflated by earlier cases. The mock site runs in this process.
+    Chapter engines report chapters per second; the TOC engines report full
+    listing reads per second. Browser memory is not included in peak RSS.
+
+    Args:
+        `engines` (tuple, optional):
+            The engines to run, from ENGINES.
+        `concurrency` (tuple, optional):
+            The concurrency levels to run each engine at. Defaults to CONCURRENCY.
+        `chapters` (int, optional):
+            The chapters fetched by each chapter-engine case. Defaults to CHAPTERS.
+        `toc_reads` (int, optional):
+            The listing reads made by each TOC-engine case. Defaults to TOC_READS.
+        `site` (MockSite, optional):
+            The mock site to use. Defaults to a new `MockSite()` with censoring off.
+
+    Returns:
+        `results` (list[BenchResult]):
+            One result per case.
+    """
+    unknown = set(engines) - set(ENGINES)
+    if unknown:
+        raise ValueError("Unknown benchmark engine.", f"engines: {sorted(unknown)}")
+    site = site or MockSite(censor=False)
+    results = []
+    with site:
+        log.info(f"Benchmarking {', '.join(engines)} against {site!r}")
+        for engine in engines:
+            items = list(range(1, toc_reads + 1)) if engine.startswith("toc") else list(range(1, chapters + 1))
+            for level in concurrency:
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    result = executor.submit(run_case, engine, site.url, items, level).result()
+                log.debug(result.row())
+                results.append(result)
+    table = "\n".join([HEADER] + [result.row() for result in results])
+    log.info(f"Benchmark results:\n<code>{table}</code>")
+    return results
+
+
+#> CLI
+app = typer.Typer()
+
+
+@app.command()
+def main(
+    engine: list[str] = typer.Option(["http", "async", "toc-legacy", "toc-stream"], help=f"One of {ENGINES}."),
+    concurrency: list[int] = typer.Option(list(CONCURRENCY)),
+    chapters: int = CHAPTERS,
+    toc_reads: int = TOC_READS,
+    latency: float = 0.05,
+    jitter: float = 0.02,
+    error_rate: float = 0.0,
+    censor: bool = False,
+    output: Optional[str] = None,
+):
+    site = MockSite(
+        latency=latency,
+        jitter=jitter,
+        error_rate=error_rate,
+        censor=censor,
+    )
+    results = benchmark(tuple(engine), tuple(concurrency), chapters, toc_reads, site)
+    if output:
+        with open(output, "w") as outfile:
+            dump([asdict(result) for result in results], outfile, indent=4)
+        log.info(f"Wrote benchmark results to {output}.")
+
+
+if __name__ == "__main__":
+    app()
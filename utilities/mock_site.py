@@ -0,0 +1,258 @@
+# utilities/mock_site.py
+
+import random
+from hashlib import md5
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+from urllib.parse import parse_qs, urlparse
+
+from core.log import log
+
+# .┌─────────────────────────────────────────────────────────────────┐.#
+# .│                           Mock Site                             │.#
+# .└─────────────────────────────────────────────────────────────────┘.#
+
+#> Constants
+NOVEL_PATH = "/novel_888112448"
+CHAPTERS = 3462
+PARAGRAPHS = 40
+LATENCY = 0.05
+JITTER = 0.02
+ERROR_RATE = 0.0
+WORDS = (
+    "Han Sen looked at the Sacred-blood creature and felt his heart race as the "
+    "gene points climbed in the shelter while the spirit beast roared beyond the wall"
+).split()
+
+
+def chapter_title(chapter: int) -> str:
+    return f"Mock Chapter Title {chapter}"
+
+
+def chapter_url(base_url: str, chapter: int) -> str:
+    return f"{base_url}{NOVEL_PATH}/chapter_{chapter}"
+
+
+def mock_toc(base_url: str, chapters: int = CHAPTERS) -> dict:
+    """The mock site's chapters in the shape of json/toc2.json."""
+    return {
+        str(chapter): {"chapter": chapter, "title": chapter_title(chapter), "url": chapter_url(base_url, chapter)}
+        for chapter in range(chapters, 0, -1)
+    }
+
+
+def chapter_paragraphs(chapter: int, paragraphs: int = PARAGRAPHS, censor: bool = False) -> list[str]:
+    """
+    Generate a chapter's paragraphs. The same chapter always gets the same text.
+
+    Args:
+        `chapter` (int):
+            The given chapter.
+        `paragraphs` (int, optional):
+            The number of paragraphs. Defaults to PARAGRAPHS.
+        `censor` (bool, optional):
+            Whether to censor swear words, like the site does by default.
+
+    Returns:
+        `paragraphs` (list[str]):
+            The chapter's paragraphs, starting with the chapter heading.
+    """
+    rng = random.Random(chapter)
+    swear = "sh*t" if censor else "shit"
+    lines = [f"Chapter {chapter}: {chapter_title(chapter)}"]
+    for x in range(paragraphs):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(20, 60))]
+        if x % 10 == 5:
+            words.append(swear)
+        lines.append(" ".join(words).capitalize() + ".")
+    return lines
+
+
+class MockSite:
+    """
+    A local stand-in for bestlightnovel.com.
+
+    Serves the novel page with a `#list_chapter` listing (with ETag support)
+    and chapter pages with the `#trang_doc` layout: a SETTING link, the
+    bad-words toggle at the XPath `click_bad_words` uses, and the text in
+    `#vung_doc`. Chapter text is censored until the bad-words toggle has
+    set its cookie, the same as the live site, unless `censor` is off.
+
+    Args:
+        `chapters` (int, optional):
+            The number of chapters listed. Defaults to CHAPTERS.
+        `latency` (float, optional):
+            Seconds to wait before each response. Defaults to LATENCY.
+        `jitter` (float, optional):
+            Random seconds added to or taken from `latency`. Defaults to JITTER.
+        `error_rate` (float, optional):
+            Fraction of chapter requests answered with a 503. Defaults to ERROR_RATE.
+        `paragraphs` (int, optional):
+            Paragraphs per chapter. Defaults to PARAGRAPHS.
+        `censor` (bool, optional):
+            Censor chapter text until the bad-words cookie is set. Defaults to True.
+        `port` (int, optional):
+            The port to listen on. Defaults to 0, any free port.
+    """
+
+    def __init__(
+        self,
+        chapters: int = CHAPTERS,
+        latency: float = LATENCY,
+        jitter: float = JITTER,
+        error_rate: float = ERROR_RATE,
+        paragraphs: int = PARAGRAPHS,
+        censor: bool = True,
+        port: int = 0,
+    ):
+        self.chapters = chapters
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.paragraphs = paragraphs
+        self.censor = censor
+        self.requests = 0
+        self.errors = 0
+        self._lock = Lock()
+        self._rng = random.Random(0)
+        self._list_page = None
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __repr__(self):
+        return f"MockSite(url={self.url!r}, chapters={self.chapters}, requests={self.requests}, errors={self.errors})"
+
+    def __enter__(self) -> "MockSite":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def toc_url(self) -> str:
+        return f"{self.url}{NOVEL_PATH}"
+
+    def chapter_url(self, chapter: int) -> str:
+        return chapter_url(self.url, chapter)
+
+    def toc(self) -> dict:
+        return mock_toc(self.url, self.chapters)
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._server.serve_forever, name="mock-site", daemon=True)
+        self._thread.start()
+        log.debug(f"Mock site listening on {self.url}")
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # > Responses
+    def _delay(self) -> None:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            sleep(delay)
+
+    def _fail(self) -> bool:
+        with self._lock:
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        return failed
+
+    def list_page(self) -> str:
+        if self._list_page is not None:
+            return self._list_page
+        links = "\n".join(
+            f'<div class="row"><span><a href="{self.chapter_url(chapter)}" title="{chapter_title(chapter)}">'
+            f"Chapter {chapter}: {escape(chapter_title(chapter))}</a></span></div>"
+            for chapter in range(self.chapters, 0, -1)
+        )
+        self._list_page = (
+            "<!DOCTYPE html><html><head><title>Super Gene | BestLightNovel.com</title></head><body>"
+            f'<div class="chapter-list" id="list_chapter">\n{links}\n</div></body></html>'
+        )
+        return self._list_page
+
+    def chapter_page(self, chapter: int, censor: bool) -> str:
+        paragraphs = "\n".join(
+            f"<p>{escape(line)}</p>" for line in chapter_paragraphs(chapter, self.paragraphs, censor)
+        )
+        # The bad-words toggle is //*[@id="trang_doc"]/div[6]/div[1]/div[2]/ul/li[5]/a
+        settings = "".join(f'<li><a href="#">Option {x}</a></li>' for x in range(1, 5))
+        return (
+            "<!DOCTYPE html><html><head>"
+            f"<title>Super Gene Chapter {chapter} Online | BestLightNovel.com</title></head><body>"
+            '<div id="trang_doc">'
+            "<div></div><div></div><div></div><div></div><div></div>"
+            '<div><div><a href="#">SETTING</a><div></div><div>'
+            f'<ul>{settings}<li><a href="?bad_words=off">Bad words</a></li></ul>'
+            "</div></div></div>"
+            f'<div class="vung_doc" id="vung_doc">\n{paragraphs}\n</div>'
+            "</div></body></html>"
+        )
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_html(self, body: str, status: int = 200, headers: dict = None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                site._delay()
+                parsed = urlparse(self.path)
+                if parsed.path == NOVEL_PATH:
+                    body = site.list_page()
+                    etag = f'"{md5(body.encode("utf-8")).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    return self.send_html(body, headers={"ETag": etag})
+
+                prefix = f"{NOVEL_PATH}/chapter_"
+                if not parsed.path.startswith(prefix) or not parsed.path[len(prefix):].isdigit():
+                    return self.send_html("<h1>Not Found</h1>", status=404)
+                chapter = int(parsed.path[len(prefix):])
+                if not 1 <= chapter <= site.chapters:
+                    return self.send_html("<h1>Not Found</h1>", status=404)
+                if site._fail():
+                    return self.send_html("<h1>Service Unavailable</h1>", status=503)
+
+                headers = {}
+                censor = site.censor and "bad_words=off" not in self.headers.get("Cookie", "")
+                if parse_qs(parsed.query).get("bad_words") == ["off"]:
+                    headers["Set-Cookie"] = "bad_words=off; Path=/"
+                    censor = False
+                self.send_html(site.chapter_page(chapter, censor), headers=headers)
+
+        return Handler